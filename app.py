@@ -3,7 +3,8 @@
 # Painel de Qualidade — Starcheck (multi-meses)
 # ============================================================
 
-import os, io, json, re, unicodedata, calendar
+import os, json, re, time, calendar, threading, hashlib, functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date
 from typing import Tuple, Optional
 
@@ -12,18 +13,30 @@ import pandas as pd
 import numpy as np
 import altair as alt
 
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from dateutil.relativedelta import relativedelta
+from painel.filters import FilterSpec
+from painel.revisits import RevisitIndex, RevisitIndexes
+from painel.schema import DATA_SCHEMA, QUALITY_DATE, period_mask
+from painel.store import MonthStore
+from painel.dataset import DatasetManager, Snapshot
+from painel.memo import TableMemo
+from painel import metrics, perf
+from painel.analytics import (
+    ASSEMBLE_VERSION, META_ERRO, META_ERRO_GG, TOL_AMARELO, PanelView, assemble, pareto_gain,
+)
+from painel.export import ok_openpyxl, farol_xlsx
+from painel.loader import load_index, read_quality_cached, read_prod_cached
+from painel.sources import GoogleSource, LocalSource, MeteredSource
+from painel.resilience import ResilientSource, Scheduler
 
-# Drive API (fallback XLSX)
-from google.oauth2 import service_account as gcreds
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except Exception:  # versões antigas do Streamlit
+    add_script_run_ctx = get_script_run_ctx = None
 
 
 # ------------------ CONFIG BÁSICA ------------------
 st.set_page_config(page_title="Painel de Qualidade — Starcheck", layout="wide")
+PAGE = perf.PageTimer()   # seções desta execução: tempo, cache, linhas (⚙️ Performance e logs JSON)
 st.title("🎯 Painel de Qualidade — Starcheck")
 
 st.markdown(
@@ -50,8 +63,21 @@ st.markdown(
 fast_mode = st.toggle("⚡ Modo rápido (carregar menos gráficos/tabelas pesadas)", value=False)
 
 
-# ------------------ CREDENCIAL ------------------
-def _get_client_and_drive():
+# ------------------ ORIGEM DOS DADOS ------------------
+# Testes de carga sem rede: bloco [local_source] no secrets.toml (dir, latency_ms, jitter_ms,
+# throughput_mbps, max_concurrent, fail_rate, fail_ids, as_sheets, seed) — ver painel/sources.py.
+def _data_source():
+    """Google (service account) ou, com [local_source] no secrets.toml, uma pasta de .xlsx (testes de carga)."""
+    local = st.secrets.get("local_source")
+    if local:
+        try:
+            return LocalSource.from_config(dict(local))
+        except Exception as e:
+            st.error("Não consegui abrir a origem local ([local_source]).")
+            with st.expander("Detalhes"):
+                st.exception(e)
+            st.stop()
+
     try:
         block = st.secrets["gcp_service_account"]
     except Exception:
@@ -73,32 +99,124 @@ def _get_client_and_drive():
     else:
         info = dict(block)
 
-    scopes = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive",
-        "https://www.googleapis.com/auth/drive.readonly",
-    ]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(info, scopes)
-    gc = gspread.authorize(creds)
-
-    dscopes = ["https://www.googleapis.com/auth/drive.readonly"]
-    gcred = gcreds.Credentials.from_service_account_info(info, scopes=dscopes)
-    drive = build("drive", "v3", credentials=gcred, cache_discovery=False)
+    return GoogleSource(info)
 
-    return gc, drive, info.get("client_email", "(sem client_email)")
 
+# Cota, novas tentativas e disjuntor por arquivo: bloco [api_limits] do secrets.toml
+# (sheets_per_minute, drive_per_minute, burst_seconds, retries, backoff_base_s, backoff_max_s,
+# breaker_failures, breaker_cooldown_s) — ver painel/resilience.py. Um agendador por processo.
+@st.cache_resource(show_spinner=False)
+def _scheduler() -> Scheduler:
+    return Scheduler.from_config(dict(st.secrets.get("api_limits", {})))
 
-client, DRIVE, SA_EMAIL = _get_client_and_drive()
+# Agendador por fora (cota + novas tentativas); métricas por dentro: cada tentativa conta
+SOURCE = ResilientSource(MeteredSource(_data_source()), _scheduler())
 
 
 # ------------------ SECRETS: IDs ------------------
-QUAL_INDEX_ID = st.secrets.get("qual_index_sheet_id", "").strip()
-PROD_INDEX_ID = st.secrets.get("prod_index_sheet_id", "").strip()
+QUAL_INDEX_ID = st.secrets.get("qual_index_sheet_id", "").strip() or SOURCE.index_ids[0]
+PROD_INDEX_ID = st.secrets.get("prod_index_sheet_id", "").strip() or SOURCE.index_ids[1]
 if not QUAL_INDEX_ID:
     st.error("Faltou `qual_index_sheet_id` no secrets.toml"); st.stop()
 if not PROD_INDEX_ID:
     st.error("Faltou `prod_index_sheet_id` no secrets.toml"); st.stop()
 
+# Máximo de meses baixados ao mesmo tempo (Sheets/Drive)
+LOAD_MAX_WORKERS = max(1, int(st.secrets.get("load_max_workers", 8)))
+
+# Cache em disco dos meses normalizados (chave: ID + modifiedTime do Drive)
+CACHE_DIR = st.secrets.get("cache_dir", "") or os.path.join(os.path.dirname(__file__), ".cache", "meses")
+MONTH_STORE = MonthStore(CACHE_DIR, enabled=st.secrets.get("disk_cache", True))
+
+# Revalidação: de quanto em quanto tempo conferir o modifiedTime no Drive (1 batch por ciclo)
+REVALIDATE_SECONDS = max(10, int(st.secrets.get("revalidate_seconds", 60)))
+CACHE_MAX_ENTRIES = 256
+
+# Produção: planilha que só cresce é relida a partir da última linha lida (acréscimos);
+# uma leitura completa é forçada a cada `prod_full_refresh_minutes`. A base do acréscimo é
+# uma cópia do mês em memória: só os `prod_incremental_months` meses mais recentes a guardam.
+PROD_INCREMENTAL = bool(st.secrets.get("prod_incremental", True))
+PROD_FULL_REFRESH_SECONDS = 60 * max(1, int(st.secrets.get("prod_full_refresh_minutes", 60)))
+PROD_TAILS_MONTHS = max(1, int(st.secrets.get("prod_incremental_months", 2)))
+
+# Base compartilhada: de quanto em quanto tempo a thread de 2º plano procura meses novos/alterados
+DATASET_REFRESH_SECONDS = max(10, int(st.secrets.get("dataset_refresh_seconds", REVALIDATE_SECONDS)))
+
+# Modo preguiçoso: seletor de mês vindo do índice e carga só do mês escolhido + anterior.
+# IS_REV passa a considerar só os meses da janela carregada (cada janela tem o seu índice):
+# chassi vistoriado pela 1ª vez dois meses antes conta como original.
+LAZY_MONTHS = bool(st.secrets.get("lazy_months", False))
+DATASET_IDLE_SECONDS = 30 * 60
+
+# XLSX de Qualidade: download para temporário + leitura read_only em blocos (False = pd.read_excel)
+XLSX_STREAMING = bool(st.secrets.get("xlsx_streaming", True)) and ok_openpyxl
+
+# Tabelas derivadas por recorte (unidade, heatmap, % por vistoriador, semanal, ranking), LRU
+MEMO_MAX_ENTRIES = max(8, int(st.secrets.get("memo_max_entries", 128)))
+# Planilhas Excel já montadas (bytes, podem ter MBs): cache próprio e pequeno, fora das tabelas
+EXCEL_MAX_ENTRIES = max(1, int(st.secrets.get("excel_max_entries", 8)))
+
+# Overlay de tempos (página inteira x seção reexecutada); também via ?timings=1 na URL,
+# pois só mostra números de tempo
+SHOW_TIMINGS = bool(st.secrets.get("show_timings", False)) or getattr(st, "query_params", {}).get("timings") == "1"
+
+# Relatório de conexão + painel ⚙️ Performance (seções e carga). Só pelo secrets.toml:
+# mostra tracebacks, títulos/IDs dos arquivos e o estado da origem a quem abrir a página.
+show_tech = bool(st.secrets.get("show_tech", False))
+
+# Registros de tempo em JSON (um por seção/tabela/arquivo): "stderr" ou caminho de arquivo
+perf.configure(st.secrets.get("perf_log", ""))
+
+# Métricas Prometheus (chamadas à origem, carga, cache, seções): /metrics numa porta própria
+# e/ou arquivo regravado a cada `metrics_interval` s (textfile collector / sidecar).
+# A porta escuta só em `metrics_addr` (padrão: máquina local; "0.0.0.0" abre para a rede)
+METRICS_PORT = int(st.secrets.get("metrics_port", 0))
+METRICS_ADDR = st.secrets.get("metrics_addr", "127.0.0.1")
+METRICS_FILE = st.secrets.get("metrics_file", "")
+METRICS_INTERVAL = max(1, int(st.secrets.get("metrics_interval", 15)))
+perf.subscribe(metrics.observe)
+
+@st.cache_resource(show_spinner=False)
+def _metrics_exporter(port: int, addr: str, path: str, interval: int) -> dict:
+    """Servidor/arquivo de métricas, um por processo. Porta ocupada vira aviso no ⚙️ Performance."""
+    out = {}
+    if port:
+        try:
+            out["server"] = metrics.serve(port, addr)
+        except OSError as e:
+            out["erro"] = f"porta {port}: {e}"
+    if path:
+        out["file"] = metrics.FileExporter(path, interval)
+    return out
+
+METRICS_EXPORTER = _metrics_exporter(METRICS_PORT, METRICS_ADDR, METRICS_FILE, METRICS_INTERVAL)
+
+
+# ------------------ FRAGMENTOS ------------------
+# Seções com widgets próprios (Pareto, Detalhamento, Excel) rodam como st.fragment:
+# mexer nelas reexecuta só a seção, com os dados da última execução completa.
+# Filtros do topo, modo rápido e a base do %Erro continuam reexecutando a página.
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def timed_fragment(fn):
+    """Seção reexecutável sozinha (quando o Streamlit suporta) + tempo dela no overlay."""
+    name = fn.__name__.strip("_")
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        # Na reexecução só do fragmento o script não roda: PAGE é o da última execução
+        # completa, já encerrado. Dentro da página inteira ele ainda está aberto.
+        parcial = PAGE.total is not None
+        t0 = time.perf_counter()
+        out = fn(*args, **kwargs)
+        ms = (time.perf_counter() - t0) * 1000
+        perf.emit("fragmento", execucao=PAGE.run_id, secao=name, ms=round(ms, 1), parcial=parcial)
+        if SHOW_TIMINGS and parcial:
+            st.caption(f"⏱️ seção {name} (só ela): {ms:.0f} ms ({time.strftime('%H:%M:%S')})")
+        return out
+
+    return _st_fragment(run) if _st_fragment else run
+
 
 # ------------------ HELPERS ------------------
 ID_RE = re.compile(r"/d/([a-zA-Z0-9-_]+)")
@@ -121,247 +239,367 @@ def _ym_token(x: str) -> Optional[str]:
         return s
     return None
 
-def parse_date_any(x):
-    if pd.isna(x) or x == "":
-        return pd.NaT
-    if isinstance(x, (int, float)) and not isinstance(x, bool):
-        try:
-            return (pd.to_datetime("1899-12-30") + pd.to_timedelta(int(x), unit="D")).date()
-        except Exception:
-            pass
-    s = str(x).strip()
-    for fmt in ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y"):
-        try:
-            return datetime.strptime(s, fmt).date()
-        except Exception:
-            pass
-    try:
-        return pd.to_datetime(s).date()
-    except Exception:
-        return pd.NaT
-
-def _upper(x):
-    return str(x).upper().strip() if pd.notna(x) else ""
-
 def _yes(v) -> bool:
     return str(v).strip().upper() in {"S", "SIM", "Y", "YES", "TRUE", "1"}
 
-def _strip_accents(s: str) -> str:
-    if s is None: return ""
-    return "".join(ch for ch in unicodedata.normalize("NFKD", str(s)) if not unicodedata.combining(ch))
 
-def _find_col(cols, *names) -> Optional[str]:
-    """Encontra a coluna em 'cols' ignorando acentos/maiúsculas/espaços."""
-    norm = {re.sub(r"\W+", "", _strip_accents(c).upper()): c for c in cols}
-    for nm in names:
-        key = re.sub(r"\W+", "", _strip_accents(nm).upper())
-        if key in norm: return norm[key]
-    return None
+# ------------------ REVALIDAÇÃO (modifiedTime do Drive) ------------------
+@st.cache_data(ttl=REVALIDATE_SECONDS, show_spinner=False)
+def _drive_versions(file_ids: Tuple[str, ...]) -> dict:
+    """Metadados (com modifiedTime) de vários arquivos numa única ida à origem.
 
-def business_days_count(dini: date, dfim: date) -> int:
-    if not (isinstance(dini, date) and isinstance(dfim, date) and dini <= dfim):
-        return 0
-    return len(pd.bdate_range(dini, dfim))
+    IDs que falharem ficam de fora e caem no modo TTL (ver `_rev_token`). Erro
+    transitório sobe (já com as novas tentativas do agendador) e não entra no cache.
+    """
+    perf.note()
+    return SOURCE.versions(file_ids)
 
+@st.cache_resource(show_spinner=False)
+def _known_versions() -> dict:
+    """Último modifiedTime visto de cada arquivo (vale para o processo todo)."""
+    return {}
 
-# ------------------ LEITURA DOS ÍNDICES (com cache) ------------------
-@st.cache_data(ttl=300, show_spinner=False)
-def read_index(sheet_id: str, tab: str = "ARQUIVOS") -> pd.DataFrame:
-    sh = client.open_by_key(sheet_id)
-    ws = sh.worksheet(tab)
-    rows = ws.get_all_records()
-    if not rows:
-        return pd.DataFrame(columns=["URL", "MÊS", "ATIVO"])
-    df = pd.DataFrame(rows)
-    df.columns = [c.strip().upper() for c in df.columns]
-    for need in ["URL", "MÊS", "ATIVO"]:
-        if need not in df.columns:
-            df[need] = ""
-    return df
+def _versions(carga: Optional[list], arquivo: str, file_ids: Tuple[str, ...]) -> dict:
+    """`_drive_versions` medido; se a origem falhar, vale a última versão conhecida de cada arquivo.
 
+    Só arquivos nunca vistos caem no modo TTL: com o disjuntor aberto os meses não
+    são baixados de novo a cada 5 min.
+    """
+    known = _known_versions()
+    try:
+        got = perf.timed(_drive_versions, carga, tipo="versoes", arquivo=arquivo)(file_ids=file_ids)
+    except Exception:
+        got = {}
+    known.update({fid: m for fid, m in got.items() if (m or {}).get("modifiedTime")})
+    return {fid: known[fid] for fid in file_ids if fid in known}
 
-# ------------------ FALLBACK XLSX / QUALIDADE (com cache) ------------------
-@st.cache_data(ttl=300, show_spinner=False)
-def _drive_get_file_metadata(file_id: str) -> dict:
-    return DRIVE.files().get(fileId=file_id, fields="id, name, mimeType").execute()
-
-@st.cache_data(ttl=300, show_spinner=False)
-def _drive_download_bytes(file_id: str) -> bytes:
-    req = DRIVE.files().get_media(fileId=file_id)
-    buf = io.BytesIO()
-    downloader = MediaIoBaseDownload(buf, req, chunksize=1024 * 1024)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    return buf.getvalue()
-
-@st.cache_data(ttl=300, show_spinner=False)
-def read_quality_month(month_id: str) -> Tuple[pd.DataFrame, str]:
-    meta = _drive_get_file_metadata(month_id)
-    title = meta.get("name", month_id)
-    mime = meta.get("mimeType", "")
-
-    if mime == "application/vnd.google-apps.spreadsheet":
-        sh = client.open_by_key(month_id)
-        try:
-            ws = sh.worksheet("GERAL")
-        except Exception as e:
-            raise RuntimeError(f"O arquivo '{title}' não possui aba 'GERAL'.") from e
-        dq = pd.DataFrame(ws.get_all_records())
-        if dq.empty:
-            return pd.DataFrame(), title
-        dq.columns = [c.strip() for c in dq.columns]
-    else:
-        if not mime.startswith("application/vnd.openxmlformats-officedocument") and \
-           not mime.startswith("application/vnd.ms-excel"):
-            raise RuntimeError(f"Tipo de arquivo não suportado para Qualidade: {mime} ({title})")
-        content = _drive_download_bytes(month_id)
-        try:
-            dq = pd.read_excel(io.BytesIO(content), sheet_name="GERAL", engine="openpyxl")
-        except ValueError as e:
-            raise RuntimeError(f"O arquivo '{title}' não possui aba 'GERAL'.") from e
-        dq.columns = [str(c).strip() for c in dq.columns]
-
-    rename_map = {}
-    for c in dq.columns:
-        cu = c.upper()
-        if cu == "DATA": rename_map[c] = "DATA"
-        elif cu == "PLACA": rename_map[c] = "PLACA"
-        elif cu in {"VISTORIADORES", "VISTORIADOR"}: rename_map[c] = "VISTORIADOR"
-        elif cu in {"CIDADE", "UNIDADE"}: rename_map[c] = "UNIDADE"
-        elif cu in {"ERROS","ERRO"}: rename_map[c] = "ERRO"
-        elif cu.startswith("GRAVIDADE"): rename_map[c] = "GRAVIDADE"
-        elif cu in {"OBSERVAÇÃO","OBSERVACAO","OBS"}: rename_map[c] = "OBS"
-        elif cu == "ANALISTA": rename_map[c] = "ANALISTA"
-        elif cu in {"EMPRESA","MARCA"}: rename_map[c] = "EMPRESA"
-    dq = dq.rename(columns=rename_map)
-
-    for need in ["DATA","PLACA","VISTORIADOR","UNIDADE","ERRO","GRAVIDADE","ANALISTA","EMPRESA"]:
-        if need not in dq.columns:
-            dq[need] = ""
-
-    # Preserva timestamp e mantém DATA (date)
-    if "DATA" in dq.columns:
-        dq["DATA_TS"] = pd.to_datetime(dq["DATA"], errors="coerce")
-        dq["DATA"] = dq["DATA"].apply(parse_date_any)
-    else:
-        dq["DATA_TS"] = pd.NaT
+def _rev_token(file_id: str, versions: dict) -> str:
+    """Chave de cache do arquivo: o modifiedTime; sem ele, uma janela de 5 min (comportamento antigo)."""
+    v = (versions.get(file_id) or {}).get("modifiedTime", "")
+    return v or f"~{int(time.time() // 300)}"
 
-    for c in ["VISTORIADOR","UNIDADE","ERRO","GRAVIDADE","ANALISTA","EMPRESA","PLACA"]:
-        dq[c] = dq[c].astype(str).map(_upper)
+def _disk_version(token: str) -> str:
+    """Só versões reais do Drive vão para o cache em disco."""
+    return "" if not token or token.startswith("~") else token
 
-    dq = dq[(dq["VISTORIADOR"] != "") & (dq["ERRO"] != "")]
-    return dq, title
 
+# ------------------ LEITURA DOS ÍNDICES (com cache) ------------------
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def read_index(sheet_id: str, version: str = "", tab: str = "ARQUIVOS") -> pd.DataFrame:
+    perf.note()
+    return load_index(SOURCE, sheet_id, tab)
 
-# ------------------ LEITURA / PRODUÇÃO + METAS (com cache) ------------------
-@st.cache_data(ttl=300, show_spinner=False)
-def read_prod_month(month_sheet_id: str, ym: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
-    """Lê a planilha mensal de produção (aba 1) e, se existir, a aba 'METAS'."""
-    sh = client.open_by_key(month_sheet_id)
-    title = sh.title or month_sheet_id
-
-    ws = sh.sheet1
-    df = pd.DataFrame(ws.get_all_records())
-    if not df.empty:
-        df.columns = [c.strip().upper() for c in df.columns]
-
-        col_unid = "UNIDADE" if "UNIDADE" in df.columns else None
-        col_data = "DATA" if "DATA" in df.columns else None
-        col_chas = "CHASSI" if "CHASSI" in df.columns else None
-        col_per  = "PERITO" if "PERITO" in df.columns else None
-        col_dig  = "DIGITADOR" if "DIGITADOR" in df.columns else None
-        req = [col_unid, col_data, col_chas, (col_per or col_dig)]
-        if any(r is None for r in req):
-            df = pd.DataFrame()
-        else:
-            df[col_unid] = df[col_unid].map(_upper)
-            df["__DATA__"] = df[col_data].apply(parse_date_any)
-            df[col_chas] = df[col_chas].map(_upper)
-
-            if col_per and col_dig:
-                df["VISTORIADOR"] = np.where(
-                    df[col_per].astype(str).str.strip() != "",
-                    df[col_per].map(_upper),
-                    df[col_dig].map(_upper),
-                )
-            elif col_per:
-                df["VISTORIADOR"] = df[col_per].map(_upper)
-            else:
-                df["VISTORIADOR"] = df[col_dig].map(_upper)
 
-            df = df.sort_values(["__DATA__", col_chas], kind="mergesort").reset_index(drop=True)
-            df["__ORD__"] = df.groupby(col_chas).cumcount()
-            df["IS_REV"] = (df["__ORD__"] >= 1).astype(int)
-    metas = pd.DataFrame()
+# ------------------ FALLBACK XLSX / QUALIDADE (com cache) ------------------
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _drive_get_file_metadata(file_id: str, version: str = "") -> dict:
+    """`version` é o token de revalidação inteiro (com a janela `~`), nunca a versão de disco vazia."""
+    return SOURCE.metadata(file_id)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def read_quality_month(month_id: str, version: str = "") -> Tuple[pd.DataFrame, str]:
+    """Mês de Qualidade; `version` (modifiedTime) faz parte da chave do cache."""
+    token, version = version, _disk_version(version)
+    timings = {}
+    dq, title, cache = read_quality_cached(
+        MONTH_STORE, SOURCE, month_id, version, metadata=lambda fid: _drive_get_file_metadata(fid, token),
+        streaming=XLSX_STREAMING, timings=timings,
+    )
+    perf.note(cache, timings)
+    return dq, title
 
-    try:
-        ws_meta = sh.worksheet("METAS")
-        rows = ws_meta.get_all_records()
-        if rows:
-            dm = pd.DataFrame(rows)
-            cols = list(dm.columns)
-            c_vist = _find_col(cols, "VISTORIADOR")
-            c_unid = _find_col(cols, "UNIDADE")
-            c_meta = _find_col(cols, "META_MENSAL", "META MENSAL", "META")
-            c_du   = _find_col(cols, "DIAS ÚTEIS", "DIAS UTEIS", "DIAS_UTEIS")
-            out = pd.DataFrame()
-            out["VISTORIADOR"] = dm[c_vist].astype(str).map(_upper) if c_vist else ""
-            out["UNIDADE"] = dm[c_unid].astype(str).map(_upper) if c_unid else ""
-            out["META_MENSAL"] = pd.to_numeric(dm[c_meta], errors="coerce").fillna(0).astype(int) if c_meta else 0
-            out["DIAS_UTEIS"]  = pd.to_numeric(dm[c_du], errors="coerce").fillna(np.nan)
-            out["DIAS_UTEIS"]  = out["DIAS_UTEIS"].astype(float).round().astype("Int64")
-            out["YM"] = ym or ""
-            metas = out
-    except Exception:
-        metas = pd.DataFrame()
 
+# ------------------ LEITURA / PRODUÇÃO + METAS (com cache) ------------------
+@st.cache_resource(show_spinner=False)
+def _revisit_indexes() -> RevisitIndexes:
+    """Índices chassi -> primeira data, um por base (janela de meses), vivos com ela (atualização incremental)."""
+    return RevisitIndexes()
+
+@st.cache_resource(show_spinner=False)
+def _prod_tails() -> dict:
+    """Última leitura de cada planilha de Produção neste processo (base dos acréscimos)."""
+    return {}
+
+def _trim_tails(active: Optional[set] = None) -> None:
+    """Descarta as bases de acréscimo de planilhas fora de `active` e além dos PROD_TAILS_MONTHS meses mais novos."""
+    tails = _prod_tails()
+    items = [(sid, t) for sid, t in list(tails.items()) if active is None or sid in active]
+    items.sort(key=lambda it: it[1]["ym"] or "", reverse=True)
+    keep = {sid for sid, _ in items[:PROD_TAILS_MONTHS]}
+    for sid in list(tails):
+        if sid not in keep:
+            tails.pop(sid, None)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def read_prod_month(month_sheet_id: str, ym: Optional[str] = None, version: str = "") -> Tuple[pd.DataFrame, pd.DataFrame, str]:
+    """Lê a planilha mensal de produção (aba 1) e, se existir, a aba 'METAS'.
+
+    Se o processo já leu uma versão anterior da mesma planilha, tenta buscar só
+    as linhas novas do fim; o IS_REV das linhas antigas é reaproveitado.
+    """
+    timings = {}
+    df, metas, title, cache = read_prod_cached(
+        MONTH_STORE, SOURCE, month_sheet_id, ym, _disk_version(version), key=f"{month_sheet_id}@{version}",
+        tails=_prod_tails() if PROD_INCREMENTAL else None, full_refresh_seconds=PROD_FULL_REFRESH_SECONDS,
+        revisits=_revisit_indexes(), timings=timings,
+    )
+    if PROD_INCREMENTAL:
+        _trim_tails()
+    perf.note(cache, timings)
     return df, metas, title
 
 
 # ------------------ CARREGA INDEX ------------------
-show_tech = False
-
-idx_q = read_index(QUAL_INDEX_ID)
-if "ATIVO" in idx_q.columns:
-    idx_q = idx_q[idx_q["ATIVO"].map(_yes)].copy()
-sel_meses = sorted([str(m).strip() for m in idx_q["MÊS"] if str(m).strip()])
-
-idx_p = read_index(PROD_INDEX_ID)
-if "ATIVO" in idx_p.columns:
-    idx_p = idx_p[idx_p["ATIVO"].map(_yes)].copy()
-sel_meses_p = sorted([str(m).strip() for m in idx_p["MÊS"] if str(m).strip()])
-
-if sel_meses:
-    idx_q = idx_q[idx_q["MÊS"].isin(sel_meses)]
-if sel_meses_p:
-    idx_p = idx_p[idx_p["MÊS"].isin(sel_meses_p)]
-
-dq_all, ok_q, er_q = [], [], []
-for _, r in idx_q.iterrows():
-    sid = _sheet_id(r["URL"])
-    if not sid: continue
-    try:
-        dq, ttl = read_quality_month(sid)
-        if not dq.empty: dq_all.append(dq)
-        ok_q.append(f"✅ {ttl} — {len(dq):,} linhas".replace(",", "."))
-    except Exception as e:
-        er_q.append((sid, e))
-
-dp_all, metas_all, ok_p, er_p = [], [], [], []
-for _, r in idx_p.iterrows():
-    sid = _sheet_id(r["URL"])
-    ym  = _ym_token(r.get("MÊS", ""))
-    if not sid: continue
-    try:
-        dp, dm, ttl = read_prod_month(sid, ym=ym)
-        if not dp.empty:    dp_all.append(dp)
-        if not dm.empty:    metas_all.append(dm)
-        ok_p.append(f"✅ {ttl} — {len(dp):,} linhas")
-    except Exception as e:
-        er_p.append((sid, e))
+def _active_months(carga: Optional[list] = None):
+    """Meses ativos dos dois índices: ([(ID Qualidade, "AAAA-MM")], [(ID Produção, "AAAA-MM")]).
+
+    `carga` recebe os registros de tempo/cache das leituras (ver painel/perf.py).
+    """
+    idx_versions = _versions(carga, "índices", (QUAL_INDEX_ID, PROD_INDEX_ID))
+
+    read = perf.timed(read_index, carga, tipo="indice", arquivo=QUAL_INDEX_ID)
+    idx_q = read(sheet_id=QUAL_INDEX_ID, version=_rev_token(QUAL_INDEX_ID, idx_versions))
+    if "ATIVO" in idx_q.columns:
+        idx_q = idx_q[idx_q["ATIVO"].map(_yes)].copy()
+    sel_meses = sorted([str(m).strip() for m in idx_q["MÊS"] if str(m).strip()])
+
+    read = perf.timed(read_index, carga, tipo="indice", arquivo=PROD_INDEX_ID)
+    idx_p = read(sheet_id=PROD_INDEX_ID, version=_rev_token(PROD_INDEX_ID, idx_versions))
+    if "ATIVO" in idx_p.columns:
+        idx_p = idx_p[idx_p["ATIVO"].map(_yes)].copy()
+    sel_meses_p = sorted([str(m).strip() for m in idx_p["MÊS"] if str(m).strip()])
+
+    if sel_meses:
+        idx_q = idx_q[idx_q["MÊS"].isin(sel_meses)]
+    if sel_meses_p:
+        idx_p = idx_p[idx_p["MÊS"].isin(sel_meses_p)]
+
+    sids_q = [(sid, _ym_token(m)) for sid, m in zip(map(_sheet_id, idx_q["URL"]), idx_q["MÊS"]) if sid]
+    sids_p = [(sid, _ym_token(m)) for sid, m in zip(map(_sheet_id, idx_p["URL"]), idx_p["MÊS"]) if sid]
+    return sids_q, sids_p
+
+def _run_parallel(jobs, max_workers: int = LOAD_MAX_WORKERS):
+    """Executa os jobs (chave, função, kwargs) num pool limitado de threads.
+
+    Retorna (ok, erros) na ordem original dos jobs: ok = [(chave, resultado)],
+    erros = [(chave, exceção)]. Uma falha não derruba os demais meses.
+    """
+    if not jobs:
+        return [], []
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+
+    def _call(fn, kwargs):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(**kwargs)
+
+    results = [None] * len(jobs)
+    workers = min(max_workers, len(jobs))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="carga-mes") as ex:
+        futs = {ex.submit(_call, fn, kw): i for i, (_, fn, kw) in enumerate(jobs)}
+        for fut in as_completed(futs):
+            i = futs[fut]
+            try:
+                results[i] = (True, fut.result())
+            except Exception as e:
+                results[i] = (False, e)
+
+    ok, erros = [], []
+    for (key, _, _), (success, val) in zip(jobs, results):
+        (ok if success else erros).append((key, val))
+    return ok, erros
+
+@st.cache_resource(show_spinner=False)
+def _last_good() -> dict:
+    """Último resultado bom de cada mês neste processo: {("Q"|"P", ID): resultado de read_*_month}."""
+    return {}
+
+def _stored_copy(kind: str, sid: str):
+    """Última versão do mês no cache em disco (após reinício), no formato de read_*_month."""
+    hit = MONTH_STORE.latest("qualidade" if kind == "Q" else "producao", sid)
+    if hit is None:
+        return None
+    frames, info = hit
+    if kind == "Q":
+        return frames["dados"], info.get("title", sid)
+    return frames["dados"], frames["metas"], info.get("title", sid)
+
+def _assemble(dq_all, dp_all, metas_all, revisits: RevisitIndex):
+    """Bases concatenadas, tipadas e compactadas + cubos diários (uma vez por versão dos dados)."""
+    return assemble(dq_all, dp_all, metas_all, revisits)
+
+def _build_snapshot(prev: Optional[Snapshot], months: Optional[tuple] = None,
+                    revisits: Optional[RevisitIndex] = None) -> Snapshot:
+    """Carga completa: índices → meses (só o que mudou é baixado) → bases e cubos.
+
+    A versão é a lista de meses com seus modifiedTime; se for a mesma de `prev`
+    (e a carga anterior não teve falhas), devolve `prev` sem ler nenhum mês.
+    `months` ("AAAA-MM", ...) restringe a carga a uma janela (modo preguiçoso);
+    meses sem MÊS reconhecível no índice entram sempre. `revisits` é o índice
+    de IS_REV dessa base.
+    """
+    carga = []
+    revisits = revisits if revisits is not None else _revisit_indexes().get(months)
+    sids_q, sids_p = _active_months(carga)
+    _trim_tails({sid for sid, _ in sids_p})     # mês que saiu do índice não guarda mais cópia
+    if months is not None:
+        sids_q = [(sid, ym) for sid, ym in sids_q if ym is None or ym in months]
+        sids_p = [(sid, ym) for sid, ym in sids_p if ym is None or ym in months]
+
+    # Uma checagem barata de modifiedTime para todos os meses; só o que mudou é baixado.
+    month_versions = _versions(carga, "meses", tuple([sid for sid, _ in sids_q] + [sid for sid, _ in sids_p]))
+
+    jobs = []
+    for sid, _ in sids_q:
+        jobs.append((("Q", sid), perf.timed(read_quality_month, carga, tipo="qualidade", arquivo=sid),
+                     {"month_id": sid, "version": _rev_token(sid, month_versions)}))
+    for sid, ym in sids_p:
+        jobs.append((("P", sid), perf.timed(read_prod_month, carga, tipo="producao", arquivo=sid),
+                     {"month_sheet_id": sid, "ym": ym, "version": _rev_token(sid, month_versions)}))
+
+    data_key = "|".join(f"{kind}:{sid}:{kw.get('version', '')}" for (kind, sid), _, kw in jobs)
+    if prev is not None and prev.version == data_key and not (prev.report["er_q"] or prev.report["er_p"]):
+        return prev
+    if prev is None:
+        stored = _stored_snapshot(data_key, months)   # deixado pelo warmup.py ou pela execução anterior
+        if stored is not None:
+            return stored
+
+    res_ok, res_err = _run_parallel(jobs)
+
+    # Mês que falhou (mesmo após novas tentativas / disjuntor aberto) entra com a última cópia boa,
+    # na mesma posição e com a mesma chave (rev token) que teria: a ordem dos meses desempata o IS_REV.
+    good = _last_good()
+    fresh, failed = dict(res_ok), dict(res_err)
+    dq_all, ok_q, er_q = [], [], []
+    dp_all, metas_all, ok_p, er_p, stale, stale_keys = [], [], [], [], [], []
+    for (kind, sid), _, kw in jobs:
+        month_key, mark = f"{sid}@{kw.get('version', '')}", "✅"
+        if (kind, sid) in fresh:
+            res = good[(kind, sid)] = fresh[(kind, sid)]
+        else:
+            (er_q if kind == "Q" else er_p).append((sid, failed[(kind, sid)]))
+            res = good.get((kind, sid)) or _stored_copy(kind, sid)
+            if res is None:
+                continue
+            mark = "⚠️ cópia anterior:"
+            stale.append(sid)
+            stale_keys.append(month_key)
+            metrics.STALE_SERVED.inc(tipo="qualidade" if kind == "Q" else "producao")
+        if kind == "Q":
+            dq, ttl = res
+            if not dq.empty: dq_all.append(dq)
+            ok_q.append(f"{mark} {ttl} — {len(dq):,} linhas".replace(",", "."))
+        else:
+            dp, dm, ttl = res
+            if not dp.empty:    dp_all.append((month_key, dp))
+            if not dm.empty:    metas_all.append(dm)
+            ok_p.append(f"{mark} {ttl} — {len(dp):,} linhas")
+
+    if not dq_all:
+        raise RuntimeError("Não consegui ler dados de Qualidade de nenhum mês.")
+
+    t0 = time.perf_counter()
+    dfQ, dfP, dfMetas, cubeQ, cubeP = _assemble(dq_all, dp_all, metas_all, revisits)
+    for month_key in stale_keys:    # a leitura de verdade dessa versão é resumida de novo
+        revisits.forget(month_key)
+    carga.append(perf.emit("carga", tipo="montagem", arquivo="bases e cubos",
+                           ms=round((time.perf_counter() - t0) * 1000, 1), linhas_out=len(dfQ) + len(dfP)))
+    report = {"ok_q": ok_q, "er_q": er_q, "ok_p": ok_p, "er_p": er_p, "carga": carga, "stale": stale}
+    snap = Snapshot(data_key, dfQ, dfP, dfMetas, cubeQ, cubeP, report=report)
+    if not (er_q or er_p):
+        _store_snapshot(snap, months)
+    return snap
+
+# Snapshot montado também vai para o disco: após deploy/restart, a 1ª sessão lê um
+# único conjunto pronto (bases compactas + cubos) em vez de remontar todos os meses.
+# SNAPSHOT_SCHEMA entra no ID e no meta.json: após um deploy que muda normalização,
+# assemble/cubos ou os frames gravados, o snapshot antigo não é mais encontrado.
+SNAPSHOT_FRAMES = ("dfQ", "dfP", "dfMetas", "cubeQ", "cubeP")
+SNAPSHOT_SCHEMA = f"dados{DATA_SCHEMA}-montagem{ASSEMBLE_VERSION}-" + ",".join(SNAPSHOT_FRAMES)
+
+def _snapshot_id(data_key: str) -> str:
+    return hashlib.sha1(f"{SNAPSHOT_SCHEMA}|{data_key}".encode("utf-8")).hexdigest()
+
+def _snapshot_slot(months: Optional[tuple]) -> str:
+    return "painel" if months is None else "janela-" + "_".join(months)
+
+def _stored_snapshot(data_key: str, months: Optional[tuple] = None) -> Optional[Snapshot]:
+    hit = MONTH_STORE.get("snapshot", _snapshot_slot(months), _snapshot_id(data_key))
+    if hit is None:
+        return None
+    frames, info = hit
+    if info.get("data_key") != data_key or info.get("snapshot_schema") != SNAPSHOT_SCHEMA \
+       or any(n not in frames for n in SNAPSHOT_FRAMES):
+        return None
+    report = {"ok_q": info.get("ok_q", []), "er_q": [], "ok_p": info.get("ok_p", []), "er_p": []}
+    return Snapshot(data_key, *(frames[n] for n in SNAPSHOT_FRAMES), report=report)
+
+def _store_snapshot(snap: Snapshot, months: Optional[tuple] = None) -> None:
+    frames = {n: getattr(snap, n) for n in SNAPSHOT_FRAMES}
+    info = {"data_key": snap.version, "snapshot_schema": SNAPSHOT_SCHEMA,
+            "ok_q": snap.report["ok_q"], "ok_p": snap.report["ok_p"]}
+    MONTH_STORE.put("snapshot", _snapshot_slot(months), _snapshot_id(snap.version), frames, info)
+
+@st.cache_resource(max_entries=6, show_spinner=False)
+def _dataset(months: Optional[tuple] = None) -> DatasetManager:
+    """Base única do processo: todas as sessões leem o mesmo snapshot; atualização em 2º plano.
+
+    Com `months` (modo preguiçoso) há um gerenciador por janela de meses, cada um
+    com o seu índice de IS_REV; quem fica sem leitura por DATASET_IDLE_SECONDS
+    para de se atualizar, e quem sai do cache (max_entries) tem a thread encerrada.
+    """
+    build = functools.partial(_build_snapshot, months=months, revisits=_revisit_indexes().get(months))
+    idle = None if months is None else DATASET_IDLE_SECONDS
+    return DatasetManager(build, interval=DATASET_REFRESH_SECONDS, idle_seconds=idle).start()
+
+@st.cache_resource(show_spinner=False)
+def _memo() -> TableMemo:
+    return TableMemo(MEMO_MAX_ENTRIES)
+
+@st.cache_resource(show_spinner=False)
+def _excel_memo() -> TableMemo:
+    return TableMemo(EXCEL_MAX_ENTRIES)
+
+def _month_select(ym_all) -> str:
+    label_map = {f"{m[5:]}/{m[:4]}": m for m in ym_all}
+    sel_label = st.selectbox("Mês de referência", options=list(label_map.keys()), index=len(ym_all)-1)
+    return label_map[sel_label]
+
+def _month_window(ym: str) -> tuple:
+    """Mês selecionado + anterior (comparativos; "ontem" no dia 1º cai no mês anterior)."""
+    prev = (pd.Period(ym, freq="M") - 1).strftime("%Y-%m")
+    return (prev, ym)
+
+ym_sel = None
+if LAZY_MONTHS:
+    # Seletor sai só do índice (coluna MÊS); os dados vêm depois, só da janela escolhida
+    ym_index = sorted({ym for _, ym in _active_months()[0] if ym})
+    if not ym_index:
+        st.error("Índice de Qualidade sem MÊS válido (MM/AAAA ou AAAA-MM)."); st.stop()
+    ym_sel = _month_select(ym_index)
+
+PAGE.step("carga")
+try:
+    with st.spinner("Carregando meses..."):
+        snap = _dataset(_month_window(ym_sel) if ym_sel else None).current()
+except RuntimeError as e:
+    st.error(str(e)); st.stop()
+
+# Frames compartilhados entre sessões: somente leitura (recortes via FilterSpec.view / assign)
+dfQ, dfP, dfMetas, cubeQ, cubeP = snap.dfQ, snap.dfP, snap.dfMetas, snap.cubeQ, snap.cubeP
+PAGE.rows(rows_out=len(dfQ))
+
+n_failed = len(snap.report["er_q"]) + len(snap.report["er_p"])
+if n_failed:
+    n_stale = len(snap.report.get("stale") or [])
+    st.warning(f"⚠️ {n_failed} arquivo(s) do Drive não puderam ser lidos agora"
+               + (f"; {n_stale} exibido(s) com a última cópia boa" if n_stale else "")
+               + (f"; {n_failed - n_stale} fora do painel (dados parciais)" if n_failed > n_stale else "")
+               + ". Nova tentativa na próxima atualização.")
 
 if show_tech:
+    ok_q, er_q, ok_p, er_p = (snap.report[k] for k in ("ok_q", "er_q", "ok_p", "er_p"))
     if ok_q: st.success("Qualidade conectado em:\n\n- " + "\n- ".join(ok_q))
     if er_q:
         with st.expander("Falhas (Qualidade)"):
@@ -371,33 +609,26 @@ if show_tech:
         with st.expander("Falhas (Produção)"):
             for sid, e in er_p: st.write(sid); st.exception(e)
 
-if not dq_all:
-    st.error("Não consegui ler dados de Qualidade de nenhum mês."); st.stop()
-
-dfQ = pd.concat(dq_all, ignore_index=True)
-dfP = pd.concat(dp_all, ignore_index=True) if dp_all else pd.DataFrame(columns=["VISTORIADOR","__DATA__","IS_REV","UNIDADE"])
-dfMetas = pd.concat(metas_all, ignore_index=True) if metas_all else pd.DataFrame(columns=["VISTORIADOR","UNIDADE","META_MENSAL","DIAS_UTEIS","YM"])
-
 
 # ------------------ FILTROS PRINCIPAIS ------------------
-if "EMPRESA" in dfQ.columns:
-    dfQ = dfQ[dfQ["EMPRESA"] == "STARCHECK"].copy()
-
-s_all_dt = pd.to_datetime(dfQ["DATA"], errors="coerce")
-ym_all = sorted(s_all_dt.dt.to_period("M").dropna().astype(str).unique().tolist())
-if not ym_all:
-    st.error("Qualidade sem colunas de Data válidas."); st.stop()
-
-label_map = {f"{m[5:]}/{m[:4]}": m for m in ym_all}
-sel_label = st.selectbox("Mês de referência", options=list(label_map.keys()), index=len(ym_all)-1)
-ym_sel = label_map[sel_label]
+PAGE.step("filtros", rows_in=len(dfQ))
+
+s_all_dt = dfQ[QUALITY_DATE]
+if ym_sel is None:
+    ym_all = sorted(s_all_dt.dt.to_period("M").dropna().astype(str).unique().tolist())
+    if not ym_all:
+        st.error("Qualidade sem colunas de Data válidas."); st.stop()
+    ym_sel = _month_select(ym_all)
 ref_year, ref_month = int(ym_sel[:4]), int(ym_sel[5:7])
 
-mask_mes = (s_all_dt.dt.year.eq(ref_year) & s_all_dt.dt.month.eq(ref_month))
-dfQ_mes = dfQ[mask_mes].copy()
+month_start = date(ref_year, ref_month, 1)
+last_day = calendar.monthrange(ref_year, ref_month)[1]
+month_end = date(ref_year, ref_month, last_day)
 
-s_mes_dates = pd.to_datetime(dfQ_mes["DATA"], errors="coerce").dt.date
-min_d, max_d = min(s_mes_dates.dropna()), max(s_mes_dates.dropna())
+s_mes = s_all_dt[period_mask(s_all_dt, month_start, month_end)]
+if s_mes.empty:
+    st.warning("Sem linhas de Qualidade com data válida no mês selecionado."); st.stop()
+min_d, max_d = s_mes.min().date(), s_mes.max().date()
 col1, col2 = st.columns([1.2, 2.8])
 with col1:
     drange = st.date_input(
@@ -407,12 +638,11 @@ with col1:
     )
 
 start_d, end_d = (drange if isinstance(drange, tuple) and len(drange)==2 else (min_d, max_d))
-mask_dias = s_mes_dates.map(lambda d: isinstance(d, date) and start_d <= d <= end_d)
-viewQ = dfQ_mes[mask_dias].copy()
+mask_dias = FilterSpec.build(start_d, end_d).mask(dfQ, QUALITY_DATE)
 
 # -------- Filtros extras --------
-unids = sorted(viewQ["UNIDADE"].dropna().unique().tolist()) if "UNIDADE" in viewQ.columns else []
-vist_opts = sorted(viewQ["VISTORIADOR"].dropna().unique().tolist()) if "VISTORIADOR" in viewQ.columns else []
+unids = sorted(dfQ.loc[mask_dias, "UNIDADE"].dropna().unique().tolist()) if "UNIDADE" in dfQ.columns else []
+vist_opts = sorted(dfQ.loc[mask_dias, "VISTORIADOR"].dropna().unique().tolist()) if "VISTORIADOR" in dfQ.columns else []
 
 with col2:
     c21, c22 = st.columns(2)
@@ -421,76 +651,36 @@ with col2:
     with c22:
         f_vists = st.multiselect("Vistoriadores (opcional)", vist_opts)
 
-if f_unids and "UNIDADE" in viewQ.columns:
-    viewQ = viewQ[viewQ["UNIDADE"].isin([_upper(u) for u in f_unids])]
-if f_vists:
-    viewQ = viewQ[viewQ["VISTORIADOR"].isin([_upper(v) for v in f_vists])]
+# Um único recorte (período + unidades + vistoriadores) reaproveitado por todas as seções
+flt = FilterSpec.build(start_d, end_d, f_unids, f_vists)
+# Cálculo de todas as seções (sem Streamlit): painel/analytics.py; aqui só se desenha
+pv = PanelView(dfQ, dfMetas, cubeQ, cubeP, flt, ym_sel)
+viewQ = pv.viewQ
 
 if viewQ.empty:
     st.info("Sem registros de Qualidade no período/filtros."); st.stop()
 
-# -------- Produção alinhada --------
-if not dfP.empty:
-    s_p_dates_all = pd.to_datetime(dfP["__DATA__"], errors="coerce").dt.date
-    maskp_mes = s_p_dates_all.map(lambda d: isinstance(d, date) and d.year == ref_year and d.month == ref_month)
-    viewP = dfP[maskp_mes].copy()
-
-    s_p_dates_mes = pd.to_datetime(viewP["__DATA__"], errors="coerce").dt.date
-    maskp_dias = s_p_dates_mes.map(lambda d: isinstance(d, date) and start_d <= d <= end_d)
-    viewP = viewP[maskp_dias].copy()
+# Tabelas derivadas memorizadas por (versão da base, mês, recorte): widgets que não
+# mudam o recorte (Pareto, detalhamento, abas) não as recalculam
+memo = _memo()
+memo_key = (snap.version, ym_sel, flt)
+n_view = len(viewQ)
+PAGE.rows(rows_out=n_view)
 
-    if f_unids and "UNIDADE" in viewP.columns:
-        viewP = viewP[viewP["UNIDADE"].isin([_upper(u) for u in f_unids])]
-    if f_vists and "VISTORIADOR" in viewP.columns:
-        viewP = viewP[viewP["VISTORIADOR"].isin([_upper(v) for v in f_vists])]
-else:
-    viewP = dfP.copy()
+def _table(name, key, build):
+    """memo.get medido: tempo de cálculo, acerto/falta e linhas vão para a seção corrente."""
+    return PAGE.memo(memo, name, key, build)
 
 
 # ------------------ KPIs ------------------
-grav_gg = {"GRAVE", "GRAVISSIMO", "GRAVÍSSIMO"}
-total_erros = int(len(viewQ))
-total_gg = int(viewQ["GRAVIDADE"].isin(grav_gg).sum()) if "GRAVIDADE" in viewQ.columns else 0
-vist_avaliados = int(viewQ["VISTORIADOR"].nunique()) if "VISTORIADOR" in viewQ.columns else 0
-media_por_vist = (total_erros / vist_avaliados) if vist_avaliados else 0
-
-if "GRAVIDADE" in viewQ.columns:
-    gg_by_vist = (
-        viewQ[viewQ["GRAVIDADE"].isin(grav_gg)]
-        .groupby("VISTORIADOR")["ERRO"].size().reset_index(name="GG")
-    )
-    vist_5gg = int((gg_by_vist["GG"] >= 5).sum())
-else:
-    vist_5gg = 0
-
-total_vist_brutas = int(len(viewP)) if not viewP.empty else 0
-taxa_geral = (total_erros / total_vist_brutas * 100) if total_vist_brutas else np.nan
-taxa_geral_str = "—" if np.isnan(taxa_geral) else f"{taxa_geral:.1f}%".replace(".", ",")
-
-# % GG sobre produção bruta
-taxa_gg_bruta = (total_gg / total_vist_brutas * 100) if total_vist_brutas else np.nan
-taxa_gg_bruta_str = "—" if np.isnan(taxa_gg_bruta) else f"{taxa_gg_bruta:.1f}%".replace(".", ",")
+PAGE.step("cards", rows_in=n_view)
+kpi = _table("kpis", memo_key, pv.kpis)
+taxa_geral_str = "—" if np.isnan(kpi["taxa_geral"]) else f"{kpi['taxa_geral']:.1f}%".replace(".", ",")
+taxa_gg_bruta_str = "—" if np.isnan(kpi["taxa_gg_bruta"]) else f"{kpi['taxa_gg_bruta']:.1f}%".replace(".", ",")
 
 # ---- Comparativo com mesmo intervalo do mês anterior (para os cards) ----
 periodo_atual_ini, periodo_atual_fim = start_d, end_d
-prev_ini = (pd.Timestamp(periodo_atual_ini) - relativedelta(months=1)).date()
-prev_fim = (pd.Timestamp(periodo_atual_fim) - relativedelta(months=1)).date()
-
-dfQ["_DT_"] = pd.to_datetime(dfQ["DATA"], errors="coerce").dt.date
-mask_prev = dfQ["_DT_"].between(prev_ini, prev_fim)
-prev_base_cards = dfQ[mask_prev].copy()
-if "UNIDADE" in prev_base_cards.columns and len(f_unids):
-    prev_base_cards = prev_base_cards[prev_base_cards["UNIDADE"].isin([_upper(u) for u in f_unids])]
-if "VISTORIADOR" in prev_base_cards.columns and len(f_vists):
-    prev_base_cards = prev_base_cards[prev_base_cards["VISTORIADOR"].isin([_upper(v) for v in f_vists])]
-
-prev_total = int(len(prev_base_cards))
-prev_gg = int(prev_base_cards["GRAVIDADE"].isin(grav_gg).sum()) if "GRAVIDADE" in prev_base_cards.columns else 0
-
-def _pct_delta(cur, prev):
-    if prev <= 0:
-        return None
-    return (cur - prev) / prev * 100.0
+prev_ini, prev_fim = pv.prev_period
 
 def _badge_html(delta_pct, prev_value):
     if delta_pct is None:
@@ -503,37 +693,8 @@ def _badge_html(delta_pct, prev_value):
     prev_txt = f"<small>mês ant: {prev_value:,}</small>".replace(",", ".")
     return f"<span class='sub {cls}'>{txt} {prev_txt}</span>"
 
-delta_total = _pct_delta(total_erros, prev_total)
-delta_gg    = _pct_delta(total_gg, prev_gg)
-badge_total = _badge_html(delta_total, prev_total)
-badge_gg    = _badge_html(delta_gg, prev_gg)
-
-# ---- Projeções do mês (marca) ----
-month_start = date(ref_year, ref_month, 1)
-last_day = calendar.monthrange(ref_year, ref_month)[1]
-month_end = date(ref_year, ref_month, last_day)
-
-dfQ["_DTONLY_"] = pd.to_datetime(dfQ["DATA"], errors="coerce").dt.date
-mask_mtd = dfQ["_DTONLY_"].between(month_start, min(end_d, month_end))
-mtd_all = dfQ[mask_mtd].copy()
-if "UNIDADE" in mtd_all.columns and len(f_unids):
-    mtd_all = mtd_all[mtd_all["UNIDADE"].isin([_upper(u) for u in f_unids])]
-if "VISTORIADOR" in mtd_all.columns and len(f_vists):
-    mtd_all = mtd_all[mtd_all["VISTORIADOR"].isin([_upper(v) for v in f_vists])]
-
-erros_mtd_total = int(len(mtd_all))
-erros_mtd_gg = int(mtd_all["GRAVIDADE"].isin(grav_gg).sum()) if "GRAVIDADE" in mtd_all.columns else 0
-
-dias_passados = business_days_count(month_start, min(end_d, month_end))
-dias_totais_fallback = business_days_count(month_start, month_end)
-
-def _proj(cur_mtd):
-    if dias_passados == 0:
-        return cur_mtd
-    return int(round(cur_mtd / dias_passados * dias_totais_fallback))
-
-proj_total = _proj(erros_mtd_total)
-proj_gg = _proj(erros_mtd_gg)
+badge_total = _badge_html(kpi["delta_total"], kpi["prev_total"])
+badge_gg    = _badge_html(kpi["delta_gg"], kpi["prev_gg"])
 
 # ------------------ CARDS ------------------
 cards_html = """
@@ -581,19 +742,19 @@ cards_html = """
   </div>
 </div>
 """.format(
-    total_erros=f"{total_erros:,}".replace(",", "."),
+    total_erros=f"{kpi['total_erros']:,}".replace(",", "."),
     badge_total=badge_total,
-    vist_5gg=f"{vist_5gg:,}".replace(",", "."),
-    total_gg=f"{total_gg:,}".replace(",", "."),
+    vist_5gg=f"{kpi['vist_5gg']:,}".replace(",", "."),
+    total_gg=f"{kpi['total_gg']:,}".replace(",", "."),
     badge_gg=badge_gg,
-    vist_avaliados=f"{vist_avaliados:,}".replace(",", "."),
-    media_por_vist=f"{media_por_vist:.1f}".replace(".", ","),
+    vist_avaliados=f"{kpi['vist_avaliados']:,}".replace(",", "."),
+    media_por_vist=f"{kpi['media_por_vist']:.1f}".replace(".", ","),
     taxa_geral=taxa_geral_str,
     taxa_gg_bruta=taxa_gg_bruta_str,
-    proj_total=f"{proj_total:,}".replace(",", "."),
-    proj_gg=f"{proj_gg:,}".replace(",", "."),
-    mtd_total=f"{erros_mtd_total:,}".replace(",", "."),
-    mtd_gg=f"{erros_mtd_gg:,}".replace(",", "."),
+    proj_total=f"{kpi['proj_total']:,}".replace(",", "."),
+    proj_gg=f"{kpi['proj_gg']:,}".replace(",", "."),
+    mtd_total=f"{kpi['mtd_total']:,}".replace(",", "."),
+    mtd_gg=f"{kpi['mtd_gg']:,}".replace(",", "."),
 )
 st.markdown(cards_html, unsafe_allow_html=True)
 
@@ -605,6 +766,7 @@ denom_mode = st.radio(
 )
 
 # ------------------ HOJE x ONTEM (ATÉ AGORA) ------------------
+PAGE.step("hoje_ontem", rows_in=n_view)
 st.markdown('<div class="section">⏱️ Hoje vs Ontem (até agora)</div>', unsafe_allow_html=True)
 
 try:
@@ -636,9 +798,7 @@ def _as_naive_cutoff(dt_like):
     return ts
 
 if start_d == end_d == today_local:
-    df_today = viewQ.copy()
-    if "DATA_TS" not in df_today.columns:
-        df_today["DATA_TS"] = pd.to_datetime(df_today["DATA"], errors="coerce")
+    df_today = viewQ
 
     ts_today = _as_naive_ts(df_today["DATA_TS"])
     have_time_today = ts_today.dt.hour.notna().any()
@@ -650,16 +810,7 @@ if start_d == end_d == today_local:
     else:
         df_today_now = df_today
 
-    df_all = dfQ.copy()
-    mask_yesterday = pd.to_datetime(df_all["DATA"], errors="coerce").dt.date.eq(yesterday_local)
-    df_yest = df_all[mask_yesterday].copy()
-    if len(f_unids) and "UNIDADE" in df_yest.columns:
-        df_yest = df_yest[df_yest["UNIDADE"].isin([_upper(u) for u in f_unids])]
-    if len(f_vists) and "VISTORIADOR" in df_yest.columns:
-        df_yest = df_yest[df_yest["VISTORIADOR"].isin([_upper(v) for v in f_vists])]
-
-    if "DATA_TS" not in df_yest.columns:
-        df_yest["DATA_TS"] = pd.to_datetime(df_yest["DATA"], errors="coerce")
+    df_yest = flt.view(dfQ, QUALITY_DATE, period=(yesterday_local, yesterday_local))
 
     ts_yest = _as_naive_ts(df_yest["DATA_TS"])
     have_time_yest = ts_yest.dt.hour.notna().any()
@@ -704,38 +855,18 @@ def bar_with_labels(df, x_col, y_col, x_title="", y_title="QTD", height=320):
 
 c1, c2 = st.columns(2)
 
+PAGE.step("unidades", rows_in=n_view)
 if "UNIDADE" in viewQ.columns:
     with c1:
         st.markdown('<div class="section">🏙️ Erros por unidade</div>', unsafe_allow_html=True)
 
+        by_city, y2_title, by_city_gg, y2_title_gg = _table("cidades", memo_key, pv.city_tables)
+
         # duas colunas: TOTAL (à esquerda) e GG (à direita)
         g_tot, g_gg = st.columns(2)
 
         # ---------- TOTAL de erros por unidade ----------
         with g_tot:
-            by_city = (
-                viewQ.groupby("UNIDADE", dropna=False)["ERRO"].size().reset_index(name="QTD")
-            )
-
-            if not viewP.empty and "UNIDADE" in viewP.columns:
-                prod_city = (
-                    viewP.groupby("UNIDADE", dropna=False)["IS_REV"].size().reset_index(name="VIST")
-                )
-            else:
-                prod_city = pd.DataFrame(columns=["UNIDADE", "VIST"])
-
-            by_city = by_city.merge(prod_city, on="UNIDADE", how="left").fillna({"VIST": 0})
-            by_city["%ERRO"] = np.where(by_city["VIST"] > 0, (by_city["QTD"] / by_city["VIST"]) * 100, np.nan)
-
-            if by_city["%ERRO"].isna().all():
-                total_err = by_city["QTD"].sum()
-                by_city["%ERRO"] = np.where(total_err > 0, (by_city["QTD"] / total_err) * 100, np.nan)
-                y2_title = "% dos erros"
-            else:
-                y2_title = "% de erro (erros/vistorias)"
-
-            by_city["PCT"] = by_city["%ERRO"] / 100.0
-            by_city = by_city.sort_values("QTD", ascending=False).reset_index(drop=True)
             order = by_city["UNIDADE"].tolist()
 
             bars = (
@@ -771,34 +902,6 @@ if "UNIDADE" in viewQ.columns:
 
         # ---------- Somente GRAVE + GRAVÍSSIMO por unidade ----------
         with g_gg:
-            mask_gg = viewQ["GRAVIDADE"].astype(str).str.upper().isin(grav_gg) if "GRAVIDADE" in viewQ.columns else pd.Series(False, index=viewQ.index)
-            viewQ_gg = viewQ[mask_gg]
-
-            by_city_gg = (
-                viewQ_gg.groupby("UNIDADE", dropna=False)["ERRO"].size().reset_index(name="QTD_GG")
-            )
-
-            if not viewP.empty and "UNIDADE" in viewP.columns:
-                prod_city = (
-                    viewP.groupby("UNIDADE", dropna=False)["IS_REV"].size().reset_index(name="VIST")
-                )
-            else:
-                prod_city = pd.DataFrame(columns=["UNIDADE", "VIST"])
-
-            by_city_gg = by_city_gg.merge(prod_city, on="UNIDADE", how="left").fillna({"VIST": 0})
-
-            by_city_gg["%ERRO_GG"] = np.where(by_city_gg["VIST"] > 0,
-                                              (by_city_gg["QTD_GG"] / by_city_gg["VIST"]) * 100, np.nan)
-            if by_city_gg["%ERRO_GG"].isna().all():
-                total_gg_global = by_city_gg["QTD_GG"].sum()
-                by_city_gg["%ERRO_GG"] = np.where(total_gg_global > 0,
-                                                  (by_city_gg["QTD_GG"] / total_gg_global) * 100, np.nan)
-                y2_title_gg = "% dos erros GG"
-            else:
-                y2_title_gg = "% de erro GG (GG/vistorias)"
-
-            by_city_gg["PCT_GG"] = by_city_gg["%ERRO_GG"] / 100.0
-            by_city_gg = by_city_gg.sort_values("QTD_GG", ascending=False).reset_index(drop=True)
             order_gg = by_city_gg["UNIDADE"].tolist()
 
             bars_gg = (
@@ -832,40 +935,22 @@ if "UNIDADE" in viewQ.columns:
             st.subheader("Grave + Gravíssimo")
             st.altair_chart(chart_gg, use_container_width=True)
 
+PAGE.step("gravidade", rows_in=n_view)
 if "GRAVIDADE" in viewQ.columns:
     with c2:
         st.markdown('<div class="section">🧲 Erros por gravidade</div>', unsafe_allow_html=True)
-        by_grav = (viewQ.groupby("GRAVIDADE", dropna=False)["ERRO"]
-                   .size().reset_index(name="QTD").sort_values("QTD", ascending=False))
+        by_grav = _table("gravidade", memo_key, pv.by_gravidade)
         if len(by_grav):
             st.altair_chart(bar_with_labels(by_grav, "GRAVIDADE", "QTD", x_title="GRAVIDADE", height=340),
                             use_container_width=True)
 
 # ------------------ TOP 5 ERROS GRAVES / GRAVÍSSIMOS ------------------
+PAGE.step("top5_grave", rows_in=n_view)
 st.markdown("---")
 st.markdown('<div class="section">🥇 Top 5 — erros GRAVE e GRAVÍSSIMO</div>', unsafe_allow_html=True)
 
 if "GRAVIDADE" in viewQ.columns:
-    grav_alias_gravissimo = {"GRAVISSIMO", "GRAVÍSSIMO"}
-
-    mask_grave = viewQ["GRAVIDADE"].astype(str).str.upper().eq("GRAVE")
-    mask_gravissimo = viewQ["GRAVIDADE"].astype(str).str.upper().isin(grav_alias_gravissimo)
-
-    top_grave = (
-        viewQ[mask_grave]
-        .groupby("ERRO", dropna=False)["ERRO"].size()
-        .reset_index(name="QTD")
-        .sort_values("QTD", ascending=False)
-        .head(5)
-    )
-
-    top_gravissimo = (
-        viewQ[mask_gravissimo]
-        .groupby("ERRO", dropna=False)["ERRO"].size()
-        .reset_index(name="QTD")
-        .sort_values("QTD", ascending=False)
-        .head(5)
-    )
+    top_grave, top_gravissimo = _table("top5_grave", memo_key, pv.top5_grave)
 
     cG, cGG = st.columns(2)
     with cG:
@@ -895,10 +980,11 @@ if not fast_mode:
     ex1, ex2 = st.columns(2)
 
     # ===== PARETO (corrigido: caso 1 categoria não usa slider) =====
-    with ex1:
+    @timed_fragment
+    def _pareto():
         st.markdown('<div class="section">📈 Pareto de erros</div>', unsafe_allow_html=True)
 
-        n_err = int(viewQ["ERRO"].nunique()) if "ERRO" in viewQ.columns else 0
+        n_err = pv.error_kinds()
         if n_err == 0:
             st.info("Sem dados para montar o Pareto no período/filtros atuais.")
         else:
@@ -917,22 +1003,11 @@ if not fast_mode:
                         step=1, key=f"pareto_cats_{ref_year}{ref_month}",
                     )
 
-                pareto = (
-                    viewQ.groupby("ERRO", sort=False)["ERRO"]
-                    .size()
-                    .reset_index(name="QTD")
-                    .sort_values("QTD", ascending=False)
-                    .head(top_cats)
-                    .reset_index(drop=True)
-                )
+                pareto = _table("pareto", memo_key + (top_cats,), lambda: pv.pareto(top_cats))
 
                 if pareto.empty:
                     st.info("Sem dados para montar o Pareto no período/filtros atuais.")
                 else:
-                    pareto["ACUM"] = pareto["QTD"].cumsum()
-                    total = pareto["QTD"].sum()
-                    pareto["%ACUM"] = pareto["ACUM"] / total * 100
-
                     x_enc = alt.X(
                         "ERRO:N",
                         sort=alt.SortField(field="QTD", order="descending"),
@@ -988,49 +1063,23 @@ if not fast_mode:
                             key=f"pareto_reducao_{ref_year}{ref_month}",
                         )
 
-                    idx = min(topN_sim, max_topN) - 1
-                    frac = float(pareto["%ACUM"].iloc[idx]) / 100.0
-                    queda_total = frac * (reducao / 100.0) * 100.0
+                    frac, queda_total = pareto_gain(pareto, topN_sim, reducao)
 
                     st.info(
                         f"Os Top {topN_sim} explicam {frac*100:.1f}% do total. "
                         f"Se reduzir esses erros em {reducao}%, o total cai cerca de {queda_total:.1f}%."
                     )
 
+    PAGE.step("pareto", rows_in=n_view)
+    with ex1:
+        _pareto()
+
+    PAGE.step("heatmap", rows_in=n_view)
     with ex2:
         st.markdown('<div class="section">🗺️ Heatmap Cidade × Gravidade</div>', unsafe_allow_html=True)
         if ("UNIDADE" in viewQ.columns) and ("GRAVIDADE" in viewQ.columns):
-            # Erros por UNIDADE x GRAVIDADE
-            erros_city = (
-                viewQ.groupby(["UNIDADE", "GRAVIDADE"])["ERRO"]
-                .size()
-                .reset_index(name="QTD")
-            )
-
-            # Denominador: vistorias por cidade no mesmo recorte (Bruta/Líquida conforme rádio)
-            if not viewP.empty and "UNIDADE" in viewP.columns:
-                prod_city = (
-                    viewP.groupby("UNIDADE", dropna=False)
-                    .agg(vist=("IS_REV", "size"), rev=("IS_REV", "sum"))
-                    .reset_index()
-                )
-                prod_city["liq"] = prod_city["vist"] - prod_city["rev"]
-            else:
-                prod_city = pd.DataFrame({
-                    "UNIDADE": erros_city["UNIDADE"].unique(),
-                    "vist": 0, "rev": 0
-                })
-                prod_city["liq"] = 0
-
             denom_col = "liq" if denom_mode.startswith("Líquida") else "vist"
-
-            hm = erros_city.merge(
-                prod_city[["UNIDADE", denom_col]].rename(columns={denom_col: "DEN"}),
-                on="UNIDADE",
-                how="left",
-            )
-            hm["%_VIST"] = np.where(hm["DEN"] > 0, (hm["QTD"] / hm["DEN"]) * 100, np.nan)
-            hm["%_VIST_TXT"] = hm["%_VIST"].map(lambda x: "—" if pd.isna(x) else f"{x:.1f}%".replace(".", ","))
+            hm = _table("heatmap", memo_key + (denom_col,), lambda: pv.heatmap(denom_col == "liq"))
 
             rects = alt.Chart(hm).mark_rect().encode(
                 x=alt.X("GRAVIDADE:N", axis=alt.Axis(labelAngle=0, title="GRAVIDADE")),
@@ -1058,27 +1107,18 @@ if not fast_mode:
             st.info("Base sem colunas UNIDADE/GRAVIDADE.")
 
 # ------------------ TABELAS EXTRAS ------------------
+PAGE.step("tabelas_extras", rows_in=n_view)
 col_esq, col_dir = st.columns(2)
 
 with col_esq:
     st.markdown('<div class="section">♻️ Reincidência por vistoriador (≥3)</div>', unsafe_allow_html=True)
-    rec = (viewQ.groupby(["VISTORIADOR","ERRO"])["ERRO"]
-           .size().reset_index(name="QTD").sort_values("QTD", ascending=False))
-    rec = rec[rec["QTD"] >= 3]
+    rec = _table("reincidencia", memo_key, pv.recurrence)
     st.dataframe(rec, use_container_width=True, hide_index=True)
 
 with col_dir:
     st.markdown('<div class="section">⚖️ Calibração por analista (% GG)</div>', unsafe_allow_html=True)
-    if "ANALISTA" in viewQ.columns and "GRAVIDADE" in viewQ.columns:
-        ana = (
-            viewQ.assign(_gg=viewQ["GRAVIDADE"].isin(grav_gg).astype(int))
-                 .groupby("ANALISTA")["_gg"]
-                 .mean()
-                 .reset_index(name="%GG")
-        )
-        ana = ana.sort_values("%GG", ascending=False)
-        ana["%GG"] = (ana["%GG"] * 100).round(1)
-
+    ana = _table("calibracao", memo_key, pv.analyst_calibration)
+    if ana is not None:
         st.altair_chart(
             alt.Chart(ana).mark_bar().encode(
                 x=alt.X("ANALISTA:N", axis=alt.Axis(labelAngle=0, labelLimit=180)),
@@ -1089,98 +1129,22 @@ with col_dir:
         )
 
 st.markdown('<div class="section">📅 Erros por dia da semana</div>', unsafe_allow_html=True)
-dow_map = {0:"Seg",1:"Ter",2:"Qua",3:"Qui",4:"Sex",5:"Sáb",6:"Dom"}
-dow = pd.to_datetime(viewQ["DATA"], errors="coerce").dt.dayofweek.map(dow_map)
-dow_counts = dow.value_counts().reindex(list(dow_map.values()), fill_value=0)
-dow_df = pd.DataFrame({"DIA": dow_counts.index, "QTD": dow_counts.values})
+dow_df = _table("dia_semana", memo_key, pv.weekday_counts)
 if not dow_df.empty:
     st.altair_chart(bar_with_labels(dow_df, "DIA", "QTD", x_title="DIA DA SEMANA"),
                     use_container_width=True)
 
 
 # ------------------ % ERRO (casamento com Produção) ------------------
+PAGE.step("vistoriadores", rows_in=n_view)
 st.markdown("---")
 st.markdown('<div class="section">📐 % de erro por vistoriador</div>', unsafe_allow_html=True)
 denom_mode = st.session_state.get("denom_mode_global", "Bruta (recomendado)")
 
-# Metas e tolerância
-META_ERRO     = 3.5
-META_ERRO_GG  = 1.5
-TOL_AMARELO   = 0.5
-
-def _farol(pct, meta, tol=TOL_AMARELO):
-    if pd.isna(pct): return "—"
-    diff = pct - meta
-    if diff <= 0:      return "🟢"
-    if diff <= tol:    return "🟡"
-    return "🔴"
-
-# ------------------ PRODUÇÃO COM FALLBACK ------------------
-fallback_note = None
-
-def _make_prod(df_prod):
-    if df_prod.empty:
-        return pd.DataFrame(columns=["VISTORIADOR","vist","rev","liq"])
-    out = (
-        df_prod.groupby("VISTORIADOR", dropna=False)
-               .agg(vist=("IS_REV","size"), rev=("IS_REV","sum"))
-               .reset_index()
-    )
-    out["liq"] = out["vist"] - out["rev"]
-    return out
-
-prod = _make_prod(viewP)
-
-if prod["vist"].sum() == 0:
-    if not dfP.empty:
-        s_p_dates_all = pd.to_datetime(dfP["__DATA__"], errors="coerce").dt.date
-        mask_mes_all = s_p_dates_all.map(lambda d: isinstance(d, date) and d.year == ref_year and d.month == ref_month)
-        prod_month = dfP[mask_mes_all].copy()
-        if "UNIDADE" in prod_month.columns and len(f_unids):
-            prod_month = prod_month[prod_month["UNIDADE"].isin([_upper(u) for u in f_unids])]
-        if "VISTORIADOR" in prod_month.columns and len(f_vists):
-            prod_month = prod_month[prod_month["VISTORIADOR"].isin([_upper(v) for v in f_vists])]
-        prod = _make_prod(prod_month)
-        if prod["vist"].sum() > 0:
-            fallback_note = "Usando produção do mês (fallback), pois não houve produção no período selecionado."
-
-if prod["vist"].sum() == 0 and not dfP.empty:
-    prod = _make_prod(dfP.copy())
-    fallback_note = "Usando produção global (fallback), pois não há produção no mês/período selecionado."
-
-# ------------------ QUALIDADE ------------------
-qual = (
-    viewQ.groupby("VISTORIADOR", dropna=False)
-         .agg(erros=("ERRO","size"),
-              erros_gg=("GRAVIDADE", lambda s: s.isin(grav_gg).sum()))
-         .reset_index()
-)
-
-# ------------------ BASE FINAL ------------------
-base = prod.merge(qual, on="VISTORIADOR", how="outer").fillna(0)
-den = base["liq"] if denom_mode.startswith("Líquida") else base["vist"]
-den = den.replace({0: np.nan})
-
-base["%ERRO"]    = ((base["erros"]    / den) * 100).round(1)
-base["%ERRO_GG"] = ((base["erros_gg"] / den) * 100).round(1)
-base["FAROL_%ERRO"]    = base["%ERRO"].apply(lambda v: _farol(v, META_ERRO))
-base["FAROL_%ERRO_GG"] = base["%ERRO_GG"].apply(lambda v: _farol(v, META_ERRO_GG))
-
-# ------------------ FORMATAÇÃO E ORDENAÇÃO ------------------
-fmt = base.copy()
-for c in ["vist","rev","liq","erros","erros_gg"]:
-    fmt[c] = pd.to_numeric(fmt[c], errors="coerce").fillna(0).astype(int)
-
-def _fmt_val_pct(pct, emoji):
-    if pd.isna(pct): 
-        return "—"
-    return f"{emoji} {pct:.1f}%".replace(".", ",")
-
-fmt["%ERRO"]    = fmt.apply(lambda r: _fmt_val_pct(r["%ERRO"],    r["FAROL_%ERRO"]), axis=1)
-fmt["%ERRO_GG"] = fmt.apply(lambda r: _fmt_val_pct(r["%ERRO_GG"], r["FAROL_%ERRO_GG"]), axis=1)
-
-# Ordenação decrescente pelo valor numérico real (%ERRO)
-fmt_sorted = fmt.sort_values(by="%ERRO", key=lambda col: base.loc[col.index, "%ERRO"], ascending=False)
+# Produção com fallback (mês → global), base numérica e tabela com farol: painel/analytics.py
+denom_liq = denom_mode.startswith("Líquida")
+memo_key_den = memo_key + (denom_mode,)
+base, den, fmt_sorted, fallback_note = _table("vistoriadores", memo_key_den, lambda: pv.vist_tables(denom_liq))
 
 cols_view = ["VISTORIADOR","vist","rev","liq","erros","erros_gg","%ERRO","%ERRO_GG"]
 
@@ -1190,68 +1154,9 @@ st.dataframe(
     hide_index=True,
 )
 # ------------------ EXPORTAR EXCEL COM FAROL DE CORES ------------------
-try:
-    from openpyxl import Workbook
-    from openpyxl.styles import PatternFill, Alignment
-    ok_openpyxl = True
-except Exception:
-    ok_openpyxl = False
-
-if not ok_openpyxl:
-    st.warning("openpyxl não disponível — exportação colorida desativada.")
-else:
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Erros por Vistoriador"
-
-    # Cabeçalho
-    headers = ["VISTORIADOR","vist","rev","liq","erros","erros_gg","%ERRO","%ERRO_GG"]
-    ws.append(headers)
-
-    # Linhas (usamos o DataFrame já ordenado e com farol calculado)
-    for _, r in fmt_sorted.iterrows():
-        ws.append([
-            r["VISTORIADOR"],
-            int(r["vist"]), int(r["rev"]), int(r["liq"]),
-            int(r["erros"]), int(r["erros_gg"]),
-            r["%ERRO"], r["%ERRO_GG"]
-        ])
-
-    # Função para pintar células conforme o farol
-    def _fill_from_farol(emoji: str) -> PatternFill:
-        if isinstance(emoji, str) and "🟢" in emoji:
-            return PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        if isinstance(emoji, str) and "🟡" in emoji:
-            return PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
-        if isinstance(emoji, str) and "🔴" in emoji:
-            return PatternFill(start_color="F4CCCC", end_color="F4CCCC", fill_type="solid")
-        return PatternFill(fill_type=None)
-
-    # Aplicar cores nas colunas %ERRO (G) e %ERRO_GG (H)
-    for i, (_, r) in enumerate(fmt_sorted.iterrows(), start=2):
-        fill_total = _fill_from_farol(r.get("FAROL_%ERRO"))
-        fill_gg    = _fill_from_farol(r.get("FAROL_%ERRO_GG"))
-
-        ws[f"G{i}"].fill = fill_total
-        ws[f"H{i}"].fill = fill_gg
-
-        ws[f"G{i}"].alignment = Alignment(horizontal="center")
-        ws[f"H{i}"].alignment = Alignment(horizontal="center")
-
-    widths = {"A":28, "B":10, "C":10, "D":10, "E":10, "F":10, "G":12, "H":12}
-    for col, w in widths.items():
-        ws.column_dimensions[col].width = w
-
-    xbuf = io.BytesIO()
-    wb.save(xbuf)
-    xbuf.seek(0)
-
-    st.download_button(
-        label="📥 Baixar Excel com farol de cores",
-        data=xbuf,
-        file_name="erros_por_vistoriador.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+# O botão fica aqui; o fragmento é chamado no fim da página, quando as abas extras
+# (semanal, tendência, fraude) já existem
+excel_slot = st.container()
 
 # ------------------ LEGENDA ------------------
 with st.expander("Legenda do farol", expanded=False):
@@ -1263,58 +1168,27 @@ if fallback_note:
     st.caption(f"ℹ️ {fallback_note}")
     
 # ------------------ TENDÊNCIA DE ERROS (projeção) ------------------
+PAGE.step("tendencia", rows_in=n_view)
 st.markdown("---")
 st.markdown('<div class="section">📈 Tendência de erros (projeção até o fim do mês)</div>', unsafe_allow_html=True)
 
-mtd = mtd_all.copy()
-erros_mtd = (mtd.groupby("VISTORIADOR", dropna=False)["ERRO"]
-             .size().reset_index(name="ERROS_MTD"))
-
-ym_cur = f"{ref_year}-{ref_month:02d}"
-metas_cur = dfMetas[dfMetas["YM"].fillna("").astype(str) == ym_cur].copy() if "YM" in dfMetas.columns else dfMetas.copy()
-du_map = {}
-if not metas_cur.empty and "DIAS_UTEIS" in metas_cur.columns:
-    metas_cur["VISTORIADOR"] = metas_cur["VISTORIADOR"].astype(str).map(_upper)
-    for _, r in metas_cur.iterrows():
-        try:
-            du_map[r["VISTORIADOR"]] = int(r["DIAS_UTEIS"]) if pd.notna(r["DIAS_UTEIS"]) else None
-        except Exception:
-            pass
-
-rows = []
-for _, r in erros_mtd.iterrows():
-    v = r["VISTORIADOR"]; e_mtd = int(r["ERROS_MTD"])
-    du_total = du_map.get(v, dias_totais_fallback) or dias_totais_fallback
-    du_pass  = min(dias_passados, du_total) if du_total else dias_passados
-    erros_dia = (e_mtd / du_pass) if du_pass else np.nan
-    proj = int(round((erros_dia * du_total))) if not np.isnan(erros_dia) else e_mtd
-    rows.append({
-        "VISTORIADOR": v,
-        "Erros (MTD)": e_mtd,
-        "Erros/dia": round(erros_dia, 2) if not np.isnan(erros_dia) else 0.0,
-        "Dias úteis passados": int(du_pass),
-        "Dias úteis (mês)": int(du_total),
-        "Projeção (mês)": proj
-    })
-
-if rows:
-    tend_df = pd.DataFrame(rows).sort_values("Projeção (mês)", ascending=False)
+tend_df = _table("tendencia", memo_key, pv.trend)
+if not tend_df.empty:
     st.dataframe(tend_df, use_container_width=True, hide_index=True)
 else:
     st.info("Sem dados de erros no mês/período para calcular a tendência.")
 
 # ------------------ TABELA DETALHADA ------------------
-if not fast_mode:
-    st.markdown("---")
-    st.markdown('<div class="section">🧾 Detalhamento (linhas da base)</div>', unsafe_allow_html=True)
-
-    det = viewQ.copy()
+PAGE.step("detalhamento", rows_in=n_view)
+@timed_fragment
+def _detalhamento():
+    det = viewQ
     with st.expander("Filtros deste quadro (opcional)", expanded=False):
         c1, c2, c3 = st.columns(3)
         c4, c5, c6 = st.columns(3)
 
-        _d = pd.to_datetime(det["DATA"], errors="coerce").dt.date
-        _dmin, _dmax = (_d.min(), _d.max()) if _d.notna().any() else (date(2000,1,1), date(2000,1,1))
+        _d = det[QUALITY_DATE]
+        _dmin, _dmax = (_d.min().date(), _d.max().date()) if _d.notna().any() else (date(2000,1,1), date(2000,1,1))
         f_data = c1.date_input("Data (início e fim)", value=(_dmin, _dmax), min_value=_dmin, max_value=_dmax, format="DD/MM/YYYY")
 
         f_placa = c2.text_input("Placa (contém)", "")
@@ -1333,8 +1207,7 @@ if not fast_mode:
 
     if isinstance(f_data, tuple) and len(f_data) == 2:
         dini, dfim = f_data
-        _d = pd.to_datetime(det["DATA"], errors="coerce").dt.date
-        det = det[_d.between(dini, dfim)]
+        det = det[period_mask(det[QUALITY_DATE], dini, dfim)]
 
     if f_placa.strip():
         det = det[det["PLACA"].astype(str).str.contains(f_placa.strip(), case=False, na=False)]
@@ -1345,193 +1218,41 @@ if not fast_mode:
     if len(f_analista): det = det[det["ANALISTA"].isin(f_analista)]   if "ANALISTA"   in det.columns else det
 
     det_cols = ["DATA","UNIDADE","VISTORIADOR","PLACA","ERRO","GRAVIDADE","ANALISTA","OBS"]
-    for c in det_cols:
-        if c not in det.columns: det[c] = ""
-    det = det[det_cols].sort_values(["DATA","UNIDADE","VISTORIADOR"])
+    det = det.reindex(columns=det_cols, fill_value="").sort_values(["DATA","UNIDADE","VISTORIADOR"])
+    det["DATA"] = det["DATA"].dt.date
     st.dataframe(det, use_container_width=True, hide_index=True)
     st.caption('<div class="table-note">* Filtros desta tabela são independentes dos filtros do topo do painel.</div>', unsafe_allow_html=True)
 
+if not fast_mode:
+    st.markdown("---")
+    st.markdown('<div class="section">🧾 Detalhamento (linhas da base)</div>', unsafe_allow_html=True)
+    _detalhamento()
+
 # ------------------ COMPARATIVO ATUAL x MÊS ANTERIOR (MESMO INTERVALO) ------------------
+PAGE.step("comparativo", rows_in=n_view)
 st.markdown("---")
 st.markdown('<div class="section">📊 Comparativo por colaborador — período atual x mesmo período do mês anterior</div>', unsafe_allow_html=True)
 
-prev_base = prev_base_cards  # já calculado com filtros
-cur = (viewQ.groupby("VISTORIADOR", dropna=False)["ERRO"].size().reset_index(name="ERROS_ATUAL"))
-prev = (prev_base.groupby("VISTORIADOR", dropna=False)["ERRO"].size().reset_index(name="ERROS_ANT"))
-
-tab = cur.merge(prev, on="VISTORIADOR", how="outer").fillna(0)
-tab["Δ"] = tab["ERROS_ATUAL"] - tab["ERROS_ANT"]
-tab["VAR_%"] = np.where(tab["ERROS_ANT"] > 0, (tab["Δ"] / tab["ERROS_ANT"]) * 100, np.nan)
-
-def _status(delta):
-    if delta < 0: return "✅ Melhorou"
-    if delta > 0: return "❌ Piorou"
-    return "➡️ Igual"
-
-tab["Status"] = tab["Δ"].map(_status)
-tab_fmt = tab.copy()
-tab_fmt["VAR_%"] = tab_fmt["VAR_%"].map(lambda x: "—" if pd.isna(x) else f"{x:.1f}%".replace(".", ","))
+tab_cmp = _table("comparativo", memo_key, pv.compare_prev)
 
 st.caption(
     f"Período atual: {periodo_atual_ini:%d/%m/%Y} – {periodo_atual_fim:%d/%m/%Y}  •  "
     f"Período anterior: {prev_ini:%d/%m/%Y} – {prev_fim:%d/%m/%Y}"
 )
-st.dataframe(
-    tab_fmt.sort_values("ERROS_ATUAL", ascending=False)[
-        ["VISTORIADOR","ERROS_ATUAL","ERROS_ANT","Δ","VAR_%","Status"]
-    ],
-    use_container_width=True, hide_index=True,
-)
+st.dataframe(tab_cmp, use_container_width=True, hide_index=True)
 
 # ------------------ COMPARATIVO SEMANAL (2 a 4 semanas) ------------------
+PAGE.step("semanal", rows_in=n_view)
+weekly = None
 if not fast_mode:
     st.markdown("---")
     st.markdown("### 🔵 Comparativo semanal por vistoriador")
 
-    def _clip_month(di, dfim):
-        di = max(di, month_start)
-        dfim = min(dfim, month_end)
-        return di, dfim
-
-    def _slice_q(df, di, dfim):
-        d = pd.to_datetime(df["DATA"], errors="coerce").dt.date
-        return df[d.between(di, dfim)]
-
-    def _slice_p(df, di, dfim):
-        d = pd.to_datetime(df["__DATA__"], errors="coerce").dt.date
-        return df[d.between(di, dfim)]
-
-    def _pct_week(qdf, pdf):
-        """ERROS por vist. + %ERRO (bruta ou líquida) para uma janela semanal."""
-        grav_gg = {"GRAVE", "GRAVISSIMO", "GRAVÍSSIMO"}
-
-        if qdf.empty:
-            qual = pd.DataFrame(columns=["VISTORIADOR","ERROS","ERROS_GG"])
-        else:
-            qual = (qdf.groupby("VISTORIADOR", dropna=False)
-                    .agg(ERROS=("ERRO","size"),
-                         ERROS_GG=("GRAVIDADE", lambda s: s.isin(grav_gg).sum()))
-                    .reset_index())
-
-        if pdf.empty:
-            prod = pd.DataFrame(columns=["VISTORIADOR","vist","rev","liq"])
-        else:
-            prod = (pdf.groupby("VISTORIADOR", dropna=False)
-                    .agg(vist=("IS_REV","size"), rev=("IS_REV","sum"))
-                    .reset_index())
-            prod["liq"] = prod["vist"] - prod["rev"]
-
-        den_col = "liq" if denom_mode.startswith("Líquida") else "vist"
-        out = prod.merge(qual, on="VISTORIADOR", how="outer").fillna(0)
-
-        for c in ["vist","rev","liq","ERROS","ERROS_GG"]:
-            if c in out.columns:
-                out[c] = pd.to_numeric(out[c], errors="coerce").fillna(0)
-
-        den = out[den_col].replace({0: np.nan}).astype(float)
-        out["%ERRO"]    = (out["ERROS"]    / den * 100).round(1)
-        out["%ERRO_GG"] = (out["ERROS_GG"] / den * 100).round(1)
-        out["DEN"] = out[den_col].fillna(0).astype(int)
-
-        return out[["VISTORIADOR","ERROS","%ERRO","ERROS_GG","%ERRO_GG","DEN"]]
-
-    def _make_week_block(di, dfim, prefix, meta_list):
-        q = _slice_q(viewQ, di, dfim)
-        p = _slice_p(viewP, di, dfim)
-        meta_list.append((prefix, di, dfim))
-        return _pct_week(q, p).add_prefix(prefix)
-
-    sem_fins = []
-    cur_end = min(end_d, month_end)
-    for _ in range(4):
-        di = (pd.Timestamp(cur_end) - pd.Timedelta(days=6)).date()
-        di, dfim = _clip_month(di, cur_end)
-        if di > dfim or dfim < month_start:
-            break
-        sem_fins.append((di, dfim))
-        cur_end = (pd.Timestamp(di) - pd.Timedelta(days=1)).date()
-        if cur_end < month_start:
-            break
-
-    if len(sem_fins) < 2:
+    weekly = _table("semanal", memo_key_den, lambda: pv.weekly(denom_liq))
+    if weekly is None:
         st.info("Sem semanas suficientes no mês para montar o comparativo.")
     else:
-        sem_fins = list(reversed(sem_fins))
-        k = len(sem_fins)
-
-        meta = []
-        blocks = []
-        for i, (di, dfim) in enumerate(sem_fins, start=1):
-            blocks.append(_make_week_block(di, dfim, f"S{i}_", meta))
-
-        from functools import reduce
-        tab = reduce(
-            lambda L, R: L.merge(R, left_on=f"{L.columns[0]}", right_on=f"{R.columns[0]}", how="outer"),
-            blocks
-        )
-
-        def _pick_row(row):
-            for i in range(1, k+1):
-                v = row.get(f"S{i}_VISTORIADOR", "")
-                if isinstance(v, str) and v.strip():
-                    return v
-            return ""
-        tab["VISTORIADOR"] = tab.apply(_pick_row, axis=1)
-
-        for c in tab.columns:
-            if c.endswith("ERROS") or c.endswith("ERROS_GG") or c.endswith("DEN"):
-                tab[c] = pd.to_numeric(tab[c], errors="coerce").fillna(0).astype(int)
-
-        def _status_pp(delta):
-            if pd.isna(delta): return "—"
-            if delta < 0:     return f"Melhorou (↓ {abs(delta):.1f} pp)"
-            if delta > 0:     return f"Piorou (↑ {delta:.1f} pp)"
-            return "Sem alteração (↔)"
-
-        for i in range(1, k):
-            dcol = f"Δ_%ERRO_S{i}_S{i+1}"
-            tab[dcol] = (tab[f"S{i+1}_%ERRO"] - tab[f"S{i}_%ERRO"]).round(1)
-            tab[f"Status (S{i}→S{i+1})"] = tab[dcol].map(_status_pp)
-
-        def _status3(p1, p2, p3):
-            if any(pd.isna([p1, p2, p3])): return "—"
-            d12 = p2 - p1; d23 = p3 - p2
-            if d12 < 0 and d23 < 0: return "Continua melhorando (↓↓)"
-            if d12 > 0 and d23 > 0: return "Continua piorando (↑↑)"
-            if d12 < 0 and d23 > 0: return "Melhorou e depois piorou (↓↑)"
-            if d12 > 0 and d23 < 0: return "Piorou e depois melhorou (↑↓)"
-            return "Sem alteração (↔↔)"
-
-        if k >= 3:
-            tab["Status (3-semanas)"] = [
-                _status3(r.get(f"S{k-2}_%ERRO", np.nan), r.get(f"S{k-1}_%ERRO", np.nan), r.get(f"S{k}_%ERRO", np.nan))
-                for _, r in tab.iterrows()
-            ]
-
-        def _fmt_pct(x): return "—" if pd.isna(x) else f"{x:.1f}%".replace(".", ",")
-        def _fmt_pp(x):  return "—" if pd.isna(x) else f"{x:.1f} pp".replace(".", ",")
-
-        cols = ["VISTORIADOR"]
-        for i in range(1, k+1):
-            cols += [f"S{i}_ERROS", f"S{i}_%ERRO", f"S{i}_ERROS_GG", f"S{i}_%ERRO_GG"]
-
-        for i in range(1, k):
-            cols += [f"Δ_%ERRO_S{i}_S{i+1}", f"Status (S{i}→S{i+1})"]
-
-        if k >= 3:
-            cols += ["Status (3-semanas)"]
-
-        out = tab[cols].copy()
-
-        for c in out.columns:
-            if c.endswith("%ERRO") or c.endswith("%ERRO_GG"):
-                out[c] = out[c].map(_fmt_pct)
-            elif c.startswith("Δ_%ERRO_"):
-                out[c] = out[c].map(_fmt_pp)
-
-        order_key = tab[f"S{k}_%ERRO"].fillna(-1).values
-        out = out.iloc[np.argsort(-order_key)]
-
+        out, meta, k = weekly
         legend_parts = []
         for i, (prefix, di, dfim) in enumerate(meta, start=1):
             label = f"Semana {i}: {di:%d/%m}–{dfim:%d/%m}"
@@ -1540,46 +1261,99 @@ if not fast_mode:
             legend_parts.append(label)
         st.caption("  ·  ".join(legend_parts))
 
-        st.dataframe(out.reset_index(drop=True), use_container_width=True, hide_index=True)
+        st.dataframe(out, use_container_width=True, hide_index=True)
 
 # ------------------ RANKINGS ------------------
+PAGE.step("ranking", rows_in=n_view)
 st.markdown("---")
 st.markdown('<div class="section">🏁 Top 5 melhores × piores (por % de erro)</div>', unsafe_allow_html=True)
 
-rank = (base.copy())
-rank = rank[den > 0].replace({np.inf: np.nan}).dropna(subset=["%ERRO"])
-
-den_col = "liq" if denom_mode.startswith("Líquida") else "vist"
-col_titulo_den = "vistórias líquidas" if den_col == "liq" else "vistórias"
-cols_rank = ["VISTORIADOR", den_col, "erros", "%ERRO", "%ERRO_GG"]
-rank_view = rank[cols_rank].rename(columns={den_col: col_titulo_den})
-
-for c in [col_titulo_den, "erros"]:
-    if c in rank_view.columns: rank_view[c] = rank_view[c].astype(int)
-for c in ["%ERRO", "%ERRO_GG"]:
-    if c in rank_view.columns: rank_view[c] = rank_view[c].map(lambda x: f"{x:.1f}%" if pd.notna(x) else "—")
-
+best5, worst5 = _table("ranking", memo_key_den, lambda: pv.ranking(denom_liq))
 c_best, c_worst = st.columns(2)
 with c_best:
-    best5  = rank_view.sort_values("%ERRO", ascending=True).head(5)
     st.subheader("🏆 Top 5 melhores (menor %Erro)")
-    st.dataframe(best5.reset_index(drop=True), use_container_width=True, hide_index=True)
+    st.dataframe(best5, use_container_width=True, hide_index=True)
 with c_worst:
-    worst5 = rank_view.sort_values("%ERRO", ascending=False).head(5)
     st.subheader("⚠️ Top 5 piores (maior %Erro)")
-    st.dataframe(worst5.reset_index(drop=True), use_container_width=True, hide_index=True)
+    st.dataframe(worst5, use_container_width=True, hide_index=True)
 
 # ------------------ FRAUDE ------------------
+PAGE.step("fraude", rows_in=n_view)
 st.markdown("---")
 st.markdown('<div class="section">🚨 Tentativa de Fraude — Detalhamento</div>', unsafe_allow_html=True)
-fraude_mask = viewQ["ERRO"].astype(str).str.upper().str.contains(r"\bTENTATIVA DE FRAUDE\b", na=False)
-df_fraude = viewQ[fraude_mask].copy()
+df_fraude = _table("fraude", memo_key, pv.fraud)
 if df_fraude.empty:
     st.info("Nenhum registro de Tentativa de Fraude no período/filtros selecionados.")
 else:
-    cols_fraude = ["DATA","UNIDADE","VISTORIADOR","PLACA","ERRO","GRAVIDADE","ANALISTA","OBS"]
-    for c in cols_fraude:
-        if c not in df_fraude.columns: df_fraude[c] = ""
-    df_fraude = df_fraude[cols_fraude].sort_values(["DATA","UNIDADE","VISTORIADOR"])
     st.dataframe(df_fraude, use_container_width=True, hide_index=True)
     st.caption('<div class="table-note">* Somente linhas cujo ERRO é exatamente “TENTATIVA DE FRAUDE”.</div>', unsafe_allow_html=True)
+
+# ------------------ EXPORTAR EXCEL (montado só no clique) ------------------
+PAGE.step("excel", rows_in=n_view)
+def _excel_bytes():
+    extra = {"Comparativo semanal": weekly[0] if weekly else None,
+             "Tendência": tend_df,
+             "Tentativa de Fraude": None if df_fraude.empty else df_fraude}
+    return farol_xlsx(fmt_sorted, extra)
+
+@timed_fragment
+def _excel_farol():
+    # Bytes por (base, mês, recorte, denominador, modo rápido): reabrir o mesmo recorte não remonta
+    key = memo_key_den + (fast_mode,)
+    if st.session_state.get("excel_key") != key:
+        if not st.button("📊 Gerar Excel (farol + semanal + tendência + fraude)"):
+            return
+        st.session_state["excel_key"] = key
+    st.download_button(
+        label="📥 Baixar Excel com farol de cores",
+        data=PAGE.memo(_excel_memo(), "excel", key, _excel_bytes),
+        file_name="erros_por_vistoriador.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+with excel_slot:
+    if not ok_openpyxl:
+        st.warning("openpyxl não disponível — exportação colorida desativada.")
+    else:
+        _excel_farol()
+
+# ------------------ TEMPOS ------------------
+page_total = PAGE.finish()
+if SHOW_TIMINGS:
+    st.caption(f"⏱️ página completa: {page_total['ms']:.0f} ms ({time.strftime('%H:%M:%S')})")
+
+if show_tech:
+    with st.expander("⚙️ Performance", expanded=False):
+        st.markdown(f"**Esta execução** ({PAGE.run_id}): {page_total['ms']:.0f} ms. "
+                    "*calc* = cálculo das tabelas (ou leitura da memória, se *hit*); "
+                    "*render* = gráficos, tabelas e envio ao navegador.")
+        st.dataframe(PAGE.frame(), use_container_width=True, hide_index=True)
+
+        carga = snap.report.get("carga") or []
+        if carga:
+            st.markdown("**Carga da base em uso** — *cache*: hit = memória do processo, disco = cache em "
+                        "disco, miss = lido da origem, acrescimo = só as linhas novas.")
+            cols = ["tipo", "arquivo", "ms", "cache", "io_ms", "normalizacao_ms", "linhas_out", "erro"]
+            df_carga = pd.DataFrame(carga)
+            st.dataframe(df_carga[[c for c in cols if c in df_carga.columns]],
+                         use_container_width=True, hide_index=True)
+        else:
+            st.caption("Base em uso lida pronta do disco (snapshot), sem leitura de meses.")
+
+        st.caption(f"Tabelas memorizadas: {len(memo)} · {memo.hits} acertos · {memo.misses} faltas "
+                   f"(desde o início do processo).")
+        if METRICS_PORT or METRICS_FILE:
+            where = [f"{METRICS_ADDR}:{METRICS_PORT} (/metrics)"] if "server" in METRICS_EXPORTER else []
+            where += [METRICS_FILE] if METRICS_FILE else []
+            problem = METRICS_EXPORTER.get("erro") or getattr(METRICS_EXPORTER.get("file"), "error", None)
+            st.caption("Métricas Prometheus: " + (", ".join(where) or "—") + (f" · ⚠️ {problem}" if problem else ""))
+        sched = SOURCE.scheduler.stats()
+        st.caption(f"Agendador da origem: {sched['chamadas']} chamadas · {sched['novas_tentativas']} novas "
+                   f"tentativas · {sched['falhas']} falhas · {sched['recusadas']} recusadas (disjuntor) · "
+                   f"{sched['espera_s']:.1f} s na fila da cota"
+                   + (" · suspensos: " + ", ".join(f"{k} ({v:.0f} s)" for k, v in sched["abertos"].items())
+                      if sched["abertos"] else ""))
+        source_stats = getattr(SOURCE, "stats", None)
+        if source_stats:
+            calls = source_stats()["calls"]
+            st.caption("Chamadas à origem local: " + ", ".join(f"{k}={v}" for k, v in sorted(calls.items())))
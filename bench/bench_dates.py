@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: parse_date_any (linha a linha, via .apply) x parse_dates (vetorizado).
+
+Uso:  python bench/bench_dates.py [linhas ...]
+"""
+
+import os, sys, time, warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from painel.dates import parse_date_any, parse_dates  # noqa: E402
+
+
+def make_column(n: int, seed: int = 42) -> pd.Series:
+    """Coluna DATA sintética com a mistura de formatos vista nas planilhas reais."""
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, n), unit="D")
+    kind = rng.choice(6, size=n, p=[0.55, 0.20, 0.10, 0.05, 0.05, 0.05])
+    out = np.empty(n, dtype=object)
+    for k, fmt in enumerate(["%d/%m/%Y", None, "%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y %H:%M:%S"]):
+        m = kind == k
+        if fmt is None:
+            out[m] = (days[m] - pd.Timestamp("1899-12-30")).days.tolist()
+        else:
+            out[m] = days[m].strftime(fmt).tolist()
+    out[kind == 5] = ""
+    return pd.Series(out, dtype=object)
+
+
+def _timeit(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(sizes):
+    warnings.simplefilter("ignore", UserWarning)  # avisos do dateutil no parser legado
+    print(f"{'linhas':>10} {'apply (s)':>10} {'vetor (s)':>10} {'ganho':>7}  iguais")
+    for n in sizes:
+        col = make_column(n)
+        t_old = _timeit(lambda: col.apply(parse_date_any), repeat=1)
+        t_new = _timeit(lambda: parse_dates(col))
+        old = pd.to_datetime(col.apply(parse_date_any), errors="coerce").astype("datetime64[ns]")
+        same = old.equals(parse_dates(col))
+        print(f"{n:>10,} {t_old:>10.3f} {t_new:>10.3f} {t_old / t_new:>6.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000, 300_000])
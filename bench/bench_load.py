@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da carga dos meses sem rede: LocalSource (pasta de .xlsx) + painel.loader + MonthStore.
+
+Gera (uma vez) a pasta com os meses sintéticos no formato das planilhas:
+Qualidade com aba GERAL, Produção com aba 1 + METAS, e os dois índices. Depois
+mede, para cada número de workers:
+  fria   — cache em disco vazio: lê e normaliza todos os meses da origem e monta as bases;
+  disco  — mesmo cache já cheio (reinício/deploy): só índices + modifiedTime vêm da origem.
+Em cada fase mostra o tempo, quantos meses vieram da origem, do disco ou falharam,
+e as chamadas feitas à origem. A latência, o limite de chamadas simultâneas e as
+falhas são simulados pela LocalSource.
+
+Uso:
+  python bench/bench_load.py --dir /tmp/painel-local --scale 0.02 --latency-ms 150 --workers 1,4,8
+  python bench/bench_load.py --dir /tmp/painel-local --fail-rate 0.1 --max-concurrent 4
+  python bench/bench_load.py --dir /tmp/painel-local --as-sheets      # Qualidade lida pela aba (Sheets)
+"""
+
+import argparse, os, re, shutil, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from painel.analytics import assemble  # noqa: E402
+from painel.loader import load_index, read_prod_cached, read_quality_cached  # noqa: E402
+from painel.revisits import RevisitIndex  # noqa: E402
+from painel.sources import LOCAL_INDEX_IDS, LocalSource, write_synthetic  # noqa: E402
+from painel.store import MonthStore  # noqa: E402
+from painel.synthetic import SyntheticData, SyntheticSpec  # noqa: E402
+
+ID_RE = re.compile(r"/d/([a-zA-Z0-9-_]+)")
+
+
+def _ids(idx) -> list:
+    out = []
+    for url, mes in zip(idx["URL"], idx["MÊS"]):
+        m = ID_RE.search(str(url))
+        mm, yy = (str(mes).split("/") + [""])[:2]
+        if m:
+            out.append((m.group(1), f"{yy}-{mm}" if yy else None))
+    return out
+
+
+def _month(source, store, kind, fid, ym, version):
+    """Um mês pelo mesmo caminho do app.py (painel.loader.read_*_cached), sem acréscimos."""
+    if kind == "Q":
+        dq, _, cache = read_quality_cached(store, source, fid, version)
+        return ("disco" if cache == "disco" else "origem"), dq, None
+    df, metas, _, cache = read_prod_cached(store, source, fid, ym, version, key=f"{fid}@{version}")
+    return ("disco" if cache == "disco" else "origem"), df, metas
+
+
+def load_all(source: LocalSource, store: MonthStore, workers: int) -> dict:
+    t0 = time.perf_counter()
+    qidx, pidx = LOCAL_INDEX_IDS
+    try:
+        source.versions((qidx, pidx))
+        ids_q, ids_p = _ids(load_index(source, qidx)), _ids(load_index(source, pidx))
+    except Exception as e:          # sem índice o app não carrega nada
+        return {"erro": f"índice: {e}", "stats": source.stats()}
+    try:
+        versions = source.versions([f for f, _ in ids_q + ids_p])
+    except Exception:               # como o app: sem modifiedTime, nada vem do disco
+        versions = {}
+    jobs = [("Q", f, ym) for f, ym in ids_q] + [("P", f, ym) for f, ym in ids_p]
+
+    def _job(job):
+        kind, fid, ym = job
+        try:
+            return _month(source, store, kind, fid, ym, (versions.get(fid) or {}).get("modifiedTime", ""))
+        except Exception as e:
+            return "falha", e, None
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        res = list(ex.map(_job, jobs))
+    t_read = time.perf_counter() - t0
+
+    dq_all = [r[1] for (kind, _, _), r in zip(jobs, res) if kind == "Q" and r[0] != "falha"]
+    dp_all = [(f"{fid}@{versions.get(fid, {}).get('modifiedTime', '')}", r[1])
+              for (kind, fid, _), r in zip(jobs, res) if kind == "P" and r[0] != "falha"]
+    metas = [r[2] for (kind, _, _), r in zip(jobs, res) if kind == "P" and r[0] != "falha"]
+    t1 = time.perf_counter()
+    if dq_all:
+        assemble(dq_all, dp_all, metas, RevisitIndex())
+    origin = [r[0] for r in res]
+    return {"leitura": t_read, "assemble": time.perf_counter() - t1, "total": time.perf_counter() - t0,
+            "origem": origin.count("origem"), "disco": origin.count("disco"), "falha": origin.count("falha"),
+            "stats": source.stats()}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--dir", default=os.path.join(tempfile.gettempdir(), "painel-local"))
+    ap.add_argument("--scale", type=float, default=0.02, help="fração das linhas padrão (1M/5M) ao gerar")
+    ap.add_argument("--months", type=int, default=SyntheticSpec.months)
+    ap.add_argument("--regen", action="store_true", help="gerar a pasta de novo")
+    ap.add_argument("--workers", default="1,4,8")
+    ap.add_argument("--latency-ms", type=float, default=150)
+    ap.add_argument("--jitter-ms", type=float, default=50)
+    ap.add_argument("--throughput-mbps", type=float, default=0, help="vazão dos downloads (0 = sem limite)")
+    ap.add_argument("--max-concurrent", type=int, default=0, help="chamadas atendidas ao mesmo tempo (0 = sem limite)")
+    ap.add_argument("--fail-rate", type=float, default=0)
+    ap.add_argument("--as-sheets", action="store_true")
+    args = ap.parse_args(argv)
+
+    if args.regen or not os.path.isfile(os.path.join(args.dir, f"{LOCAL_INDEX_IDS[0]}.xlsx")):
+        t0 = time.perf_counter()
+        spec = SyntheticSpec(months=args.months).scaled(args.scale)
+        write_synthetic(args.dir, SyntheticData(spec))
+        print(f"pasta gerada em {time.perf_counter() - t0:.1f}s: {args.dir} "
+              f"({spec.quality_rows:,} Qualidade, {spec.prod_rows:,} Produção)")
+
+    LocalSource(args.dir).prepare()
+    print(f"\n{'fase':<7}{'workers':>8}{'total s':>9}{'leitura':>9}{'assemble':>9}"
+          f"{'origem':>8}{'disco':>7}{'falha':>7}  chamadas")
+    for w in [int(x) for x in args.workers.split(",") if x.strip()]:
+        source = LocalSource(args.dir, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                             throughput=args.throughput_mbps * 2**20, max_concurrent=args.max_concurrent,
+                             fail_rate=args.fail_rate, as_sheets=args.as_sheets, seed=w)
+        cache = tempfile.mkdtemp(prefix="painel-bench-")
+        try:
+            store = MonthStore(cache)
+            for fase in ("fria", "disco"):
+                source.reset_stats()
+                r = load_all(source, store, w)
+                calls = " ".join(f"{k}={v}" for k, v in sorted(r["stats"]["calls"].items()))
+                if "erro" in r:
+                    print(f"{fase:<7}{w:>8}  {r['erro']}  {calls}")
+                    continue
+                print(f"{fase:<7}{w:>8}{r['total']:>9.2f}{r['leitura']:>9.2f}{r['assemble']:>9.2f}"
+                      f"{r['origem']:>8}{r['disco']:>7}{r['falha']:>7}  {calls}")
+        finally:
+            shutil.rmtree(cache, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
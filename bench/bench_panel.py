@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Benchmark do núcleo do painel (painel.analytics) sobre bases sintéticas.
+
+Gera Qualidade/Produção/Metas (padrão: 1M linhas de Qualidade, 5M de Produção,
+2 mil vistoriadores, 40 unidades, 6 meses), mede a montagem (assemble: tipos,
+IS_REV, forma compacta, cubos) e o tempo de cada seção do painel em alguns
+recortes típicos. Cada repetição usa um PanelView novo (sem memo); vale o menor
+tempo. `--json` grava os números; `--baseline` compara com uma gravação
+anterior e marca as seções que ficaram mais lentas que `--tolerance`.
+
+Uso:
+  python bench/bench_panel.py                      # escala cheia
+  python bench/bench_panel.py --scale 0.1 --json bench/panel.json
+  python bench/bench_panel.py --baseline bench/panel.json
+"""
+
+import argparse, json, os, sys, time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from painel.analytics import PanelView, assemble  # noqa: E402
+from painel.filters import FilterSpec  # noqa: E402
+from painel.revisits import RevisitIndex  # noqa: E402
+from painel.synthetic import SyntheticData, SyntheticSpec  # noqa: E402
+
+
+def scenarios(data: SyntheticData, ym: str) -> dict:
+    """Recortes do topo do painel: mês inteiro, uma unidade, alguns vistoriadores, uma semana."""
+    p = pd.Period(ym, freq="M")
+    ini, fim = p.start_time.date(), p.end_time.date()
+    return {
+        "mes": FilterSpec.build(ini, fim),
+        "unidade": FilterSpec.build(ini, fim, [data.units[0]]),
+        "10_vist": FilterSpec.build(ini, fim, None, list(data.inspectors[:10])),
+        "semana": FilterSpec.build(fim.replace(day=fim.day - 6), fim),
+    }
+
+
+def run(spec: SyntheticSpec, repeat: int) -> dict:
+    t0 = time.perf_counter()
+    data = SyntheticData(spec)
+    dq_all, dp_all, metas_all = data.months()
+    t_gen = time.perf_counter() - t0
+    print(f"bases geradas em {t_gen:.1f}s: {sum(map(len, dq_all)):,} Qualidade, "
+          f"{sum(len(d) for _, d in dp_all):,} Produção, {spec.inspectors:,} vistoriadores, {spec.units} unidades")
+
+    t0 = time.perf_counter()
+    dfQ, dfP, dfMetas, cubeQ, cubeP = assemble(dq_all, dp_all, metas_all, RevisitIndex())
+    load = {"assemble": time.perf_counter() - t0}
+    print(f"assemble: {load['assemble']:.2f}s  (cubo Q {len(cubeQ):,} chaves, cubo P {len(cubeP):,})")
+
+    ym = spec.month_list[-1]
+    out = {}
+    for name, flt in scenarios(data, ym).items():
+        best = {}
+        for _ in range(repeat):
+            timings = {}
+            t0 = time.perf_counter()
+            PanelView(dfQ, dfMetas, cubeQ, cubeP, flt, ym).tables(timings=timings)
+            timings["total"] = time.perf_counter() - t0
+            best = {k: min(v, best.get(k, v)) for k, v in timings.items()}
+        out[name] = best
+    return {"spec": spec.__dict__, "load": load, "scenarios": out}
+
+
+def report(res: dict, baseline: dict = None, tolerance: float = 1.25) -> int:
+    names = list(res["scenarios"])
+    sections = list(next(iter(res["scenarios"].values())))
+    print(f"\n{'seção (ms)':<20}" + "".join(f"{n:>12}" for n in names))
+    slower = []
+    for sec in sections:
+        cells = []
+        for n in names:
+            v = res["scenarios"][n][sec]
+            old = ((baseline or {}).get("scenarios", {}).get(n) or {}).get(sec)
+            mark = ""
+            if old:
+                ratio = v / old
+                mark = "!" if ratio > tolerance else ""
+                if mark:
+                    slower.append((n, sec, ratio))
+            cells.append(f"{v * 1000:>11.1f}{mark or ' '}")
+        print(f"{sec:<20}" + "".join(cells))
+    if baseline:
+        old = baseline.get("load", {}).get("assemble")
+        if old:
+            print(f"\nassemble: {res['load']['assemble'] / old:.2f}x da referência")
+        for n, sec, ratio in slower:
+            print(f"mais lento: {n}/{sec} {ratio:.2f}x")
+    return 1 if slower else 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scale", type=float, default=1.0, help="fração das linhas padrão (1M/5M)")
+    ap.add_argument("--months", type=int, default=SyntheticSpec.months)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--json", help="gravar os tempos neste arquivo")
+    ap.add_argument("--baseline", help="comparar com tempos gravados antes")
+    ap.add_argument("--tolerance", type=float, default=1.25, help="razão acima da qual a seção é marcada")
+    args = ap.parse_args(argv)
+
+    spec = SyntheticSpec(months=args.months).scaled(args.scale)
+    res = run(spec, args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    status = report(res, baseline, args.tolerance)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Benchmark da cota: muitas sessões chamando a origem ao mesmo tempo, com e sem o agendador.
+
+A LocalSource imita a cota do projeto (`--quota` chamadas/min): acima dela a
+chamada falha com 429, como na API do Google. Cada "sessão" é uma thread que
+pede metadados e abas de arquivos da pasta durante `--seconds` segundos.
+  direto     — cada chamada tenta de novo sozinha após um 429/5xx, com backoff
+               exponencial e jitter (como `num_retries` do googleapiclient),
+               sem fila nem cota compartilhada entre as sessões;
+  agendador  — painel.resilience.Scheduler na mesma cota: fila compartilhada +
+               as mesmas novas tentativas (mesmo limite e mesmo backoff).
+Mostra as chamadas aceitas pela origem por segundo, as leituras concluídas e
+as que falharam mesmo após as novas tentativas, os 429, as novas tentativas e
+a latência das leituras. Com o agendador a vazão deve ficar no teto da cota,
+sem falhas e com bem menos 429.
+
+Uso:
+  python bench/bench_quota.py --dir /tmp/painel-local --quota 600 --sessions 32 --seconds 10
+"""
+
+import argparse, os, random, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from painel.resilience import ResilientSource, Scheduler  # noqa: E402
+from painel.sources import LOCAL_INDEX_IDS, LocalSource, is_transient, write_synthetic  # noqa: E402
+from painel.synthetic import SyntheticData, SyntheticSpec  # noqa: E402
+
+
+class BackoffClient:
+    """Cliente "direto" comum: tenta de novo cada chamada após erro transitório, sem coordenação."""
+
+    def __init__(self, source, retries: int, base: float, cap: float, seed: int = 0):
+        self.source, self.retries, self.base, self.cap = source, retries, base, cap
+        self.retried = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def call(self, fn, *args):
+        for attempt in range(self.retries + 1):
+            try:
+                return fn(*args)
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    raise
+                with self._lock:
+                    self.retried += 1
+                    wait = self._rng.uniform(0, min(self.cap, self.base * 2 ** attempt))
+                time.sleep(wait)
+
+    def metadata(self, file_id):
+        return self.call(self.source.metadata, file_id)
+
+    def worksheet(self, sheet_id, tab):
+        ws = self.call(self.source.worksheet, sheet_id, tab)
+        client = self
+
+        class _Sheet:
+            def row_values(self, row):
+                return client.call(ws.row_values, row)
+        return _Sheet()
+
+
+def hammer(source, file_ids, sessions: int, seconds: float) -> dict:
+    ok, err, lat = [0], [0], []
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def _session(i):
+        n = i
+        while time.perf_counter() < stop:
+            fid = file_ids[n % len(file_ids)]
+            n += 1
+            t0 = time.perf_counter()
+            try:
+                if n % 2:
+                    source.metadata(fid)
+                else:
+                    source.worksheet(fid, "ARQUIVOS").row_values(1)
+                with lock:
+                    ok[0] += 1
+                    lat.append(time.perf_counter() - t0)
+            except Exception:
+                with lock:
+                    err[0] += 1
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=_session, args=(i,)) for i in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    lat.sort()
+    return {"wall": wall, "ok": ok[0], "err": err[0],
+            "p50": lat[len(lat) // 2] if lat else 0.0, "p95": lat[int(len(lat) * 0.95)] if lat else 0.0}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--dir", default=os.path.join(tempfile.gettempdir(), "painel-local"))
+    ap.add_argument("--scale", type=float, default=0.01, help="fração das linhas padrão, se for gerar a pasta")
+    ap.add_argument("--quota", type=float, default=600, help="chamadas/min aceitas pela origem")
+    ap.add_argument("--sessions", type=int, default=32)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--latency-ms", type=float, default=50)
+    ap.add_argument("--retries", type=int, default=4)
+    ap.add_argument("--backoff-base", type=float, default=0.2, help="s; espera em [0, base·2^n], as duas pontas")
+    ap.add_argument("--backoff-max", type=float, default=5)
+    args = ap.parse_args(argv)
+
+    if not os.path.isfile(os.path.join(args.dir, f"{LOCAL_INDEX_IDS[0]}.xlsx")):
+        write_synthetic(args.dir, SyntheticData(SyntheticSpec().scaled(args.scale)))
+    LocalSource(args.dir).prepare()
+    file_ids = list(LOCAL_INDEX_IDS)        # abas pequenas: o que se mede é a cota, não a leitura
+
+    print(f"cota {args.quota:.0f}/min = {args.quota / 60:.1f}/s · {args.sessions} sessões · {args.seconds:.0f} s")
+    print(f"{'modo':<11}{'aceitas/s':>10}{'leituras':>10}{'falhas':>10}{'429':>10}{'tentativas':>11}"
+          f"{'p50 ms':>8}{'p95 ms':>8}")
+    for mode in ("direto", "agendador"):
+        local = LocalSource(args.dir, latency=args.latency_ms / 1000, quota=args.quota / 60, seed=1)
+        sched = client = None
+        if mode == "direto":
+            source = client = BackoffClient(local, args.retries, args.backoff_base, args.backoff_max, seed=1)
+        else:
+            # cota do agendador = cota da origem (em produção: a do projeto no Google Cloud)
+            sched = Scheduler({"sheets": args.quota, "drive": args.quota}, burst_seconds=1, retries=args.retries,
+                              backoff_base=args.backoff_base, backoff_max=args.backoff_max,
+                              breaker_failures=10**6, seed=1)
+            # uma só cota na origem local: um balde só para as duas "APIs"
+            sched.buckets["drive"] = sched.buckets["sheets"]
+            source = ResilientSource(local, sched)
+        r = hammer(source, file_ids, args.sessions, args.seconds)
+        tries = sched.stats()["novas_tentativas"] if sched else client.retried
+        st = local.stats()
+        refused = st["failures"].get("cota", 0)
+        accepted = sum(st["calls"].values()) - refused
+        print(f"{mode:<11}{accepted / r['wall']:>10.1f}{r['ok']:>10}{r['err']:>10}{refused:>10}{tries:>11}"
+              f"{r['p50'] * 1000:>8.0f}{r['p95'] * 1000:>8.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: tabelas por vistoriador (iterrows/apply) x painel.tables/export (vetorizado).
+
+Mede farol + formatação de %ERRO, projeção da tendência e escrita do Excel.
+As versões "legadas" abaixo reproduzem os laços que existiam no app.py.
+
+Uso:  python bench/bench_tables.py [vistoriadores ...]
+"""
+
+import io, os, sys, time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from painel.tables import farol, fmt_num, trend_projection  # noqa: E402
+from painel.export import ok_openpyxl, farol_xlsx  # noqa: E402
+
+META_ERRO, META_ERRO_GG, TOL = 3.5, 1.5, 0.5
+
+
+def make_inputs(n: int, seed: int = 42):
+    """Tabela base + erros MTD + metas para `n` vistoriadores sintéticos."""
+    rng = np.random.default_rng(seed)
+    vists = [f"VISTORIADOR {i:05d}" for i in range(n)]
+    vist = rng.integers(0, 400, n)
+    rev = (vist * rng.uniform(0, 0.1, n)).astype(int)
+    erros = rng.integers(0, 25, n)
+    erros_gg = (erros * rng.uniform(0, 0.5, n)).astype(int)
+    base = pd.DataFrame({"VISTORIADOR": vists, "vist": vist, "rev": rev, "liq": vist - rev,
+                         "erros": erros, "erros_gg": erros_gg})
+    den = base["vist"].replace({0: np.nan})
+    base["%ERRO"] = (base["erros"] / den * 100).round(1)
+    base["%ERRO_GG"] = (base["erros_gg"] / den * 100).round(1)
+
+    erros_mtd = pd.DataFrame({"VISTORIADOR": vists, "ERROS_MTD": rng.integers(0, 60, n)})
+    metas = pd.DataFrame({"VISTORIADOR": vists, "DIAS_UTEIS": rng.choice([0, 18, 20, 22], n)})
+    metas["DIAS_UTEIS"] = metas["DIAS_UTEIS"].astype("Int64").mask(rng.random(n) < 0.1)
+    return base, erros_mtd, metas.sample(frac=0.9, random_state=seed)
+
+
+# ---------------- versões legadas (laços por linha) ----------------
+def _farol_legacy(pct, meta, tol=TOL):
+    if pd.isna(pct): return "—"
+    diff = pct - meta
+    if diff <= 0:   return "🟢"
+    if diff <= tol: return "🟡"
+    return "🔴"
+
+
+def _fmt_val_pct(pct, emoji):
+    if pd.isna(pct): return "—"
+    return f"{emoji} {pct:.1f}%".replace(".", ",")
+
+
+def fmt_legacy(base):
+    b = base.copy()
+    b["FAROL_%ERRO"] = b["%ERRO"].apply(lambda v: _farol_legacy(v, META_ERRO))
+    b["FAROL_%ERRO_GG"] = b["%ERRO_GG"].apply(lambda v: _farol_legacy(v, META_ERRO_GG))
+    b["%ERRO"] = b.apply(lambda r: _fmt_val_pct(r["%ERRO"], r["FAROL_%ERRO"]), axis=1)
+    b["%ERRO_GG"] = b.apply(lambda r: _fmt_val_pct(r["%ERRO_GG"], r["FAROL_%ERRO_GG"]), axis=1)
+    return b
+
+
+def fmt_vector(base):
+    b = base.copy()
+    b["FAROL_%ERRO"] = farol(b["%ERRO"], META_ERRO, TOL)
+    b["FAROL_%ERRO_GG"] = farol(b["%ERRO_GG"], META_ERRO_GG, TOL)
+    b["%ERRO"] = fmt_num(b["%ERRO"], prefix=b["FAROL_%ERRO"], suffix="%")
+    b["%ERRO_GG"] = fmt_num(b["%ERRO_GG"], prefix=b["FAROL_%ERRO_GG"], suffix="%")
+    return b
+
+
+def trend_legacy(erros_mtd, metas, dias_passados, dias_fallback):
+    du_map = {}
+    for _, r in metas.iterrows():
+        du_map[r["VISTORIADOR"]] = int(r["DIAS_UTEIS"]) if pd.notna(r["DIAS_UTEIS"]) else None
+    rows = []
+    for _, r in erros_mtd.iterrows():
+        v = r["VISTORIADOR"]; e_mtd = int(r["ERROS_MTD"])
+        du_total = du_map.get(v, dias_fallback) or dias_fallback
+        du_pass = min(dias_passados, du_total) if du_total else dias_passados
+        erros_dia = (e_mtd / du_pass) if du_pass else np.nan
+        proj = int(round(erros_dia * du_total)) if not np.isnan(erros_dia) else e_mtd
+        rows.append({"VISTORIADOR": v, "Erros (MTD)": e_mtd,
+                     "Erros/dia": round(erros_dia, 2) if not np.isnan(erros_dia) else 0.0,
+                     "Dias úteis passados": int(du_pass), "Dias úteis (mês)": int(du_total),
+                     "Projeção (mês)": proj})
+    return pd.DataFrame(rows).sort_values("Projeção (mês)", ascending=False)
+
+
+def xlsx_legacy(fmt_sorted):
+    from openpyxl import Workbook
+    from openpyxl.styles import PatternFill, Alignment
+    wb = Workbook(); ws = wb.active
+    ws.append(["VISTORIADOR", "vist", "rev", "liq", "erros", "erros_gg", "%ERRO", "%ERRO_GG"])
+    for _, r in fmt_sorted.iterrows():
+        ws.append([r["VISTORIADOR"], int(r["vist"]), int(r["rev"]), int(r["liq"]),
+                   int(r["erros"]), int(r["erros_gg"]), r["%ERRO"], r["%ERRO_GG"]])
+
+    def _fill(emoji):
+        for e, c in (("🟢", "C6EFCE"), ("🟡", "FFF2CC"), ("🔴", "F4CCCC")):
+            if isinstance(emoji, str) and e in emoji:
+                return PatternFill(start_color=c, end_color=c, fill_type="solid")
+        return PatternFill(fill_type=None)
+
+    for i, (_, r) in enumerate(fmt_sorted.iterrows(), start=2):
+        ws[f"G{i}"].fill = _fill(r.get("FAROL_%ERRO")); ws[f"H{i}"].fill = _fill(r.get("FAROL_%ERRO_GG"))
+        ws[f"G{i}"].alignment = Alignment(horizontal="center")
+        ws[f"H{i}"].alignment = Alignment(horizontal="center")
+    buf = io.BytesIO(); wb.save(buf)
+    return buf.getvalue()
+
+
+# ---------------- medição ----------------
+def _timeit(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _sheet_values(xlsx: bytes):
+    from openpyxl import load_workbook
+    ws = load_workbook(io.BytesIO(xlsx)).active
+    return [[(c.value, c.fill.fgColor.rgb if c.fill.fill_type else None) for c in row] for row in ws.iter_rows()]
+
+
+def main(sizes):
+    print(f"{'vist.':>8} {'etapa':<10} {'laço (s)':>9} {'vetor (s)':>9} {'ganho':>7}  iguais")
+    for n in sizes:
+        base, erros_mtd, metas = make_inputs(n)
+        fmt_old, fmt_new = fmt_legacy(base), fmt_vector(base)
+        cases = [
+            ("farol+fmt", lambda: fmt_legacy(base), lambda: fmt_vector(base), fmt_old.equals(fmt_new)),
+            ("tendência", lambda: trend_legacy(erros_mtd, metas, 12, 21),
+             lambda: trend_projection(erros_mtd, metas, 12, 21),
+             trend_legacy(erros_mtd, metas, 12, 21).reset_index(drop=True)
+             .equals(trend_projection(erros_mtd, metas, 12, 21).reset_index(drop=True))),
+        ]
+        if ok_openpyxl:
+            cases.append(("excel", lambda: xlsx_legacy(fmt_new), lambda: farol_xlsx(fmt_new),
+                          _sheet_values(xlsx_legacy(fmt_new)) == _sheet_values(farol_xlsx(fmt_new))))
+        for name, old, new, same in cases:
+            t_old, t_new = _timeit(old, repeat=1), _timeit(new)
+            print(f"{n:>8,} {name:<10} {t_old:>9.3f} {t_new:>9.3f} {t_old / t_new:>6.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000])
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: pd.read_excel (aba inteira) x painel.xlsx.read_sheet_chunks (streaming).
+
+Gera uma aba GERAL sintética com colunas extras que o painel não usa e mede
+tempo e pico de memória (tracemalloc) das duas leituras. O pico inclui o
+arquivo baixado: em memória no caminho antigo, em temporário no streaming.
+
+Uso:  python bench/bench_xlsx.py [linhas ...]
+"""
+
+import io, os, sys, tempfile, time, tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from painel.schema import quality_column, quality_rename_map  # noqa: E402
+from painel.xlsx import read_sheet_chunks  # noqa: E402
+
+HEADERS = ["DATA", "PLACA", "VISTORIADOR", "CIDADE", "ERRO", "GRAVIDADE", "OBSERVAÇÃO",
+           "ANALISTA", "EMPRESA", "CHASSI", "MODELO", "COR", "ANO", "KM", "LINK FOTOS", "COMENTÁRIO"]
+
+
+def make_xlsx(n: int, seed: int = 42) -> bytes:
+    rng = np.random.default_rng(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("GERAL")
+    ws.append(HEADERS)
+    d0 = datetime(2025, 1, 1)
+    for i in range(n):
+        ws.append([d0 + timedelta(days=int(rng.integers(0, 31))), f"ABC{i % 10000:04d}",
+                   f"VISTORIADOR {int(rng.integers(0, 300))}", f"UNIDADE {int(rng.integers(0, 40))}",
+                   f"ERRO {int(rng.integers(0, 60))}", ["LEVE", "MEDIO", "GRAVE"][i % 3], "observação livre " * 3,
+                   "ANALISTA", "STARCHECK", f"9BWZZZ377VT{i:06d}", "MODELO X", "PRATA", 2020, 45_000,
+                   f"https://exemplo/fotos/{i}", "comentário " * 5])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def read_full(content: bytes) -> pd.DataFrame:
+    buf = io.BytesIO()
+    for i in range(0, len(content), 2**20):  # "download" em blocos de 1 MB, como no app
+        buf.write(content[i:i + 2**20])
+    dq = pd.read_excel(io.BytesIO(buf.getvalue()), sheet_name="GERAL", engine="openpyxl")
+    dq.columns = [str(c).strip() for c in dq.columns]
+    rename = quality_rename_map(dq.columns)
+    return dq.rename(columns=rename)[list(rename.values())]
+
+
+def read_streaming(content: bytes) -> pd.DataFrame:
+    with tempfile.TemporaryFile(suffix=".xlsx") as fh:
+        for i in range(0, len(content), 2**20):
+            fh.write(content[i:i + 2**20])
+        fh.seek(0)
+        return pd.concat(list(read_sheet_chunks(fh, "GERAL", quality_column)), ignore_index=True)
+
+
+def _measure(fn, content):
+    t0 = time.perf_counter()
+    fn(content)
+    dt = time.perf_counter() - t0
+    tracemalloc.start()
+    out = fn(content)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return out, dt, peak
+
+
+def main(sizes):
+    print(f"{'linhas':>9} {'read_excel':>16} {'streaming':>16} {'memória':>8}  iguais")
+    for n in sizes:
+        content = make_xlsx(n)
+        full, t_full, m_full = _measure(read_full, content)
+        stream, t_str, m_str = _measure(read_streaming, content)
+        same = full.astype(str).equals(stream[full.columns].astype(str))
+        print(f"{n:>9,} {t_full:>6.2f}s {m_full:>6.0f} MB {t_str:>6.2f}s {m_str:>6.0f} MB {m_full / m_str:>7.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [20_000, 50_000])
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Rotinas de apoio do Painel de Qualidade — Starcheck (sem dependência de Streamlit)."""
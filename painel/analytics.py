@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Núcleo de cálculo do painel (sem Streamlit)
+# ============================================================
+"""Todas as tabelas do painel a partir das bases tipadas + recorte, sem `st.*`.
+
+`assemble` monta as bases compactas e os cubos (uma vez por versão dos dados).
+`PanelView` junta um snapshot, o FilterSpec do topo e o mês de referência;
+cada seção do painel é um método que devolve a tabela pronta para desenhar
+(cards, gráficos, % por vistoriador, semanal, ranking, fraude...). O app só
+desenha o que sai daqui; benchmarks e testes de carga importam este módulo
+direto (ver bench/bench_panel.py).
+
+`liq=True` nos métodos com %Erro usa as vistorias líquidas (brutas − revistorias)
+como denominador, como o rádio "Base para %Erro".
+"""
+
+import calendar
+import functools
+import time
+from datetime import date
+from functools import cached_property, reduce
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from painel.cube import GRAV_GG, build_quality_cube, build_prod_cube, rollup, weekday
+from painel.filters import FilterSpec
+from painel.schema import (
+    QUALITY_DATE, PROD_DATE, typed_quality, typed_production, empty_metas, compact_frames, fill_numeric,
+)
+from painel.tables import farol, fmt_num, first_nonblank, status3, trend_projection
+
+# Formato das bases montadas e dos cubos (assemble, compact_frames, build_*_cube).
+# Suba ao mudar qualquer um deles: snapshots gravados em disco por outra versão são ignorados.
+ASSEMBLE_VERSION = 2
+
+# Metas e tolerância do farol
+META_ERRO = 3.5
+META_ERRO_GG = 1.5
+TOL_AMARELO = 0.5
+
+DOW_LABELS = {0: "Seg", 1: "Ter", 2: "Qua", 3: "Qui", 4: "Sex", 5: "Sáb", 6: "Dom"}
+GRAVISSIMO = {"GRAVISSIMO", "GRAVÍSSIMO"}
+FRAUD_COLUMNS = ["DATA", "UNIDADE", "VISTORIADOR", "PLACA", "ERRO", "GRAVIDADE", "ANALISTA", "OBS"]
+
+
+def business_days_count(dini: date, dfim: date) -> int:
+    if not (isinstance(dini, date) and isinstance(dfim, date) and dini <= dfim):
+        return 0
+    return len(pd.bdate_range(dini, dfim))
+
+
+def assemble(dq_all: Sequence[pd.DataFrame], dp_all: Sequence[Tuple[str, pd.DataFrame]],
+             metas_all: Sequence[pd.DataFrame], revisits) -> tuple:
+    """Bases concatenadas, tipadas e compactadas + cubos: (dfQ, dfP, dfMetas, cubeQ, cubeP).
+
+    `dp_all` = [(chave da versão do mês, frame)]; `revisits` é o RevisitIndex que
+    marca IS_REV entre meses (um chassi já visto em mês anterior conta como revistoria).
+    """
+    # Esquema tipado: datas em datetime64 uma única vez (meses antigos do cache em disco inclusive)
+    dfQ = typed_quality(pd.concat(dq_all, ignore_index=True))
+    dp_flagged = revisits.flag(dp_all)
+    dfP = typed_production(pd.concat(dp_flagged, ignore_index=True) if dp_flagged else None)
+    dfMetas = pd.concat(metas_all, ignore_index=True) if metas_all else empty_metas()
+    # Só a empresa do painel, antes da compactação: os dicionários não levam unidades/vistoriadores de fora
+    if "EMPRESA" in dfQ.columns:
+        dfQ = dfQ[dfQ["EMPRESA"] == "STARCHECK"]
+    # Forma compacta: textos repetitivos como Categorical (dicionário comum) + DIA inteiro
+    dfQ, dfP = compact_frames(dfQ, dfP)
+    return dfQ, dfP, dfMetas, build_quality_cube(dfQ), build_prod_cube(dfP)
+
+
+def make_prod(cube_prod: pd.DataFrame) -> pd.DataFrame:
+    """vist/rev/liq por vistoriador a partir de uma fatia do cubo de Produção."""
+    if cube_prod.empty:
+        return pd.DataFrame(columns=["VISTORIADOR", "vist", "rev", "liq"])
+    out = rollup(cube_prod, "VISTORIADOR", ["vist", "rev"])
+    out["liq"] = out["vist"] - out["rev"]
+    return out
+
+
+def pct_delta(cur, prev) -> Optional[float]:
+    if prev <= 0:
+        return None
+    return (cur - prev) / prev * 100.0
+
+
+def pareto_gain(pareto: pd.DataFrame, top_n: int, reducao: float) -> Tuple[float, float]:
+    """(fração do total explicada pelos `top_n`, queda do total em % se reduzir esses erros em `reducao`%)."""
+    idx = min(top_n, len(pareto)) - 1
+    frac = float(pareto["%ACUM"].iloc[idx]) / 100.0
+    return frac, frac * (reducao / 100.0) * 100.0
+
+
+def _upper(x):
+    return str(x).upper().strip() if pd.notna(x) else ""
+
+
+def _fmt_pct(x): return "—" if pd.isna(x) else f"{x:.1f}%".replace(".", ",")
+def _fmt_pp(x):  return "—" if pd.isna(x) else f"{x:.1f} pp".replace(".", ",")
+
+
+def _status_pp(delta):
+    if pd.isna(delta): return "—"
+    if delta < 0:     return f"Melhorou (↓ {abs(delta):.1f} pp)"
+    if delta > 0:     return f"Piorou (↑ {delta:.1f} pp)"
+    return "Sem alteração (↔)"
+
+
+def _status(delta):
+    if delta < 0: return "✅ Melhorou"
+    if delta > 0: return "❌ Piorou"
+    return "➡️ Igual"
+
+
+def _per_view(fn):
+    """Método calculado uma vez por PanelView (por argumentos): seções que o reaproveitam não refazem."""
+    @functools.wraps(fn)
+    def run(self, *args):
+        key = (fn.__name__,) + args
+        if key not in self._results:
+            self._results[key] = fn(self, *args)
+        return self._results[key]
+    return run
+
+
+class PanelView:
+    """Um recorte do painel: bases de um snapshot + FilterSpec + mês de referência ("AAAA-MM").
+
+    As fatias (viewQ, cq, cp, mês anterior, MTD) saem uma vez, na primeira
+    seção que as usa. Tudo que é devolvido é somente leitura para o chamador.
+    """
+
+    # Seções de `tables()` (e do benchmark), na ordem do painel
+    SECTIONS = ("kpis", "by_gravidade", "top5_grave", "city_tables", "heatmap", "pareto", "recurrence",
+                "analyst_calibration", "weekday_counts", "vist_tables", "trend", "compare_prev",
+                "weekly", "ranking", "fraud")
+
+    def __init__(self, dfQ: pd.DataFrame, dfMetas: pd.DataFrame, cubeQ: pd.DataFrame, cubeP: pd.DataFrame,
+                 flt: FilterSpec, ym: str):
+        self.dfQ, self.dfMetas, self.cubeQ, self.cubeP = dfQ, dfMetas, cubeQ, cubeP
+        self.flt = flt
+        self.ym = ym
+        y, m = int(ym[:4]), int(ym[5:7])
+        self.month_start = date(y, m, 1)
+        self.month_end = date(y, m, calendar.monthrange(y, m)[1])
+        self._results = {}
+
+    # ------------------ fatias ------------------
+    @cached_property
+    def viewQ(self) -> pd.DataFrame:
+        return self.flt.view(self.dfQ, QUALITY_DATE)
+
+    @cached_property
+    def prod_period(self) -> Tuple[date, date]:
+        """Produção alinhada: período do topo dentro do mês de referência."""
+        return max(self.flt.start, self.month_start), min(self.flt.end, self.month_end)
+
+    @cached_property
+    def cq(self) -> pd.DataFrame:
+        return self.flt.view(self.cubeQ, QUALITY_DATE)
+
+    @cached_property
+    def cp(self) -> pd.DataFrame:
+        return self.flt.view(self.cubeP, PROD_DATE, period=self.prod_period)
+
+    @cached_property
+    def prev_period(self) -> Tuple[date, date]:
+        """Mesmo intervalo no mês anterior."""
+        return ((pd.Timestamp(self.flt.start) - relativedelta(months=1)).date(),
+                (pd.Timestamp(self.flt.end) - relativedelta(months=1)).date())
+
+    @cached_property
+    def prev_cq(self) -> pd.DataFrame:
+        return self.flt.view(self.cubeQ, QUALITY_DATE, period=self.prev_period)
+
+    @cached_property
+    def mtd_cq(self) -> pd.DataFrame:
+        return self.flt.view(self.cubeQ, QUALITY_DATE, period=(self.month_start, min(self.flt.end, self.month_end)))
+
+    @cached_property
+    def dias_passados(self) -> int:
+        return business_days_count(self.month_start, min(self.flt.end, self.month_end))
+
+    @cached_property
+    def dias_totais(self) -> int:
+        return business_days_count(self.month_start, self.month_end)
+
+    def proj(self, cur_mtd: int) -> int:
+        """Projeção até o fim do mês pelos dias úteis."""
+        if self.dias_passados == 0:
+            return cur_mtd
+        return int(round(cur_mtd / self.dias_passados * self.dias_totais))
+
+    # ------------------ seções ------------------
+    def kpis(self) -> dict:
+        """Números dos cards (período, mês anterior no mesmo intervalo e projeção do mês)."""
+        cq, cp, prev_cq, mtd_cq = self.cq, self.cp, self.prev_cq, self.mtd_cq
+        total_erros = int(cq["n"].sum())
+        total_gg = int(cq["gg"].sum())
+        vist_avaliados = int(cq["VISTORIADOR"].nunique())
+        gg_by_vist = rollup(cq[cq["gg"] > 0], "VISTORIADOR", ["gg"])
+        total_vist_brutas = int(cp["vist"].sum())
+        prev_total, prev_gg = int(prev_cq["n"].sum()), int(prev_cq["gg"].sum())
+        mtd_total, mtd_gg = int(mtd_cq["n"].sum()), int(mtd_cq["gg"].sum())
+        return {
+            "total_erros": total_erros,
+            "total_gg": total_gg,
+            "vist_avaliados": vist_avaliados,
+            "media_por_vist": (total_erros / vist_avaliados) if vist_avaliados else 0,
+            "vist_5gg": int((gg_by_vist["gg"] >= 5).sum()),
+            "total_vist_brutas": total_vist_brutas,
+            "taxa_geral": (total_erros / total_vist_brutas * 100) if total_vist_brutas else np.nan,
+            "taxa_gg_bruta": (total_gg / total_vist_brutas * 100) if total_vist_brutas else np.nan,
+            "prev_total": prev_total,
+            "prev_gg": prev_gg,
+            "delta_total": pct_delta(total_erros, prev_total),
+            "delta_gg": pct_delta(total_gg, prev_gg),
+            "mtd_total": mtd_total,
+            "mtd_gg": mtd_gg,
+            "proj_total": self.proj(mtd_total),
+            "proj_gg": self.proj(mtd_gg),
+        }
+
+    def by_gravidade(self) -> pd.DataFrame:
+        return (rollup(self.cq, "GRAVIDADE", ["n"]).rename(columns={"n": "QTD"})
+                .sort_values("QTD", ascending=False))
+
+    def top5_grave(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """(Top 5 erros GRAVE, Top 5 erros GRAVÍSSIMO)."""
+        grav = self.cq["GRAVIDADE"].astype(str).str.upper()
+        top = lambda mask: (rollup(self.cq[mask], "ERRO", ["n"]).rename(columns={"n": "QTD"})
+                            .sort_values("QTD", ascending=False).head(5))
+        return top(grav.eq("GRAVE")), top(grav.isin(GRAVISSIMO))
+
+    def city_tables(self) -> Tuple[pd.DataFrame, str, pd.DataFrame, str]:
+        """Erros por unidade (total e GG) com % sobre as vistorias (ou sobre os erros, sem Produção).
+
+        Devolve (by_city, título do eixo %, by_city_gg, título do eixo % GG).
+        """
+        cq, cp = self.cq, self.cp
+        if not cp.empty:
+            prod_city = rollup(cp, "UNIDADE", ["vist"]).rename(columns={"vist": "VIST"})
+        else:
+            prod_city = pd.DataFrame(columns=["UNIDADE", "VIST"])
+
+        by_city = rollup(cq, "UNIDADE", ["n"]).rename(columns={"n": "QTD"})
+        by_city = by_city.merge(prod_city, on="UNIDADE", how="left").fillna({"VIST": 0})
+        by_city["%ERRO"] = np.where(by_city["VIST"] > 0, (by_city["QTD"] / by_city["VIST"]) * 100, np.nan)
+
+        if by_city["%ERRO"].isna().all():
+            total_err = by_city["QTD"].sum()
+            by_city["%ERRO"] = np.where(total_err > 0, (by_city["QTD"] / total_err) * 100, np.nan)
+            y2_title = "% dos erros"
+        else:
+            y2_title = "% de erro (erros/vistorias)"
+
+        by_city["PCT"] = by_city["%ERRO"] / 100.0
+        by_city = by_city.sort_values("QTD", ascending=False).reset_index(drop=True)
+
+        # Somente GRAVE + GRAVÍSSIMO
+        by_city_gg = rollup(cq[cq["gg"] > 0], "UNIDADE", ["gg"]).rename(columns={"gg": "QTD_GG"})
+        by_city_gg = by_city_gg.merge(prod_city, on="UNIDADE", how="left").fillna({"VIST": 0})
+
+        by_city_gg["%ERRO_GG"] = np.where(by_city_gg["VIST"] > 0,
+                                          (by_city_gg["QTD_GG"] / by_city_gg["VIST"]) * 100, np.nan)
+        if by_city_gg["%ERRO_GG"].isna().all():
+            total_gg_global = by_city_gg["QTD_GG"].sum()
+            by_city_gg["%ERRO_GG"] = np.where(total_gg_global > 0,
+                                              (by_city_gg["QTD_GG"] / total_gg_global) * 100, np.nan)
+            y2_title_gg = "% dos erros GG"
+        else:
+            y2_title_gg = "% de erro GG (GG/vistorias)"
+
+        by_city_gg["PCT_GG"] = by_city_gg["%ERRO_GG"] / 100.0
+        by_city_gg = by_city_gg.sort_values("QTD_GG", ascending=False).reset_index(drop=True)
+        return by_city, y2_title, by_city_gg, y2_title_gg
+
+    def heatmap(self, liq: bool = False) -> pd.DataFrame:
+        """Erros por UNIDADE × GRAVIDADE + vistorias da unidade (DEN) e % sobre elas."""
+        cq, cp = self.cq, self.cp
+        denom_col = "liq" if liq else "vist"
+        erros_city = rollup(cq, ["UNIDADE", "GRAVIDADE"], ["n"]).rename(columns={"n": "QTD"})
+
+        # Denominador: vistorias por cidade no mesmo recorte (Bruta/Líquida)
+        if not cp.empty:
+            prod_city = rollup(cp, "UNIDADE", ["vist", "rev"])
+            prod_city["liq"] = prod_city["vist"] - prod_city["rev"]
+        else:
+            prod_city = pd.DataFrame({"UNIDADE": erros_city["UNIDADE"].unique(), "vist": 0, "rev": 0})
+            prod_city["liq"] = 0
+
+        hm = erros_city.merge(
+            prod_city[["UNIDADE", denom_col]].rename(columns={denom_col: "DEN"}),
+            on="UNIDADE",
+            how="left",
+        )
+        hm["%_VIST"] = np.where(hm["DEN"] > 0, (hm["QTD"] / hm["DEN"]) * 100, np.nan)
+        hm["%_VIST_TXT"] = fmt_num(hm["%_VIST"], suffix="%")
+        return hm
+
+    def error_kinds(self) -> int:
+        return int(self.cq["ERRO"].nunique())
+
+    def pareto(self, top: int = 10) -> pd.DataFrame:
+        """Os `top` erros mais frequentes com acumulado (QTD, ACUM, %ACUM)."""
+        pareto = (
+            rollup(self.cq, "ERRO", ["n"]).rename(columns={"n": "QTD"})
+            .sort_values("QTD", ascending=False)
+            .head(top)
+            .reset_index(drop=True)
+        )
+        pareto["ACUM"] = pareto["QTD"].cumsum()
+        pareto["%ACUM"] = pareto["ACUM"] / pareto["QTD"].sum() * 100
+        return pareto
+
+    def recurrence(self, min_qtd: int = 3) -> pd.DataFrame:
+        """Reincidência: mesmo erro do mesmo vistoriador pelo menos `min_qtd` vezes."""
+        rec = (rollup(self.cq, ["VISTORIADOR", "ERRO"], ["n"]).rename(columns={"n": "QTD"})
+               .sort_values("QTD", ascending=False))
+        return rec[rec["QTD"] >= min_qtd]
+
+    def analyst_calibration(self) -> Optional[pd.DataFrame]:
+        """% de erros GG apontados por analista (None sem ANALISTA/GRAVIDADE)."""
+        viewQ = self.viewQ
+        if not ("ANALISTA" in viewQ.columns and "GRAVIDADE" in viewQ.columns):
+            return None
+        ana = (
+            viewQ.assign(_gg=viewQ["GRAVIDADE"].isin(GRAV_GG).astype(int))
+                 .groupby("ANALISTA", observed=True)["_gg"]
+                 .mean()
+                 .reset_index(name="%GG")
+        )
+        ana = ana.sort_values("%GG", ascending=False)
+        ana["%GG"] = (ana["%GG"] * 100).round(1)
+        return ana
+
+    def weekday_counts(self) -> pd.DataFrame:
+        dow_counts = (self.cq["n"].groupby(weekday(self.cq)).sum()
+                      .reindex(list(DOW_LABELS.keys()), fill_value=0)
+                      .rename(index=DOW_LABELS))
+        return pd.DataFrame({"DIA": dow_counts.index, "QTD": dow_counts.values})
+
+    @_per_view
+    def vist_tables(self, liq: bool = False) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame, Optional[str]]:
+        """(base numérica, denominador, tabela formatada e ordenada, aviso de fallback da Produção)."""
+        fallback_note = None
+        prod = make_prod(self.cp)
+
+        if prod["vist"].sum() == 0:
+            if not self.cubeP.empty:
+                prod_month = self.flt.view(self.cubeP, PROD_DATE, period=(self.month_start, self.month_end))
+                prod = make_prod(prod_month)
+                if prod["vist"].sum() > 0:
+                    fallback_note = "Usando produção do mês (fallback), pois não houve produção no período selecionado."
+
+        if prod["vist"].sum() == 0 and not self.cubeP.empty:
+            prod = make_prod(self.cubeP)
+            fallback_note = "Usando produção global (fallback), pois não há produção no mês/período selecionado."
+
+        qual = rollup(self.cq, "VISTORIADOR", ["n", "gg"]).rename(columns={"n": "erros", "gg": "erros_gg"})
+
+        base = fill_numeric(prod.merge(qual, on="VISTORIADOR", how="outer"))
+        den = base["liq"] if liq else base["vist"]
+        den = den.replace({0: np.nan})
+
+        base["%ERRO"]    = ((base["erros"]    / den) * 100).round(1)
+        base["%ERRO_GG"] = ((base["erros_gg"] / den) * 100).round(1)
+        base["FAROL_%ERRO"]    = farol(base["%ERRO"],    META_ERRO,    TOL_AMARELO)
+        base["FAROL_%ERRO_GG"] = farol(base["%ERRO_GG"], META_ERRO_GG, TOL_AMARELO)
+
+        fmt = base.copy()
+        for c in ["vist", "rev", "liq", "erros", "erros_gg"]:
+            fmt[c] = pd.to_numeric(fmt[c], errors="coerce").fillna(0).astype(int)
+
+        fmt["%ERRO"]    = fmt_num(fmt["%ERRO"],    prefix=fmt["FAROL_%ERRO"],    suffix="%")
+        fmt["%ERRO_GG"] = fmt_num(fmt["%ERRO_GG"], prefix=fmt["FAROL_%ERRO_GG"], suffix="%")
+
+        # Ordenação decrescente pelo valor numérico real (%ERRO)
+        fmt_sorted = fmt.sort_values(by="%ERRO", key=lambda col: base.loc[col.index, "%ERRO"], ascending=False)
+        return base, den, fmt_sorted, fallback_note
+
+    def trend(self) -> pd.DataFrame:
+        """Projeção de erros por vistoriador até o fim do mês (dias úteis das METAS ou do calendário)."""
+        erros_mtd = rollup(self.mtd_cq, "VISTORIADOR", ["n"]).rename(columns={"n": "ERROS_MTD"})
+        dfMetas = self.dfMetas
+        metas_cur = (dfMetas[dfMetas["YM"].fillna("").astype(str) == self.ym].copy()
+                     if "YM" in dfMetas.columns else dfMetas.copy())
+        if not metas_cur.empty and "DIAS_UTEIS" in metas_cur.columns:
+            metas_cur["VISTORIADOR"] = metas_cur["VISTORIADOR"].astype(str).map(_upper)
+        return trend_projection(erros_mtd, metas_cur, self.dias_passados, self.dias_totais)
+
+    def compare_prev(self) -> pd.DataFrame:
+        """Erros por vistoriador: período atual × mesmo intervalo do mês anterior."""
+        cur = rollup(self.cq, "VISTORIADOR", ["n"]).rename(columns={"n": "ERROS_ATUAL"})
+        prev = rollup(self.prev_cq, "VISTORIADOR", ["n"]).rename(columns={"n": "ERROS_ANT"})
+
+        tab = fill_numeric(cur.merge(prev, on="VISTORIADOR", how="outer"))
+        tab["Δ"] = tab["ERROS_ATUAL"] - tab["ERROS_ANT"]
+        tab["VAR_%"] = np.where(tab["ERROS_ANT"] > 0, (tab["Δ"] / tab["ERROS_ANT"]) * 100, np.nan)
+        tab["Status"] = tab["Δ"].map(_status)
+        tab["VAR_%"] = tab["VAR_%"].map(_fmt_pct)
+        return tab.sort_values("ERROS_ATUAL", ascending=False)[
+            ["VISTORIADOR", "ERROS_ATUAL", "ERROS_ANT", "Δ", "VAR_%", "Status"]
+        ]
+
+    def week_windows(self) -> list:
+        """Até 4 semanas (início, fim) terminando no fim do período, dentro do mês, da mais antiga à atual."""
+        sem_fins = []
+        cur_end = min(self.flt.end, self.month_end)
+        for _ in range(4):
+            di = max((pd.Timestamp(cur_end) - pd.Timedelta(days=6)).date(), self.month_start)
+            dfim = min(cur_end, self.month_end)
+            if di > dfim or dfim < self.month_start:
+                break
+            sem_fins.append((di, dfim))
+            cur_end = (pd.Timestamp(di) - pd.Timedelta(days=1)).date()
+            if cur_end < self.month_start:
+                break
+        return list(reversed(sem_fins))
+
+    def _pct_week(self, di: date, dfim: date, liq: bool) -> pd.DataFrame:
+        """ERROS por vist. + %ERRO (bruta ou líquida) numa janela semanal (fatias do cubo)."""
+        spec = FilterSpec.build(di, dfim)
+        qdf = self.cq[spec.mask(self.cq, QUALITY_DATE)]
+        pdf = self.cp[spec.mask(self.cp, PROD_DATE)]
+        if qdf.empty:
+            qual = pd.DataFrame(columns=["VISTORIADOR", "ERROS", "ERROS_GG"])
+        else:
+            qual = rollup(qdf, "VISTORIADOR", ["n", "gg"]).rename(columns={"n": "ERROS", "gg": "ERROS_GG"})
+
+        den_col = "liq" if liq else "vist"
+        out = fill_numeric(make_prod(pdf).merge(qual, on="VISTORIADOR", how="outer"))
+        for c in ["vist", "rev", "liq", "ERROS", "ERROS_GG"]:
+            if c in out.columns:
+                out[c] = pd.to_numeric(out[c], errors="coerce").fillna(0)
+
+        den = out[den_col].replace({0: np.nan}).astype(float)
+        out["%ERRO"]    = (out["ERROS"]    / den * 100).round(1)
+        out["%ERRO_GG"] = (out["ERROS_GG"] / den * 100).round(1)
+        out["DEN"] = out[den_col].fillna(0).astype(int)
+        return out[["VISTORIADOR", "ERROS", "%ERRO", "ERROS_GG", "%ERRO_GG", "DEN"]]
+
+    def weekly(self, liq: bool = False) -> Optional[Tuple[pd.DataFrame, list, int]]:
+        """Comparativo S1..Sk: (tabela formatada, [(prefixo, início, fim)], k); None com menos de 2 semanas."""
+        sem_fins = self.week_windows()
+        if len(sem_fins) < 2:
+            return None
+        k = len(sem_fins)
+
+        meta = [(f"S{i}_", di, dfim) for i, (di, dfim) in enumerate(sem_fins, start=1)]
+        blocks = [self._pct_week(di, dfim, liq).add_prefix(prefix) for prefix, di, dfim in meta]
+        tab = reduce(
+            lambda L, R: L.merge(R, left_on=f"{L.columns[0]}", right_on=f"{R.columns[0]}", how="outer"),
+            blocks
+        )
+
+        tab["VISTORIADOR"] = first_nonblank(tab, [f"S{i}_VISTORIADOR" for i in range(1, k + 1)])
+
+        for c in tab.columns:
+            if c.endswith("ERROS") or c.endswith("ERROS_GG") or c.endswith("DEN"):
+                tab[c] = pd.to_numeric(tab[c], errors="coerce").fillna(0).astype(int)
+
+        for i in range(1, k):
+            dcol = f"Δ_%ERRO_S{i}_S{i+1}"
+            tab[dcol] = (tab[f"S{i+1}_%ERRO"] - tab[f"S{i}_%ERRO"]).round(1)
+            tab[f"Status (S{i}→S{i+1})"] = tab[dcol].map(_status_pp)
+
+        if k >= 3:
+            tab["Status (3-semanas)"] = status3(tab[f"S{k-2}_%ERRO"], tab[f"S{k-1}_%ERRO"], tab[f"S{k}_%ERRO"])
+
+        cols = ["VISTORIADOR"]
+        for i in range(1, k + 1):
+            cols += [f"S{i}_ERROS", f"S{i}_%ERRO", f"S{i}_ERROS_GG", f"S{i}_%ERRO_GG"]
+        for i in range(1, k):
+            cols += [f"Δ_%ERRO_S{i}_S{i+1}", f"Status (S{i}→S{i+1})"]
+        if k >= 3:
+            cols += ["Status (3-semanas)"]
+
+        out = tab[cols].copy()
+        for c in out.columns:
+            if c.endswith("%ERRO") or c.endswith("%ERRO_GG"):
+                out[c] = out[c].map(_fmt_pct)
+            elif c.startswith("Δ_%ERRO_"):
+                out[c] = out[c].map(_fmt_pp)
+
+        order_key = tab[f"S{k}_%ERRO"].fillna(-1).values
+        out = out.iloc[np.argsort(-order_key)]
+        return out.reset_index(drop=True), meta, k
+
+    def ranking(self, liq: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """(5 melhores, 5 piores) por %ERRO entre quem tem denominador."""
+        base, den, _, _ = self.vist_tables(liq)
+        rank = base[den > 0].replace({np.inf: np.nan}).dropna(subset=["%ERRO"])
+
+        den_col = "liq" if liq else "vist"
+        col_titulo_den = "vistórias líquidas" if liq else "vistórias"
+        cols_rank = ["VISTORIADOR", den_col, "erros", "%ERRO", "%ERRO_GG"]
+        rank_view = rank[cols_rank].rename(columns={den_col: col_titulo_den})
+
+        for c in [col_titulo_den, "erros"]:
+            if c in rank_view.columns: rank_view[c] = rank_view[c].astype(int)
+        for c in ["%ERRO", "%ERRO_GG"]:
+            if c in rank_view.columns: rank_view[c] = rank_view[c].map(lambda x: f"{x:.1f}%" if pd.notna(x) else "—")
+
+        best5  = rank_view.sort_values("%ERRO", ascending=True).head(5).reset_index(drop=True)
+        worst5 = rank_view.sort_values("%ERRO", ascending=False).head(5).reset_index(drop=True)
+        return best5, worst5
+
+    def fraud(self) -> pd.DataFrame:
+        """Linhas de TENTATIVA DE FRAUDE do recorte (colunas do detalhamento, DATA como date)."""
+        viewQ = self.viewQ
+        fraude_mask = viewQ["ERRO"].astype(str).str.upper().str.contains(r"\bTENTATIVA DE FRAUDE\b", na=False)
+        df_fraude = viewQ[fraude_mask]
+        if df_fraude.empty:
+            return df_fraude
+        df_fraude = df_fraude.reindex(columns=FRAUD_COLUMNS, fill_value="").sort_values(["DATA", "UNIDADE", "VISTORIADOR"])
+        df_fraude["DATA"] = df_fraude["DATA"].dt.date
+        return df_fraude
+
+    # ------------------ tudo de uma vez ------------------
+    def tables(self, liq: bool = False, timings: Optional[Dict[str, float]] = None) -> dict:
+        """{seção: resultado} de todas as SECTIONS; com `timings`, grava os segundos de cada uma."""
+        out = {}
+        for name in self.SECTIONS:
+            fn = getattr(self, name)
+            t0 = time.perf_counter()
+            out[name] = fn(liq) if name in ("heatmap", "vist_tables", "weekly", "ranking") else fn()
+            if timings is not None:
+                timings[name] = time.perf_counter() - t0
+        return out
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Cubo diário agregado (dia × unidade × vistoriador × ...)
+# ============================================================
+"""Contagens diárias pré-agregadas na carga; as seções do painel somam fatias.
+
+Qualidade: DIA × UNIDADE × VISTORIADOR × GRAVIDADE × ERRO → n (erros), gg (erros GG)
+Produção:  DIA × UNIDADE × VISTORIADOR                    → vist (brutas), rev (revistorias)
+
+Os cubos têm DIA/UNIDADE/VISTORIADOR como as bases, então o mesmo FilterSpec
+recorta linhas brutas ou cubo. O custo de cada rerun passa a depender do número
+de chaves distintas, não do número de linhas.
+"""
+
+from typing import Iterable, Union
+
+import pandas as pd
+
+from painel.schema import DAY_COL
+
+GRAV_GG = {"GRAVE", "GRAVISSIMO", "GRAVÍSSIMO"}
+
+QUALITY_KEYS = [DAY_COL, "UNIDADE", "VISTORIADOR", "GRAVIDADE", "ERRO"]
+PROD_KEYS = [DAY_COL, "UNIDADE", "VISTORIADOR"]
+
+
+def build_quality_cube(dfQ: pd.DataFrame) -> pd.DataFrame:
+    keys = [k for k in QUALITY_KEYS if k in dfQ.columns]
+    if dfQ.empty:
+        return pd.DataFrame(columns=keys + ["n", "gg"])
+    cube = dfQ.groupby(keys, observed=True, dropna=False).size().reset_index(name="n")
+    gg = cube["GRAVIDADE"].isin(GRAV_GG) if "GRAVIDADE" in cube.columns else False
+    cube["gg"] = cube["n"].where(gg, 0)
+    return cube
+
+
+def build_prod_cube(dfP: pd.DataFrame) -> pd.DataFrame:
+    keys = [k for k in PROD_KEYS if k in dfP.columns]
+    if dfP.empty:
+        return pd.DataFrame(columns=keys + ["vist", "rev"])
+    return (
+        dfP.groupby(keys, observed=True, dropna=False)
+           .agg(vist=("IS_REV", "size"), rev=("IS_REV", "sum"))
+           .reset_index()
+    )
+
+
+def rollup(cube: pd.DataFrame, by: Union[str, Iterable[str]], measures: Iterable[str]) -> pd.DataFrame:
+    """Soma as medidas de uma fatia do cubo pelas chaves pedidas."""
+    by = [by] if isinstance(by, str) else list(by)
+    measures = list(measures)
+    if cube.empty:
+        return pd.DataFrame(columns=by + measures)
+    return cube.groupby(by, observed=True, dropna=False)[measures].sum().reset_index()
+
+
+def weekday(cube: pd.DataFrame) -> pd.Series:
+    """Dia da semana (0 = segunda) a partir de DIA; 01/01/1970 foi uma quinta."""
+    return (cube[DAY_COL].astype("int64") + 3) % 7
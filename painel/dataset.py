@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Base única do processo (snapshot versionado + atualização em 2º plano)
+# ============================================================
+"""Um único conjunto Qualidade/Produção/Metas por processo, trocado atomicamente.
+
+Cada sessão do Streamlit pega o `Snapshot` corrente (referência, sem cópia) e
+só filtra/agrupa a partir dele — os frames são somente leitura para quem os
+recebe. Uma thread em 2º plano chama `build(anterior)` a cada `interval`
+segundos; se a versão não mudou, `build` devolve o próprio snapshot anterior e
+nada é trocado. Falhas na atualização mantêm o último snapshot bom. Com
+`idle_seconds`, a thread para quando ninguém lê o snapshot por esse tempo; na
+próxima leitura ela volta e, se o snapshot tiver mais de `interval` segundos,
+essa leitura já espera a atualização (não devolve dados de horas atrás).
+
+A thread só guarda uma referência fraca ao gerenciador: descartado o
+gerenciador (p.ex. saiu do cache do Streamlit), ela termina no próximo ciclo.
+"""
+
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Bases prontas de uma versão (chave = IDs + modifiedTime de todos os meses)."""
+    version: str
+    dfQ: pd.DataFrame
+    dfP: pd.DataFrame
+    dfMetas: pd.DataFrame
+    cubeQ: pd.DataFrame
+    cubeP: pd.DataFrame
+    report: dict = field(default_factory=dict)
+    built_at: float = field(default_factory=time.time)
+
+
+class DatasetManager:
+    """Dono do snapshot corrente; sessões leem, só a thread de atualização escreve."""
+
+    def __init__(self, build: Callable[[Optional[Snapshot]], Snapshot], interval: float = 60.0,
+                 idle_seconds: Optional[float] = None):
+        self._build = build
+        self.interval = max(1.0, float(interval))
+        self.idle_seconds = idle_seconds
+        self.last_access = time.time()
+        self._snap: Optional[Snapshot] = None
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[BaseException] = None
+        self.last_refresh: float = 0.0
+
+    def current(self) -> Snapshot:
+        """Snapshot corrente; na primeira vez monta (as demais sessões esperam a mesma carga)."""
+        self.last_access = time.time()
+        if self.idle_seconds is not None and not self.running:
+            self.start()
+            if self._snap is not None and time.time() - self.last_refresh > self.interval:
+                self._refresh_quietly()     # voltou do ocioso: o snapshot pode ser antigo
+        snap = self._snap
+        if snap is not None:
+            return snap
+        with self._build_lock:
+            if self._snap is None:
+                self._swap(self._build(None))
+            return self._snap
+
+    def refresh(self) -> Snapshot:
+        """Monta a versão nova (ou reaproveita a atual) e troca o snapshot."""
+        with self._build_lock:
+            self._swap(self._build(self._snap))
+            return self._snap
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:   # mantém o último snapshot bom
+            self.last_error = e
+            log.warning("Falha ao atualizar a base do painel: %s", e)
+
+    def _swap(self, snap: Snapshot) -> None:
+        self.last_refresh = time.time()
+        self.last_error = None
+        if snap is not self._snap:
+            self._snap = snap
+
+    @property
+    def running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self) -> "DatasetManager":
+        """Liga a atualização periódica em 2º plano (idempotente)."""
+        with self._thread_lock:
+            if not self.running:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=_loop, args=(weakref.ref(self), self._stop, self.interval),
+                                                name="dataset-refresh", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def _loop(ref: "weakref.ref[DatasetManager]", stop: threading.Event, interval: float) -> None:
+    """Atualização periódica; termina com `stop`, com o gerenciador ocioso ou já descartado."""
+    while not stop.wait(interval):
+        manager = ref()
+        if manager is None:
+            return
+        if manager.idle_seconds is not None and time.time() - manager.last_access > manager.idle_seconds:
+            return
+        manager._refresh_quietly()
+        del manager
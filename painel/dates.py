@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Datas: parser escalar (legado) e versão vetorizada
+# ============================================================
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y")
+
+# Faixa de seriais do Excel que cabe em datetime64[ns] (≈1680–2255).
+_SERIAL_MIN, _SERIAL_MAX = -80_000, 130_000
+
+
+def parse_date_any(x):
+    if pd.isna(x) or x == "":
+        return pd.NaT
+    if isinstance(x, (int, float)) and not isinstance(x, bool):
+        try:
+            return (pd.to_datetime("1899-12-30") + pd.to_timedelta(int(x), unit="D")).date()
+        except Exception:
+            pass
+    s = str(x).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt).date()
+        except Exception:
+            pass
+    try:
+        return pd.to_datetime(s).date()
+    except Exception:
+        return pd.NaT
+
+
+def parse_dates(values) -> pd.Series:
+    """Versão vetorizada de `parse_date_any` para uma coluna inteira.
+
+    Devolve datetime64[ns] normalizado (meia-noite), com o mesmo resultado de
+    `pd.to_datetime(values.apply(parse_date_any))`:
+      1. seriais do Excel (int/float) numa única soma de timedelta;
+      2. um `to_datetime(format=...)` por formato, na ordem de DATE_FORMATS,
+         só sobre o que ainda não foi reconhecido;
+      3. o que sobrar passa pelo parser escalar, uma vez por valor distinto.
+    """
+    s = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    if pd.api.types.is_datetime64_any_dtype(s):
+        if getattr(s.dt, "tz", None) is not None:
+            s = s.dt.tz_localize(None)
+        return s.astype("datetime64[ns]").dt.normalize()
+
+    arr = s.to_numpy(dtype=object)
+    out = np.full(len(arr), np.datetime64("NaT"), dtype="datetime64[ns]")
+    todo = ~pd.isna(arr)
+
+    # 1) seriais do Excel (mesma regra do escalar: int/float, exceto bool)
+    is_num = todo & np.fromiter(
+        (isinstance(v, (int, float)) and not isinstance(v, bool) for v in arr), dtype=bool, count=len(arr)
+    )
+    if is_num.any():
+        days = np.trunc(arr[is_num].astype(float))
+        ok = np.isfinite(days) & (days >= _SERIAL_MIN) & (days <= _SERIAL_MAX)
+        pos = np.flatnonzero(is_num)[ok]
+        out[pos] = (EXCEL_EPOCH + pd.to_timedelta(days[ok].astype("int64"), unit="D")).to_numpy()
+        todo[pos] = False
+
+    # 2) um to_datetime por formato, na ordem do parser escalar
+    is_str = todo & np.fromiter((isinstance(v, str) for v in arr), dtype=bool, count=len(arr))
+    pos = np.flatnonzero(is_str)
+    strs = pd.Series(arr[pos], dtype=object).str.strip()
+    for fmt in DATE_FORMATS:
+        if not len(pos):
+            break
+        parsed = pd.to_datetime(strs, format=fmt, errors="coerce").to_numpy()
+        hit = ~pd.isna(parsed)
+        out[pos[hit]] = parsed[hit]
+        todo[pos[hit]] = False
+        pos, strs = pos[~hit], strs[~hit]
+
+    # 3) resto (datas com hora, objetos date/datetime, lixo): escalar por valor distinto
+    if todo.any():
+        pos = np.flatnonzero(todo)
+        rest = pd.Series(arr[pos], dtype=object)
+        lookup = {v: parse_date_any(v) for v in pd.unique(rest)}
+        out[pos] = pd.to_datetime(rest.map(lookup), errors="coerce").to_numpy()
+
+    return pd.Series(out, index=s.index).dt.normalize()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Exportação Excel com farol de cores
+# ============================================================
+"""Planilha 'Erros por Vistoriador' escrita em uma única passada.
+
+As linhas saem de `to_numpy().tolist()` (sem iterrows) e os estilos do farol
+são objetos compartilhados criados uma vez, não um PatternFill por célula. O
+workbook é write-only (as linhas vão direto para o XML, sem o modelo de
+células em memória); outras tabelas do painel entram como abas extras.
+"""
+
+import io
+from typing import Dict, Optional
+
+import pandas as pd
+
+from painel.tables import FAROL_AMARELO, FAROL_VERDE, FAROL_VERMELHO
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
+    ok_openpyxl = True
+except Exception:
+    ok_openpyxl = False
+
+FAROL_HEADERS = ["VISTORIADOR", "vist", "rev", "liq", "erros", "erros_gg", "%ERRO", "%ERRO_GG"]
+FAROL_WIDTHS = {"A": 28, "B": 10, "C": 10, "D": 10, "E": 10, "F": 10, "G": 12, "H": 12}
+FAROL_COLORS = {FAROL_VERDE: "C6EFCE", FAROL_AMARELO: "FFF2CC", FAROL_VERMELHO: "F4CCCC"}
+_INT_COLS = ["vist", "rev", "liq", "erros", "erros_gg"]
+
+
+def _farol_key(s: pd.Series) -> list:
+    """Emoji do farol contido em cada valor (ou None)."""
+    s = s.astype(object).where(s.map(type).eq(str), "")
+    key = pd.Series(None, index=s.index, dtype=object)
+    for emoji in FAROL_COLORS:
+        key = key.mask(key.isna() & s.str.contains(emoji, regex=False), emoji)
+    return key.tolist()
+
+
+def _plain_rows(df: pd.DataFrame) -> list:
+    """Linhas de valores Python (vazios → None) para `ws.append`."""
+    data = df.astype(object)
+    return data.where(df.notna(), None).to_numpy().tolist()
+
+
+def _append_frame(wb, title: str, df: pd.DataFrame) -> None:
+    ws = wb.create_sheet(title[:31])
+    for i, c in enumerate(df.columns, start=1):   # write-only: larguras antes das linhas
+        ws.column_dimensions[get_column_letter(i)].width = min(40, max(10, len(str(c)) + 2))
+    ws.append([str(c) for c in df.columns])
+    for row in _plain_rows(df):
+        ws.append(row)
+
+
+def farol_xlsx(fmt_sorted: pd.DataFrame, extra: Optional[Dict[str, pd.DataFrame]] = None) -> bytes:
+    """Bytes do .xlsx a partir da tabela já formatada/ordenada (com FAROL_*).
+
+    `extra` ({título: frame}) vira uma aba simples por tabela, na ordem dada.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Erros por Vistoriador")
+    for col, w in FAROL_WIDTHS.items():
+        ws.column_dimensions[col].width = w
+    ws.append(FAROL_HEADERS)
+
+    fills = {e: PatternFill(start_color=c, end_color=c, fill_type="solid") for e, c in FAROL_COLORS.items()}
+    center = Alignment(horizontal="center")
+
+    def _farol_cell(value, emoji):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.alignment = center
+        if emoji in fills:
+            cell.fill = fills[emoji]
+        return cell
+
+    data = fmt_sorted.reindex(columns=FAROL_HEADERS).copy()
+    data["VISTORIADOR"] = data["VISTORIADOR"].astype(object)
+    for c in _INT_COLS:
+        data[c] = pd.to_numeric(data[c], errors="coerce").fillna(0).astype(int)
+    rows = data.astype(object).to_numpy().tolist()
+
+    k_tot = _farol_key(fmt_sorted.get("FAROL_%ERRO", pd.Series(None, index=fmt_sorted.index)))
+    k_gg = _farol_key(fmt_sorted.get("FAROL_%ERRO_GG", pd.Series(None, index=fmt_sorted.index)))
+
+    for row, e_tot, e_gg in zip(rows, k_tot, k_gg):
+        ws.append(row[:6] + [_farol_cell(row[6], e_tot), _farol_cell(row[7], e_gg)])
+
+    for title, df in (extra or {}).items():
+        if df is not None:
+            _append_frame(wb, title, df)
+
+    xbuf = io.BytesIO()
+    wb.save(xbuf)
+    return xbuf.getvalue()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Filtros do topo do painel (período, unidades, vistoriadores)
+# ============================================================
+
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from painel.schema import DAY_COL, day_codes
+
+
+def _norm(values) -> Tuple[str, ...]:
+    return tuple(sorted({str(v).upper().strip() for v in (values or ()) if pd.notna(v)}))
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """Recorte selecionado no topo do painel, compilado numa única máscara por base.
+
+    Tuplas vazias em `unidades`/`vistoriadores` significam "sem filtro", como nos
+    multiselects. `with_period` reaproveita os mesmos filtros para outra janela
+    (mês anterior, MTD, ontem, mês cheio).
+    """
+    start: date
+    end: date
+    unidades: Tuple[str, ...] = ()
+    vistoriadores: Tuple[str, ...] = ()
+
+    @classmethod
+    def build(cls, start: date, end: date, unidades=None, vistoriadores=None) -> "FilterSpec":
+        return cls(start, end, _norm(unidades), _norm(vistoriadores))
+
+    def with_period(self, start: date, end: date) -> "FilterSpec":
+        return replace(self, start=start, end=end)
+
+    def mask(self, df: pd.DataFrame, date_col: str) -> np.ndarray:
+        """Máscara booleana (período + unidades + vistoriadores) numa passada vetorizada."""
+        if DAY_COL in df.columns:
+            dia = df[DAY_COL].to_numpy()
+        else:
+            dia = day_codes(df[date_col])
+        lo = (np.datetime64(self.start, "D") - np.datetime64(0, "D")).astype(int)
+        hi = (np.datetime64(self.end, "D") - np.datetime64(0, "D")).astype(int)
+        m = (dia >= lo) & (dia <= hi)
+        if self.unidades and "UNIDADE" in df.columns:
+            m &= df["UNIDADE"].isin(self.unidades).to_numpy()
+        if self.vistoriadores and "VISTORIADOR" in df.columns:
+            m &= df["VISTORIADOR"].isin(self.vistoriadores).to_numpy()
+        return m
+
+    def view(self, df: pd.DataFrame, date_col: str, period: Optional[Tuple[date, date]] = None) -> pd.DataFrame:
+        """Linhas do recorte: uma única seleção, sem `.copy()` encadeados.
+
+        O resultado é somente leitura para quem o recebe (derive com `assign`).
+        """
+        spec = self.with_period(*period) if period else self
+        if df.empty:
+            return df
+        return df[spec.mask(df, date_col)]
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Leitura e normalização dos meses (índices, Qualidade, Produção + METAS)
+# ============================================================
+"""Um arquivo por vez, a partir de uma `DataSource` (Google ou pasta local).
+
+`load_*`: sem cache, direto da origem. `read_*_cached`: o caminho de leitura
+de um mês com o cache em disco (`MonthStore`) e os acréscimos da Produção,
+o mesmo para app.py e bench/bench_load.py; memória e paralelismo ficam com
+quem chama. As funções devolvem os frames já normalizados no formato que
+`painel.analytics.assemble` espera. Com `timings` (dict), somam em
+segundos o tempo de origem ("io": chamadas/download) e o de "normalizacao"
+(leitura do XLSX, datas, caixa alta, METAS).
+"""
+
+import io, re, tempfile, time, unicodedata
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from painel.dates import parse_dates
+from painel.schema import typed_quality, quality_column, quality_rename_map
+from painel.sheets import read_columns, read_appended, columns_to_frame, quote_title
+from painel.xlsx import read_sheet_chunks
+
+SHEETS_MIME = "application/vnd.google-apps.spreadsheet"
+INDEX_COLUMNS = ["URL", "MÊS", "ATIVO"]
+PROD_SOURCE_COLUMNS = {"UNIDADE", "DATA", "CHASSI", "PERITO", "DIGITADOR"}
+
+
+def _upper(x):
+    return str(x).upper().strip() if pd.notna(x) else ""
+
+def _strip_accents(s: str) -> str:
+    if s is None: return ""
+    return "".join(ch for ch in unicodedata.normalize("NFKD", str(s)) if not unicodedata.combining(ch))
+
+def _find_col(cols, *names) -> Optional[str]:
+    """Encontra a coluna em 'cols' ignorando acentos/maiúsculas/espaços."""
+    norm = {re.sub(r"\W+", "", _strip_accents(c).upper()): c for c in cols}
+    for nm in names:
+        key = re.sub(r"\W+", "", _strip_accents(nm).upper())
+        if key in norm: return norm[key]
+    return None
+
+
+# ------------------ ÍNDICES ------------------
+def load_index(source, sheet_id: str, tab: str = "ARQUIVOS") -> pd.DataFrame:
+    ws = source.worksheet(sheet_id, tab)
+    df = read_columns(ws, lambda h: h.upper() if h.upper() in INDEX_COLUMNS else None)
+    if df.empty:
+        return pd.DataFrame(columns=INDEX_COLUMNS)
+    for need in ["URL", "MÊS", "ATIVO"]:
+        if need not in df.columns:
+            df[need] = ""
+    return df
+
+
+# ------------------ QUALIDADE ------------------
+def _add(timings: Optional[Dict[str, float]], name: str, t0: float) -> float:
+    now = time.perf_counter()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + now - t0
+    return now
+
+def load_quality_month(source, month_id: str, meta: dict, streaming: bool = True,
+                       timings: Optional[Dict[str, float]] = None) -> Tuple[pd.DataFrame, str]:
+    """Baixa e normaliza um mês de Qualidade (Google Sheets ou XLSX no Drive)."""
+    title = meta.get("name", month_id)
+    mime = meta.get("mimeType", "")
+    t0 = time.perf_counter()
+
+    if mime == SHEETS_MIME:
+        try:
+            ws = source.worksheet(month_id, "GERAL")
+        except Exception as e:
+            raise RuntimeError(f"O arquivo '{title}' não possui aba 'GERAL'.") from e
+        dq = read_columns(ws, quality_column, numeric=["DATA"])
+        t0 = _add(timings, "io", t0)
+        if dq.empty:
+            return pd.DataFrame(), title
+    else:
+        if not mime.startswith("application/vnd.openxmlformats-officedocument") and \
+           not mime.startswith("application/vnd.ms-excel"):
+            raise RuntimeError(f"Tipo de arquivo não suportado para Qualidade: {mime} ({title})")
+        if streaming:
+            return _quality_xlsx_streaming(source, month_id, title, timings), title
+        buf = io.BytesIO()
+        source.download_to(month_id, buf)
+        t0 = _add(timings, "io", t0)
+        try:
+            dq = pd.read_excel(io.BytesIO(buf.getvalue()), sheet_name="GERAL", engine="openpyxl")
+        except ValueError as e:
+            raise RuntimeError(f"O arquivo '{title}' não possui aba 'GERAL'.") from e
+        dq.columns = [str(c).strip() for c in dq.columns]
+
+    dq = typed_quality(normalize_quality(dq.rename(columns=quality_rename_map(dq.columns))))
+    _add(timings, "normalizacao", t0)
+    return dq, title
+
+def _quality_xlsx_streaming(source, month_id: str, title: str,
+                            timings: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """XLSX → temporário em disco → aba GERAL em blocos, só com as colunas mapeadas."""
+    t0 = time.perf_counter()
+    with tempfile.TemporaryFile(suffix=".xlsx") as fh:
+        source.download_to(month_id, fh)
+        t0 = _add(timings, "io", t0)
+        fh.seek(0)
+        try:
+            chunks = read_sheet_chunks(fh, "GERAL", quality_column)
+        except ValueError as e:
+            raise RuntimeError(f"O arquivo '{title}' não possui aba 'GERAL'.") from e
+        parts = [normalize_quality(c) for c in chunks]
+    dq = typed_quality(pd.concat(parts, ignore_index=True)) if parts else pd.DataFrame()
+    _add(timings, "normalizacao", t0)
+    return dq
+
+def normalize_quality(dq: pd.DataFrame) -> pd.DataFrame:
+    """Colunas já renomeadas → textos em caixa alta, DATA/DATA_TS e linhas válidas."""
+    for need in ["DATA","PLACA","VISTORIADOR","UNIDADE","ERRO","GRAVIDADE","ANALISTA","EMPRESA"]:
+        if need not in dq.columns:
+            dq[need] = ""
+
+    # Preserva timestamp e mantém DATA (datetime64 à meia-noite)
+    if "DATA" in dq.columns:
+        dq["DATA_TS"] = pd.to_datetime(dq["DATA"], errors="coerce")
+        dq["DATA"] = parse_dates(dq["DATA"])
+    else:
+        dq["DATA_TS"] = pd.NaT
+
+    for c in ["VISTORIADOR","UNIDADE","ERRO","GRAVIDADE","ANALISTA","EMPRESA","PLACA"]:
+        dq[c] = dq[c].astype(str).map(_upper)
+
+    return dq[(dq["VISTORIADOR"] != "") & (dq["ERRO"] != "")]
+
+
+# ------------------ PRODUÇÃO + METAS ------------------
+def prod_column(h: str) -> Optional[str]:
+    return h.upper() if h.upper() in PROD_SOURCE_COLUMNS else None
+
+def load_prod_month(source, month_sheet_id: str, ym: Optional[str] = None, prev: Optional[dict] = None,
+                    timings: Optional[Dict[str, float]] = None):
+    """(dados, metas, info, linhas acrescentadas | None se leitura completa).
+
+    Leitura completa = 2 chamadas (metadados + cabeçalho; colunas da aba 1 + METAS);
+    acréscimo = 1 chamada (fim das colunas + METAS). `info` guarda título, aba,
+    abas auxiliares presentes e o SheetTail para o próximo acréscimo.
+    """
+    got = None
+    t0 = time.perf_counter()
+    if prev:
+        ws = source.sheet(month_sheet_id, prev["sheet"])
+        got = read_appended(ws, prod_column, prev["tail"], numeric=["DATA"],
+                            extra=[quote_title(t) for t in prev["tabs"]])
+        t0 = _add(timings, "io", t0)
+    if got is not None:
+        raw, tail, extra = got
+        tabs = {t: columns_to_frame(v) for t, v in zip(prev["tabs"], extra)}
+        appended = normalize_prod(raw)
+        df = pd.concat([prev["df"], appended], ignore_index=True) if len(appended) else prev["df"]
+        title, sheet = prev["title"], prev["sheet"]
+    else:
+        title, ws, raw, tail, tabs = source.book(month_sheet_id, prod_column, numeric=["DATA"], tabs=["METAS"])
+        t0 = _add(timings, "io", t0)
+        sheet = ws.title if ws is not None else ""
+        df = normalize_prod(raw)
+        appended = None
+        if not df.empty:
+            df = df.sort_values(["__DATA__", "CHASSI"], kind="mergesort").reset_index(drop=True)
+
+    info = {"title": title or month_sheet_id, "sheet": sheet, "tabs": list(tabs), "tail": tail}
+    metas = metas_from(tabs.get("METAS"), ym)
+    _add(timings, "normalizacao", t0)
+    return df, metas, info, appended
+
+def normalize_prod(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas cruas da aba 1 → UNIDADE/CHASSI/VISTORIADOR em caixa alta e __DATA__."""
+    if df.empty:
+        return df
+    col_unid = "UNIDADE" if "UNIDADE" in df.columns else None
+    col_data = "DATA" if "DATA" in df.columns else None
+    col_chas = "CHASSI" if "CHASSI" in df.columns else None
+    col_per  = "PERITO" if "PERITO" in df.columns else None
+    col_dig  = "DIGITADOR" if "DIGITADOR" in df.columns else None
+    req = [col_unid, col_data, col_chas, (col_per or col_dig)]
+    if any(r is None for r in req):
+        return pd.DataFrame()
+
+    df[col_unid] = df[col_unid].map(_upper)
+    df["__DATA__"] = parse_dates(df[col_data])
+    df[col_chas] = df[col_chas].map(_upper)
+
+    if col_per and col_dig:
+        df["VISTORIADOR"] = np.where(
+            df[col_per].astype(str).str.strip() != "",
+            df[col_per].map(_upper),
+            df[col_dig].map(_upper),
+        )
+    elif col_per:
+        df["VISTORIADOR"] = df[col_per].map(_upper)
+    else:
+        df["VISTORIADOR"] = df[col_dig].map(_upper)
+    # IS_REV é calculado depois, sobre todos os meses (ver RevisitIndex)
+    return df
+
+def metas_from(dm: Optional[pd.DataFrame], ym: Optional[str]) -> pd.DataFrame:
+    """Aba METAS crua → VISTORIADOR, UNIDADE, META_MENSAL, DIAS_UTEIS, YM (vazio se não há aba)."""
+    if dm is None or dm.empty:
+        return pd.DataFrame()
+    cols = list(dm.columns)
+    c_vist = _find_col(cols, "VISTORIADOR")
+    c_unid = _find_col(cols, "UNIDADE")
+    c_meta = _find_col(cols, "META_MENSAL", "META MENSAL", "META")
+    c_du   = _find_col(cols, "DIAS ÚTEIS", "DIAS UTEIS", "DIAS_UTEIS")
+    out = pd.DataFrame(index=dm.index)
+    out["VISTORIADOR"] = dm[c_vist].astype(str).map(_upper) if c_vist else ""
+    out["UNIDADE"] = dm[c_unid].astype(str).map(_upper) if c_unid else ""
+    out["META_MENSAL"] = pd.to_numeric(dm[c_meta], errors="coerce").fillna(0).astype(int) if c_meta else 0
+    out["DIAS_UTEIS"]  = pd.to_numeric(dm[c_du], errors="coerce") if c_du else np.nan
+    out["DIAS_UTEIS"]  = out["DIAS_UTEIS"].astype(float).round().astype("Int64")
+    out["YM"] = ym or ""
+    return out.reset_index(drop=True)
+
+
+# ------------------ MÊS COM CACHE EM DISCO ------------------
+def read_quality_cached(store, source, month_id: str, version: str = "",
+                        metadata: Optional[Callable[[str], dict]] = None, streaming: bool = True,
+                        timings: Optional[Dict[str, float]] = None) -> Tuple[pd.DataFrame, str, str]:
+    """(dados, título, "disco" | "miss"): a cópia em disco se `version` (modifiedTime) bate, senão a origem.
+
+    Sem `version`, lê da origem e grava com o modifiedTime dos metadados.
+    `metadata` troca `source.metadata` (p.ex. por uma versão em cache).
+    """
+    hit = store.get("qualidade", month_id, version)
+    if hit is not None:
+        frames, info = hit
+        return frames["dados"], info.get("title", month_id), "disco"
+
+    t0 = time.perf_counter()
+    meta = (metadata or source.metadata)(month_id)
+    _add(timings, "io", t0)
+    dq, title = load_quality_month(source, month_id, meta, streaming=streaming, timings=timings)
+    store.put("qualidade", month_id, version or meta.get("modifiedTime", ""), {"dados": dq}, {"title": title})
+    return dq, title, "miss"
+
+def read_prod_cached(store, source, month_sheet_id: str, ym: Optional[str] = None, version: str = "",
+                     key: str = "", tails: Optional[dict] = None, full_refresh_seconds: float = 3600,
+                     revisits=None, timings: Optional[Dict[str, float]] = None):
+    """(dados, metas, título, "disco" | "miss" | "acrescimo").
+
+    Disco: versão `version` + mês (vazia = não usa o disco). Com `tails` (dict
+    vivo no processo), uma planilha já lida antes é relida só a partir do fim
+    (acréscimo), até `full_refresh_seconds` depois da última leitura completa;
+    edição acima do fim ou versão nova sem linhas novas voltam à leitura completa
+    (ver `sheets.read_appended`). `revisits.rekey` passa o IS_REV das linhas
+    antigas para a chave `key` do mês.
+    """
+    disk_version = f"{version}_{ym or ''}" if version else ""
+    hit = store.get("producao", month_sheet_id, disk_version)
+    if hit is not None:
+        frames, info = hit
+        return frames["dados"], frames["metas"], info.get("title", month_sheet_id), "disco"
+
+    prev = tails.get(month_sheet_id) if tails is not None else None
+    if prev is not None and (prev["ym"] != ym or time.time() - prev["full_at"] > full_refresh_seconds):
+        prev = None
+
+    df, metas, info, appended = load_prod_month(source, month_sheet_id, ym, prev, timings=timings)
+    if appended is not None and revisits is not None:
+        revisits.rekey(prev["key"], key, appended)
+    if tails is not None and info["tail"] is not None:
+        tails[month_sheet_id] = dict(
+            info, key=key, ym=ym, df=df,
+            full_at=prev["full_at"] if appended is not None else time.time(),
+        )
+    store.put("producao", month_sheet_id, disk_version, {"dados": df, "metas": metas}, {"title": info["title"]})
+    return df, metas, info["title"], "acrescimo" if appended is not None else "miss"
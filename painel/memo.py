@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Memória LRU das tabelas derivadas (por recorte de filtros)
+# ============================================================
+"""Tabelas derivadas (por unidade, heatmap, % por vistoriador, semanal, ranking)
+guardadas pela chave das entradas que de fato usam.
+
+Cada clique num widget reexecuta o script inteiro; sliders do Pareto, abas e
+expanders não mudam o recorte, então as tabelas saem daqui sem recalcular. A
+chave é montada pelo chamador (versão do snapshot, mês, FilterSpec, base do
+%Erro...) e as entradas mais antigas saem quando passa de `maxsize`. Os frames
+devolvidos são compartilhados entre sessões: somente leitura para quem recebe.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+
+class TableMemo:
+    """LRU thread-safe de resultados `build()` por (nome, chave)."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = max(1, int(maxsize))
+        self._data: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Valor guardado para (name, key); senão chama `build()` e guarda o resultado."""
+        return self.lookup(name, key, build)[0]
+
+    def lookup(self, name: str, key: Hashable, build: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Como `get`, dizendo também se veio da memória (True) ou foi calculado agora."""
+        k = (name, key)
+        with self._lock:
+            if k in self._data:
+                self._data.move_to_end(k)
+                self.hits += 1
+                return self._data[k], True
+            self.misses += 1
+        value = build()            # fora do lock: sessões com outros recortes não esperam
+        with self._lock:
+            self._data[k] = value
+            self._data.move_to_end(k)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
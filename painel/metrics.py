@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Métricas no formato Prometheus (contadores e histogramas)
+# ============================================================
+"""Contadores e histogramas do processo, no formato texto do Prometheus.
+
+Sem dependência externa. `REGISTRY.render()` gera o texto; `serve(porta)`
+o expõe em http://<host>:<porta>/metrics (thread própria, pois o Streamlit
+não abre rotas novas); `FileExporter` o grava de tempos em tempos num
+arquivo. O arquivo é substituído de forma atômica, então serve ao textfile
+collector do node_exporter ou a um sidecar.
+
+As medições chegam de dois lados:
+  - `observe(rec)`, inscrito em `painel.perf`: carga de índices e meses
+    (tempo, hit/disco/miss/acréscimo/erro, io x normalização), tabelas
+    memorizadas, seções, página e fragmentos;
+  - `sources.MeteredSource`: cada chamada à origem (Sheets/Drive), com
+    duração, resultado, requisições HTTP e bytes baixados.
+"""
+
+import os, tempfile, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# segundos: chamadas à API e seções vão de dezenas de ms a dezenas de s
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _num(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+class Counter:
+    """Contador monotônico por combinação de rótulos."""
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labels, k)} {_num(v)}" for k, v in items]
+
+
+class Histogram:
+    """Histograma cumulativo (`_bucket`, `_sum`, `_count`) por combinação de rótulos."""
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (), buckets: Sequence[float] = BUCKETS):
+        self.name, self.doc, self.labels = name, doc, tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[Tuple, list] = {}          # rótulos → [contagem por faixa..., soma]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    row[i] += 1
+                    break
+            row[-1] += value
+
+    def count(self, **labels) -> int:
+        row = self._values.get(tuple(str(labels.get(n, "")) for n in self.labels))
+        return sum(row[:-1]) if row else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        out = []
+        for key, row in items:
+            acc = 0
+            for b, n in zip(self.buckets, row):
+                acc += n
+                le = 'le="%s"' % _num(b)
+                out.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {acc}")
+            out.append(f"{self.name}_sum{_labels(self.labels, key)} {_num(row[-1])}")
+            out.append(f"{self.name}_count{_labels(self.labels, key)} {acc}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, doc: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, doc, labels))
+
+    def histogram(self, name: str, doc: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = BUCKETS) -> Histogram:
+        return self._add(Histogram(name, doc, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines += [f"# HELP {m.name} {m.doc}", f"# TYPE {m.name} {m.kind}"]
+            lines += m.samples()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ------------------ MÉTRICAS DO PAINEL ------------------
+SOURCE_CALLS = REGISTRY.counter("painel_origem_chamadas_total",
+                                "Chamadas à origem (Sheets/Drive) por operação e resultado.", ("operacao", "resultado"))
+SOURCE_REQUESTS = REGISTRY.counter("painel_origem_requisicoes_total",
+                                   "Requisições HTTP à origem (uma chamada pode fazer várias), por operação e resultado.",
+                                   ("operacao", "resultado"))
+SOURCE_SECONDS = REGISTRY.histogram("painel_origem_segundos",
+                                    "Duração das chamadas à origem, em segundos.", ("operacao",))
+SOURCE_BYTES = REGISTRY.counter("painel_origem_bytes_total", "Bytes baixados da origem (download de XLSX).")
+LOAD_TOTAL = REGISTRY.counter("painel_carga_total",
+                              "Leituras de índice/mês por tipo e origem do dado (hit, disco, miss, acrescimo, erro).",
+                              ("tipo", "cache"))
+LOAD_SECONDS = REGISTRY.histogram("painel_carga_segundos", "Duração das leituras de índice/mês, em segundos.",
+                                  ("tipo", "cache"))
+LOAD_STAGE_SECONDS = REGISTRY.histogram("painel_carga_etapa_segundos",
+                                        "Leituras que foram à origem: tempo de io e de normalização, em segundos.",
+                                        ("tipo", "etapa"))
+TABLE_TOTAL = REGISTRY.counter("painel_tabela_total", "Consultas às tabelas memorizadas (hit/miss).", ("cache",))
+SECTION_SECONDS = REGISTRY.histogram("painel_secao_segundos", "Tempo de parede por seção da página, em segundos.",
+                                     ("secao",))
+PAGE_SECONDS = REGISTRY.histogram("painel_pagina_segundos", "Tempo de cada execução completa da página, em segundos.")
+FRAGMENT_SECONDS = REGISTRY.histogram("painel_fragmento_segundos",
+                                      "Tempo de cada reexecução só do fragmento (sem a página), em segundos.", ("secao",))
+RETRIES = REGISTRY.counter("painel_origem_novas_tentativas_total",
+                           "Novas tentativas após erro transitório (429/5xx/rede), por operação.", ("operacao",))
+THROTTLE_SECONDS = REGISTRY.histogram("painel_cota_espera_segundos",
+                                      "Espera na fila da cota antes de uma chamada, em segundos.", ("api",))
+BREAKER_OPENED = REGISTRY.counter("painel_disjuntor_aberturas_total",
+                                  "Arquivos que passaram a ter as chamadas suspensas, por operação.", ("operacao",))
+BREAKER_REJECTED = REGISTRY.counter("painel_disjuntor_recusas_total",
+                                    "Chamadas recusadas sem ir à origem (disjuntor aberto), por operação.", ("operacao",))
+STALE_SERVED = REGISTRY.counter("painel_copia_anterior_total",
+                                "Meses servidos da última cópia boa após falha de leitura.", ("tipo",))
+
+
+def observe(rec: dict) -> None:
+    """Registro de `painel.perf.emit` → contadores/histogramas (ms → s)."""
+    ev, s = rec.get("evento"), (rec.get("ms") or 0.0) / 1000
+    if ev == "carga":
+        tipo, cache = rec.get("tipo", ""), "erro" if "erro" in rec else rec.get("cache", "")
+        LOAD_TOTAL.inc(tipo=tipo, cache=cache)
+        LOAD_SECONDS.observe(s, tipo=tipo, cache=cache)
+        for etapa in ("io", "normalizacao"):
+            if f"{etapa}_ms" in rec:
+                LOAD_STAGE_SECONDS.observe(rec[f"{etapa}_ms"] / 1000, tipo=tipo, etapa=etapa)
+    elif ev == "tabela":
+        TABLE_TOTAL.inc(cache=rec.get("cache", ""))
+    elif ev == "secao":
+        SECTION_SECONDS.observe(s, secao=rec.get("secao", ""))
+    elif ev == "pagina":
+        PAGE_SECONDS.observe(s)
+    elif ev == "fragmento" and rec.get("parcial"):
+        FRAGMENT_SECONDS.observe(s, secao=rec.get("secao", ""))
+
+
+# ------------------ EXPOSIÇÃO ------------------
+def serve(port: int, addr: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """GET /metrics em thread daemon; devolve o servidor (`shutdown()` para parar).
+
+    Por padrão só na máquina local; `addr="0.0.0.0"` abre para a rede (coletor em outro host).
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):      # sem uma linha no stderr por coleta
+            pass
+
+    server = ThreadingHTTPServer((addr, int(port)), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="painel-metrics", daemon=True).start()
+    return server
+
+
+def write_textfile(path: str, registry: Registry = REGISTRY) -> None:
+    """Grava o texto em `path` (temporário + rename: quem lê nunca vê o arquivo pela metade)."""
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(registry.render())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class FileExporter:
+    """Thread daemon que regrava o arquivo de métricas a cada `interval` segundos."""
+
+    def __init__(self, path: str, interval: float = 15.0, registry: Registry = REGISTRY):
+        self.path, self.interval, self.registry = path, max(1.0, float(interval)), registry
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, name="painel-metrics-file", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                write_textfile(self.path, self.registry)
+                self.error = None
+            except OSError as e:
+                self.error = str(e)
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            write_textfile(self.path, self.registry)
+        except OSError:
+            pass
+
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Instrumentação: tempo, linhas e cache por seção e por arquivo
+# ============================================================
+"""Medições do painel em registros simples (dicts), também emitidos como JSON.
+
+`PageTimer` acompanha uma execução do script: `step(nome)` fecha a seção
+anterior e abre a próxima. O tempo de parede da seção inclui cálculo, montagem
+dos gráficos (Altair) e envio ao navegador. `memo()` faz a consulta à
+TableMemo e soma à seção corrente o tempo de cálculo, acerto/falta e linhas
+de saída.
+
+Nas leituras (índices, meses), `timed(fn, sink)` embrulha a função em cache.
+O corpo dela chama `note(cache=..., timings=...)` quando de fato roda. Se o
+corpo não rodou, o resultado veio do cache em memória do Streamlit ("hit").
+
+Cada registro vira uma linha JSON no logger `painel.perf` (nível INFO). Sem
+`configure()` o logger fica sem destino e nada é gravado. Quem se inscreve
+com `subscribe(fn)` recebe todo registro, com ou sem log (ex.: métricas).
+"""
+
+import json, logging, threading, time, uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+log = logging.getLogger("painel.perf")
+_tl = threading.local()
+_listeners: List[Callable[[dict], None]] = []
+
+
+def count_rows(value) -> Optional[int]:
+    """Linhas de um resultado: frame/série → len; tupla/lista → soma dos frames; None → 0."""
+    if value is None:
+        return 0
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        sizes = [len(v) for v in value if isinstance(v, (pd.DataFrame, pd.Series))]
+        return sum(sizes) if sizes else None
+    return None
+
+
+def emit(event: str, **fields) -> dict:
+    """Registro {"evento", "ts", ...} (campos None ficam de fora) → log JSON."""
+    rec = {"evento": event, "ts": round(time.time(), 3)}
+    rec.update((k, v) for k, v in fields.items() if v is not None)
+    if log.isEnabledFor(logging.INFO):
+        log.info(json.dumps(rec, ensure_ascii=False, default=str))
+    for fn in _listeners:
+        fn(rec)
+    return rec
+
+
+def subscribe(fn: Callable[[dict], None]) -> None:
+    """`fn(registro)` a cada `emit` (uma vez por função, mesmo se inscrita de novo)."""
+    if fn not in _listeners:
+        _listeners.append(fn)
+
+
+def configure(target: str) -> None:
+    """Liga os logs JSON: "stderr" ou caminho de arquivo (uma linha por evento). Idempotente."""
+    if not target or any(getattr(h, "_painel_perf", None) == target for h in log.handlers):
+        return
+    handler = logging.StreamHandler() if target == "stderr" else logging.FileHandler(target, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._painel_perf = target
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+# ------------------ LEITURAS ------------------
+def note(cache: str = "miss", timings: Optional[Dict[str, float]] = None, **fields) -> None:
+    """Chamado de dentro da função em cache quando ela roda: origem do dado e etapas (s)."""
+    info = {"cache": cache, **fields}
+    for k, v in (timings or {}).items():
+        info[f"{k}_ms"] = _ms(v)
+    _tl.info = info
+
+
+def timed(fn: Callable, sink: Optional[list] = None, event: str = "carga", **fields) -> Callable:
+    """`fn` medida: cada chamada gera um registro (ms, cache, linhas) em `sink` e no log."""
+    def run(**kwargs):
+        _tl.info = None
+        t0 = time.perf_counter()
+        try:
+            value = fn(**kwargs)
+        except Exception as e:
+            rec = emit(event, ms=_ms(time.perf_counter() - t0), erro=f"{type(e).__name__}: {e}", **fields)
+            if sink is not None:
+                sink.append(rec)
+            raise
+        info = getattr(_tl, "info", None) or {"cache": "hit"}
+        _tl.info = None
+        rec = emit(event, ms=_ms(time.perf_counter() - t0), linhas_out=count_rows(value), **fields, **info)
+        if sink is not None:
+            sink.append(rec)
+        return value
+    return run
+
+
+# ------------------ PÁGINA ------------------
+class PageTimer:
+    """Seções de uma execução do script, em sequência."""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:8]
+        self.t0 = time.perf_counter()
+        self.steps: List[dict] = []
+        self.total: Optional[dict] = None
+        self._cur: Optional[dict] = None
+
+    def step(self, name: str, rows_in: Optional[int] = None) -> None:
+        """Fecha a seção corrente e abre `name`."""
+        self._close()
+        self._cur = {"secao": name, "t0": time.perf_counter(), "calc": 0.0, "hits": 0, "misses": 0,
+                     "linhas_in": rows_in, "linhas_out": None}
+
+    def rows(self, rows_in: Optional[int] = None, rows_out: Optional[int] = None) -> None:
+        if self._cur is not None:
+            if rows_in is not None:
+                self._cur["linhas_in"] = rows_in
+            if rows_out is not None:
+                self._cur["linhas_out"] = rows_out
+
+    def memo(self, memo, name: str, key, build: Callable[[], Any]) -> Any:
+        """`memo.get(name, key, build)` medido; fora de uma seção aberta (fragmento) só vai para o log."""
+        t0 = time.perf_counter()
+        value, hit = memo.lookup(name, key, build)
+        dt = time.perf_counter() - t0
+        rows = count_rows(value)
+        emit("tabela", execucao=self.run_id, tabela=name, ms=_ms(dt), cache="hit" if hit else "miss", linhas_out=rows)
+        cur = self._cur
+        if cur is not None:
+            cur["calc"] += dt
+            cur["hits" if hit else "misses"] += 1
+            if rows is not None:
+                cur["linhas_out"] = (cur["linhas_out"] or 0) + rows
+        return value
+
+    def _close(self) -> None:
+        cur, self._cur = self._cur, None
+        if cur is None:
+            return
+        ms = _ms(time.perf_counter() - cur["t0"])
+        calc = _ms(cur["calc"]) if cur["hits"] or cur["misses"] else None
+        cache = None
+        if cur["hits"] or cur["misses"]:
+            cache = "hit" if not cur["misses"] else "miss" if not cur["hits"] else f"{cur['hits']}/{cur['hits'] + cur['misses']} hit"
+        self.steps.append(emit("secao", execucao=self.run_id, secao=cur["secao"], ms=ms, calc_ms=calc,
+                               render_ms=round(ms - calc, 1) if calc is not None else None, cache=cache,
+                               linhas_in=cur["linhas_in"], linhas_out=cur["linhas_out"]))
+
+    def finish(self) -> dict:
+        """Fecha a última seção e registra a página inteira."""
+        self._close()
+        if self.total is None:
+            self.total = emit("pagina", execucao=self.run_id, ms=_ms(time.perf_counter() - self.t0),
+                              secoes=len(self.steps))
+        return self.total
+
+    def elapsed_ms(self) -> float:
+        return _ms(time.perf_counter() - self.t0)
+
+    def frame(self) -> pd.DataFrame:
+        cols = ["secao", "ms", "calc_ms", "render_ms", "cache", "linhas_in", "linhas_out"]
+        df = pd.DataFrame([{c: s.get(c) for c in cols} for s in self.steps], columns=cols)
+        return df.astype({"linhas_in": "Int64", "linhas_out": "Int64"})
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Agendador das chamadas à origem: cota, novas tentativas, disjuntor
+# ============================================================
+"""Um `Scheduler` por processo, compartilhado por todas as sessões e threads.
+
+  - `TokenBucket` por API (Sheets, Drive), na taxa da cota do projeto. Quem
+    chega acima da taxa espera a vez em vez de tomar 429. Cada chamada reserva
+    a sua ficha e as esperas saem em ordem de chegada, então sob muitas
+    sessões a vazão fica no teto da cota.
+  - Novas tentativas com backoff exponencial e jitter completo, só para erros
+    transitórios (429, 5xx, rede). Um `Retry-After` da resposta vale como
+    espera mínima e segura o balde inteiro, não só a thread que levou o 429.
+  - `CircuitBreaker` por arquivo: depois de `threshold` falhas seguidas
+    (já com as novas tentativas), o arquivo fica `cooldown` segundos sem ser
+    chamado (`CircuitOpen` na hora). Passado esse tempo, uma chamada de teste
+    decide se ele volta. Quem chama serve a última cópia boa (ver app.py).
+
+`ResilientSource` aplica o agendador a qualquer `DataSource`.
+"""
+
+import random, threading, time
+from typing import Callable, Dict, Optional
+
+from painel import metrics
+from painel.sources import DataSource, SourceError, is_transient
+
+# operação → API (cada uma com a sua cota)
+API_OF = {"versions": "drive", "metadata": "drive", "download": "drive",
+          "worksheet": "sheets", "book": "sheets", "row_values": "sheets", "batch_get": "sheets"}
+
+
+VERSIONS_KEY = "(lote de versões)"      # chave do disjuntor do batch de modifiedTime
+
+
+class CircuitOpen(SourceError):
+    """Arquivo com falhas seguidas: chamada recusada sem ir à origem."""
+
+
+def retry_after(e: BaseException) -> float:
+    """Segundos pedidos no cabeçalho Retry-After (0 se não houver)."""
+    for headers in (getattr(e, "resp", None), getattr(getattr(e, "response", None), "headers", None),
+                    getattr(e, "headers", None)):
+        try:
+            v = headers.get("retry-after") or headers.get("Retry-After")
+            if v:
+                return max(0.0, float(v))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    return 0.0
+
+
+# ------------------ COTA ------------------
+class TokenBucket:
+    """`rate` fichas/s, acumulando até `burst`. `acquire` reserva e espera a vez (fila por chegada)."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = max(1e-6, float(rate))
+        self.burst = max(1.0, float(burst if burst is not None else rate))
+        self._tokens = self.burst
+        self._t = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._t) * self.rate)
+        self._t = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Toma `tokens` (o saldo pode ficar negativo: é a fila); devolve quanto esperou."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Sem espera: True se havia saldo."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def hold(self, seconds: float) -> None:
+        """Retry-After: ninguém ganha ficha nos próximos `seconds`."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+# ------------------ DISJUNTOR ------------------
+class CircuitBreaker:
+    """Estado por chave (arquivo): fechado → aberto após `threshold` falhas → meio-aberto após `cooldown`."""
+
+    def __init__(self, threshold: int = 3, cooldown: float = 120.0):
+        self.threshold = max(1, int(threshold))
+        self.cooldown = max(0.0, float(cooldown))
+        self._state: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            s = self._state.get(key)
+            if s is None or s["opened_at"] is None:
+                return True
+            if s["trial"] or time.monotonic() - s["opened_at"] < self.cooldown:
+                return False
+            s["trial"] = True           # meio-aberto: só esta chamada passa
+            return True
+
+    def success(self, key: str) -> None:
+        with self._lock:
+            self._state.pop(key, None)
+
+    def failure(self, key: str) -> bool:
+        """Registra a falha; True se o disjuntor abriu (ou reabriu) agora."""
+        with self._lock:
+            s = self._state.setdefault(key, {"failures": 0, "opened_at": None, "trial": False})
+            s["failures"] += 1
+            if s["trial"] or (s["opened_at"] is None and s["failures"] >= self.threshold):
+                s["opened_at"], s["trial"] = time.monotonic(), False
+                return True
+            return False
+
+    def release(self, key: str) -> None:
+        """Chamada de teste terminou sem veredito (erro não transitório): libera outra tentativa."""
+        with self._lock:
+            s = self._state.get(key)
+            if s is not None:
+                s["trial"] = False
+
+    def open_keys(self) -> Dict[str, float]:
+        """{chave: segundos até a próxima chamada de teste} dos disjuntores abertos."""
+        now = time.monotonic()
+        with self._lock:
+            return {k: max(0.0, self.cooldown - (now - s["opened_at"]))
+                    for k, s in self._state.items() if s["opened_at"] is not None}
+
+
+# ------------------ AGENDADOR ------------------
+class Scheduler:
+    """Cota por API + novas tentativas com backoff + disjuntor por arquivo, para todas as chamadas.
+
+    `per_minute` = {"sheets": ..., "drive": ...} (chamadas/min do projeto; 0 = sem limite);
+    `burst_seconds` segundos de cota podem sair de uma vez (a cota do Google é por minuto).
+    `retries` tentativas extras com espera aleatória em [0, min(backoff_max, backoff_base·2^n)].
+    """
+
+    def __init__(self, per_minute: Optional[Dict[str, float]] = None, burst_seconds: float = 10.0, retries: int = 4,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0, breaker_failures: int = 3,
+                 breaker_cooldown: float = 120.0, seed: Optional[int] = None):
+        self.buckets = {api: TokenBucket(n / 60.0, max(1.0, n / 60.0 * burst_seconds))
+                        for api, n in (per_minute or {}).items() if n and n > 0}
+        self.retries = max(0, int(retries))
+        self.backoff_base = max(0.0, float(backoff_base))
+        self.backoff_max = max(self.backoff_base, float(backoff_max))
+        self.breaker = CircuitBreaker(breaker_failures, breaker_cooldown)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {"chamadas": 0, "novas_tentativas": 0, "falhas": 0, "recusadas": 0, "espera_s": 0.0}
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "Scheduler":
+        """Bloco [api_limits] do secrets.toml (cotas por minuto, tempos em segundos)."""
+        return cls(per_minute={"sheets": float(cfg.get("sheets_per_minute", 300)),
+                               "drive": float(cfg.get("drive_per_minute", 6000))},
+                   burst_seconds=float(cfg.get("burst_seconds", 10)),
+                   retries=int(cfg.get("retries", 4)), backoff_base=float(cfg.get("backoff_base_s", 0.5)),
+                   backoff_max=float(cfg.get("backoff_max_s", 30)),
+                   breaker_failures=int(cfg.get("breaker_failures", 3)),
+                   breaker_cooldown=float(cfg.get("breaker_cooldown_s", 120)))
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counts[name] += amount
+
+    def backoff(self, attempt: int) -> float:
+        with self._lock:
+            return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(self, op: str, key: str, fn: Callable, *args, cost: float = 1.0, **kwargs):
+        """`fn(*args, **kwargs)` dentro da cota, com novas tentativas; `key` = arquivo ("" = sem disjuntor)."""
+        if key and not self.breaker.allow(key):
+            self._count("recusadas")
+            metrics.BREAKER_REJECTED.inc(operacao=op)
+            raise CircuitOpen(f"Arquivo {key} com falhas seguidas: chamadas suspensas por alguns minutos")
+        api = API_OF.get(op, "sheets")
+        bucket = self.buckets.get(api)
+        attempt = 0
+        while True:
+            if bucket is not None:
+                waited = bucket.acquire(cost)
+                if waited:
+                    self._count("espera_s", waited)
+                    metrics.THROTTLE_SECONDS.observe(waited, api=api)
+            self._count("chamadas")
+            try:
+                out = fn(*args, **kwargs)
+            except Exception as e:
+                transient = is_transient(e)
+                if transient and attempt < self.retries:
+                    hint = retry_after(e)
+                    if hint and bucket is not None:
+                        bucket.hold(hint)
+                    time.sleep(max(hint, self.backoff(attempt)))
+                    attempt += 1
+                    self._count("novas_tentativas")
+                    metrics.RETRIES.inc(operacao=op)
+                    continue
+                self._count("falhas")
+                if key:
+                    if not transient:
+                        self.breaker.release(key)
+                    elif self.breaker.failure(key):
+                        metrics.BREAKER_OPENED.inc(operacao=op)
+                raise
+            if key:
+                self.breaker.success(key)
+            return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self.counts)
+        out["abertos"] = self.breaker.open_keys()
+        return out
+
+
+class ResilientSource(DataSource):
+    """Outra origem com todas as chamadas passando pelo `Scheduler` (inclusive as das abas)."""
+
+    def __init__(self, inner: DataSource, scheduler: Scheduler):
+        self.inner = inner
+        self.scheduler = scheduler
+        self.index_ids = inner.index_ids
+
+    def __getattr__(self, name):          # stats(), prepare()... da origem de dentro
+        return getattr(self.inner, name)
+
+    def http_requests(self, op, size=0):
+        return self.inner.http_requests(op, size)
+
+    def versions(self, file_ids):
+        ids = list(dict.fromkeys(file_ids))
+        # batch da Drive API: cada arquivo do lote conta na cota; falhas seguidas abrem o disjuntor do lote
+        return self.scheduler.call("versions", VERSIONS_KEY, self.inner.versions, ids, cost=max(1, len(ids)))
+
+    def metadata(self, file_id):
+        return self.scheduler.call("metadata", file_id, self.inner.metadata, file_id)
+
+    def worksheet(self, sheet_id, tab):
+        ws = self.scheduler.call("worksheet", sheet_id, self.inner.worksheet, sheet_id, tab,
+                                 cost=self.inner.http_requests("worksheet"))
+        return _ScheduledSheet(self.scheduler, sheet_id, ws)
+
+    def download_to(self, file_id, fh):
+        start = fh.tell()
+
+        def _download():
+            fh.seek(start)              # nova tentativa: recomeça do zero
+            fh.truncate()
+            self.inner.download_to(file_id, fh)
+        self.scheduler.call("download", file_id, _download)
+
+    def book(self, sheet_id, pick, numeric=(), tabs=()):
+        # read_book: cabeçalho + batch_get = 2 chamadas à Sheets API
+        return self.scheduler.call("book", sheet_id, self.inner.book, sheet_id, pick,
+                                   numeric=numeric, tabs=tabs, cost=self.inner.http_requests("book"))
+
+    def sheet(self, sheet_id, title):
+        return _ScheduledSheet(self.scheduler, sheet_id, self.inner.sheet(sheet_id, title))
+
+
+class _ScheduledSheet:
+    def __init__(self, scheduler: Scheduler, file_id: str, ws):
+        self._scheduler, self._file_id, self._ws = scheduler, file_id, ws
+
+    def __getattr__(self, name):          # title, id... da aba de dentro
+        return getattr(self._ws, name)
+
+    def row_values(self, row: int) -> list:
+        return self._scheduler.call("row_values", self._file_id, self._ws.row_values, row)
+
+    def batch_get(self, ranges, major_dimension: str = "ROWS"):
+        return self._scheduler.call("batch_get", self._file_id, self._ws.batch_get, ranges,
+                                    major_dimension=major_dimension)
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Revistorias (IS_REV) entre meses: índice chassi -> primeira data vista
+# ============================================================
+"""IS_REV calculado sobre toda a Produção carregada, não mês a mês.
+
+Regra (a mesma do cálculo antigo por mês, estendida ao histórico): ordenando por
+data, a primeira vistoria de cada chassi é a original e todas as seguintes são
+revistorias — inclusive as que caem em outro mês.
+
+O índice guarda, por mês (chave = ID + versão), um resumo chassi -> primeira
+data; o mapa global é a combinação desses resumos. Quando só o mês corrente
+muda, apenas ele é resumido de novo e só os meses que contêm chassis cujo
+"primeiro visto" mudou têm o IS_REV recalculado — e, dentro deles, só as linhas
+desses chassis. Um mês que apenas ganhou linhas no fim (`rekey`) herda o resumo
+e o IS_REV das linhas antigas; só as novas e os chassis afetados são refeitos.
+
+Com várias bases no mesmo processo (modo preguiçoso: uma por janela de meses),
+cada uma tem o seu índice (`RevisitIndexes`): o IS_REV de uma janela considera
+só os meses dela, e uma janela não descarta os resumos da outra.
+"""
+
+import threading
+import weakref
+from typing import Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from painel.schema import PROD_DATE, day_codes, DAY_NA
+
+CHASSI = "CHASSI"
+_NO_DATE = np.iinfo(np.int32).max   # sem data: depois de qualquer data válida (como o sort antigo)
+
+
+def _days(df: pd.DataFrame) -> np.ndarray:
+    d = day_codes(pd.to_datetime(df[PROD_DATE], errors="coerce")).astype(np.int64)
+    d[d == DAY_NA] = _NO_DATE
+    return d
+
+
+def _chassis(df: pd.DataFrame) -> pd.Series:
+    return df[CHASSI].astype(object).where(df[CHASSI].notna(), "").astype(str)
+
+
+def _summary(df: pd.DataFrame) -> pd.DataFrame:
+    """Primeira data (em dias) de cada chassi dentro de um mês."""
+    if df.empty or CHASSI not in df.columns:
+        return pd.DataFrame({"FIRST": pd.Series(dtype=np.int64)}, index=pd.Index([], name=CHASSI))
+    s = pd.Series(_days(df), index=pd.Index(_chassis(df), name=CHASSI))
+    return s.groupby(level=0, sort=False).min().to_frame("FIRST")
+
+
+class RevisitIndex:
+    """Mapa chassi -> (primeira data, mês dono) mantido entre recargas do processo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._summaries = {}
+        self._flags = {}
+        self._first = pd.DataFrame(columns=["FIRST", "OWNER"])
+
+    def _combine(self, keys: List[str]) -> pd.DataFrame:
+        parts = [self._summaries[k].assign(OWNER=k, RANK=i) for i, k in enumerate(keys)]
+        if not parts:
+            return pd.DataFrame(columns=["FIRST", "OWNER"])
+        allm = pd.concat(parts).reset_index()
+        allm = allm.sort_values(["FIRST", "RANK"], kind="mergesort")
+        return allm.drop_duplicates(CHASSI, keep="first").set_index(CHASSI)[["FIRST", "OWNER"]]
+
+    def _changed(self, new: pd.DataFrame) -> pd.Index:
+        old = self._first
+        if old.empty:
+            return new.index
+        aligned = old.reindex(new.index)
+        diff = (aligned["FIRST"].to_numpy() != new["FIRST"].to_numpy()) | \
+               (aligned["OWNER"].to_numpy() != new["OWNER"].to_numpy())
+        return new.index[diff].union(old.index.difference(new.index))
+
+    def _flags_for(self, key: str, df: pd.DataFrame) -> np.ndarray:
+        if df.empty or CHASSI not in df.columns:
+            return np.zeros(len(df), dtype=int)
+        ch = _chassis(df)
+        d = _days(df)
+        first = self._first.reindex(ch)
+        first_of_day = ~pd.DataFrame({"c": ch.to_numpy(), "d": d}).duplicated().to_numpy()
+        original = first_of_day & (d == first["FIRST"].to_numpy()) & (first["OWNER"].to_numpy() == key)
+        return (~original).astype(int)
+
+    def rekey(self, old_key: str, new_key: str, tail: pd.DataFrame) -> None:
+        """A versão `new_key` é a `old_key` com as linhas de `tail` acrescentadas no fim.
+
+        Resumo, IS_REV das linhas antigas e a posse dos chassis passam para a
+        chave nova, para que a troca de versão não conte como mudança geral.
+        """
+        with self._lock:
+            if old_key not in self._summaries or new_key in self._summaries:
+                return
+            summ = self._summaries.pop(old_key)
+            if not tail.empty:
+                summ = pd.concat([summ, _summary(tail)]).groupby(level=0, sort=False).min()
+            self._summaries[new_key] = summ
+            fl = self._flags.pop(old_key, None)
+            if fl is not None:
+                self._flags[new_key] = fl
+            if not self._first.empty:
+                self._first = self._first.assign(OWNER=self._first["OWNER"].replace({old_key: new_key}))
+
+    def forget(self, key: str) -> None:
+        """Descarta resumo e IS_REV de `key` (ex.: cópia anterior servida sob a chave da versão nova)."""
+        with self._lock:
+            self._summaries.pop(key, None)
+            self._flags.pop(key, None)
+
+    def flag(self, months: List[Tuple[str, pd.DataFrame]]) -> List[pd.DataFrame]:
+        """Devolve os meses (na ordem recebida) com IS_REV calculado sobre todos eles.
+
+        `months` = [(chave, frame)], chave única por versão do arquivo (ex.: "ID@modifiedTime").
+        A ordem desempata chassis vistos no mesmo dia em meses diferentes.
+        """
+        keys = [k for k, _ in months]
+        with self._lock:
+            for k, df in months:
+                if k not in self._summaries:
+                    self._summaries[k] = _summary(df)
+            for k in list(self._summaries):
+                if k not in keys:
+                    self._summaries.pop(k, None)
+                    self._flags.pop(k, None)
+
+            new_first = self._combine(keys)
+            changed = self._changed(new_first)
+            self._first = new_first
+
+            out = []
+            for k, df in months:
+                fl = self._flags.get(k)
+                if fl is None or len(fl) > len(df):
+                    fl = self._flags_for(k, df)
+                else:
+                    fl = self._refresh(k, df, fl, changed)
+                self._flags[k] = fl
+                out.append(df.assign(IS_REV=fl))
+            return out
+
+    def _refresh(self, key: str, df: pd.DataFrame, fl: np.ndarray, changed: pd.Index) -> np.ndarray:
+        """Refaz o IS_REV só das linhas novas (além de len(fl)) e dos chassis em `changed`."""
+        if len(fl) == len(df) and not len(changed):
+            return fl
+        ch = _chassis(df)
+        redo = np.zeros(len(df), dtype=bool)
+        redo[len(fl):] = True
+        if len(changed):
+            redo |= ch.isin(changed).to_numpy()
+        if not redo.any():
+            return fl
+        rows = ch.isin(pd.unique(ch[redo])).to_numpy()   # todas as linhas desses chassis no mês
+        out = np.zeros(len(df), dtype=int)
+        out[:len(fl)] = fl
+        out[rows] = self._flags_for(key, df[rows])
+        return out
+
+
+class RevisitIndexes:
+    """Um `RevisitIndex` por base (janela de meses), vivo enquanto a base que o usa existir."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = weakref.WeakValueDictionary()
+
+    def get(self, window: Hashable) -> RevisitIndex:
+        with self._lock:
+            idx = self._indexes.get(window)
+            if idx is None:
+                idx = self._indexes[window] = RevisitIndex()
+            return idx
+
+    def _live(self) -> List[RevisitIndex]:
+        with self._lock:
+            return list(self._indexes.values())
+
+    def rekey(self, old_key: str, new_key: str, tail: pd.DataFrame) -> None:
+        """`RevisitIndex.rekey` em todos os índices (o mesmo mês pode estar em mais de uma janela)."""
+        for idx in self._live():
+            idx.rekey(old_key, new_key, tail)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Esquema tipado das bases de Qualidade, Produção e Metas
+# ============================================================
+"""Colunas canônicas e coerção de tipos, aplicadas uma única vez na carga.
+
+A data de cada base (`DATA` na Qualidade, `__DATA__` na Produção) fica como
+datetime64[ns] à meia-noite; filtros de mês/período/semana viram comparações
+vetorizadas sobre ela, sem `pd.to_datetime` nem objetos `date` no caminho.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from painel.dates import parse_dates
+
+# Formato dos meses normalizados (loader.normalize_*, typed_*, tipos das colunas).
+# Suba ao mudar qualquer um deles: o cache em disco (MonthStore) descarta as cópias antigas.
+DATA_SCHEMA = 1
+
+QUALITY_DATE = "DATA"
+PROD_DATE = "__DATA__"
+
+QUALITY_TEXT = ["VISTORIADOR", "UNIDADE", "ERRO", "GRAVIDADE", "ANALISTA", "EMPRESA", "PLACA"]
+QUALITY_COLUMNS = [QUALITY_DATE, "DATA_TS"] + QUALITY_TEXT
+PROD_COLUMNS = ["VISTORIADOR", PROD_DATE, "IS_REV", "UNIDADE"]
+METAS_COLUMNS = ["VISTORIADOR", "UNIDADE", "META_MENSAL", "DIAS_UTEIS", "YM"]
+
+
+def quality_column(name) -> Optional[str]:
+    """Nome canônico de um cabeçalho da aba GERAL (None se a coluna não interessa)."""
+    cu = str(name).strip().upper()
+    if cu == "DATA": return "DATA"
+    if cu == "PLACA": return "PLACA"
+    if cu in {"VISTORIADORES", "VISTORIADOR"}: return "VISTORIADOR"
+    if cu in {"CIDADE", "UNIDADE"}: return "UNIDADE"
+    if cu in {"ERROS", "ERRO"}: return "ERRO"
+    if cu.startswith("GRAVIDADE"): return "GRAVIDADE"
+    if cu in {"OBSERVAÇÃO", "OBSERVACAO", "OBS"}: return "OBS"
+    if cu == "ANALISTA": return "ANALISTA"
+    if cu in {"EMPRESA", "MARCA"}: return "EMPRESA"
+    return None
+
+
+def quality_rename_map(columns) -> Dict[str, str]:
+    return {c: quality_column(c) for c in columns if quality_column(c)}
+
+
+def typed_quality(df: pd.DataFrame) -> pd.DataFrame:
+    """Garante as colunas da Qualidade com DATA/DATA_TS em datetime64."""
+    df = df.copy() if df is not None else pd.DataFrame(columns=QUALITY_COLUMNS)
+    for c in QUALITY_TEXT:
+        if c not in df.columns:
+            df[c] = ""
+    df[QUALITY_DATE] = parse_dates(df[QUALITY_DATE]) if QUALITY_DATE in df.columns else pd.NaT
+    df["DATA_TS"] = (pd.to_datetime(df["DATA_TS"], errors="coerce") if "DATA_TS" in df.columns
+                     else df[QUALITY_DATE])
+    return df
+
+
+def typed_production(df: pd.DataFrame) -> pd.DataFrame:
+    """Garante as colunas da Produção com __DATA__ em datetime64 e IS_REV inteiro."""
+    df = df.copy() if df is not None else pd.DataFrame(columns=PROD_COLUMNS)
+    for c in ["VISTORIADOR", "UNIDADE"]:
+        if c not in df.columns:
+            df[c] = ""
+    df[PROD_DATE] = parse_dates(df[PROD_DATE]) if PROD_DATE in df.columns else pd.NaT
+    df["IS_REV"] = pd.to_numeric(df["IS_REV"], errors="coerce").fillna(0).astype(int) if "IS_REV" in df.columns else 0
+    return df
+
+
+def empty_metas() -> pd.DataFrame:
+    return pd.DataFrame(columns=METAS_COLUMNS)
+
+
+def period_mask(s: pd.Series, dini, dfim) -> pd.Series:
+    """dini <= s <= dfim sobre uma coluna datetime64 normalizada (NaT fica de fora)."""
+    return s.between(pd.Timestamp(dini), pd.Timestamp(dfim))
+
+
+# ------------------ FORMA COMPACTA (categorias + datas inteiras) ------------------
+QUALITY_CATEGORIES = ["VISTORIADOR", "UNIDADE", "ERRO", "GRAVIDADE", "ANALISTA", "EMPRESA"]
+PROD_CATEGORIES = ["VISTORIADOR", "UNIDADE", "CHASSI"]
+SHARED_CATEGORIES = ["VISTORIADOR", "UNIDADE"]   # mesmo dicionário na Qualidade e na Produção
+
+DAY_COL = "DIA"
+DAY_NA = np.iinfo(np.int32).min
+
+
+def day_codes(s: pd.Series) -> np.ndarray:
+    """Datas datetime64 como int32 (dias desde 1970-01-01); NaT vira DAY_NA."""
+    days = s.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    out = days.astype("int64")
+    out[np.isnat(days)] = DAY_NA
+    return out.astype(np.int32)
+
+
+def _category_dtype(*series) -> pd.CategoricalDtype:
+    vals = pd.unique(pd.concat([pd.Series(s, dtype=object) for s in series], ignore_index=True).dropna())
+    return pd.CategoricalDtype(sorted(str(v) for v in vals))
+
+
+def compact_frames(dfQ: pd.DataFrame, dfP: pd.DataFrame):
+    """Converte as colunas de texto repetitivas em Categorical e acrescenta DIA (int32).
+
+    VISTORIADOR e UNIDADE usam um único dicionário para todos os meses das duas
+    bases, então merges/isin entre Qualidade e Produção continuam em códigos.
+    Agrupar por essas colunas exige `observed=True` (senão o pandas 2 devolve
+    também as categorias sem linhas).
+    """
+    dfQ, dfP = dfQ.copy(), dfP.copy()
+    for c in SHARED_CATEGORIES:
+        dtype = _category_dtype(*(df[c] for df in (dfQ, dfP) if c in df.columns))
+        for df in (dfQ, dfP):
+            if c in df.columns:
+                df[c] = df[c].astype(object).astype(dtype)
+    for df, cols in ((dfQ, QUALITY_CATEGORIES), (dfP, PROD_CATEGORIES)):
+        for c in cols:
+            if c in df.columns and c not in SHARED_CATEGORIES:
+                df[c] = df[c].astype(object).astype(_category_dtype(df[c]))
+    dfQ[DAY_COL] = day_codes(dfQ[QUALITY_DATE])
+    dfP[DAY_COL] = day_codes(dfP[PROD_DATE])
+    return dfQ, dfP
+
+
+def fill_numeric(df: pd.DataFrame, value=0) -> pd.DataFrame:
+    """`fillna` só nas colunas não categóricas (Categorical não aceita um valor fora do dicionário)."""
+    return df.fillna({c: value for c in df.columns if not isinstance(df[c].dtype, pd.CategoricalDtype)})
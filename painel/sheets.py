@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Leitura de abas do Google Sheets só com as colunas usadas
+# ============================================================
+"""Cabeçalho primeiro, depois um `batch_get` com um intervalo por coluna.
+
+`get_all_records()` traz todas as colunas de todas as linhas e monta um dict
+por linha. Aqui a linha 1 decide quais colunas interessam (`pick`), cada uma
+vem como intervalo "C2:C" em MAJOR_DIMENSION=COLUMNS e o DataFrame sai direto
+das listas de cada coluna. Os valores continuam FORMATTED_VALUE (texto), como
+no `get_all_records`; `numeric` converte colunas onde números importam (ex.:
+datas digitadas como serial do Excel).
+
+Abas que só crescem (Produção do mês corrente) podem ser relidas a partir de
+onde a última leitura parou (`read_appended`), com um único batch_get. Na
+mesma chamada vêm a última linha lida e uma amostra das anteriores; qualquer
+diferença (edição ou remoção acima do fim) manda para a leitura completa.
+
+`read_book` usa a Sheets API v4 direto: metadados + cabeçalho da 1ª aba numa
+chamada (spreadsheets.get) e as colunas dela + abas auxiliares (METAS) num
+único values:batchGet. Aba ausente é detectada pelos metadados.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def col_letter(n: int) -> str:
+    """1 → A, 27 → AA."""
+    out = ""
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        out = chr(65 + r) + out
+    return out
+
+
+def numericise(s: pd.Series) -> pd.Series:
+    """Textos numéricos viram int/float (como o numericise do gspread); o resto fica."""
+    num = pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+    out = s.to_numpy(dtype=object).copy()
+    hit = ~np.isnan(num)
+    whole = hit & np.isfinite(num) & (num == np.floor(num))
+    frac = hit & ~whole
+    out[whole] = num[whole].astype(np.int64).tolist()
+    out[frac] = num[frac].tolist()
+    return pd.Series(out, index=s.index, dtype=object)
+
+
+def header_columns(header: Iterable, pick: Callable[[str], Optional[str]]) -> dict:
+    """{nome canônico: índice 0-based} — vale a primeira coluna de cada nome."""
+    cols = {}
+    for i, h in enumerate(header):
+        name = pick(str(h).strip()) if h is not None else None
+        if name and name not in cols:
+            cols[name] = i
+    return cols
+
+
+# Linhas anteriores à última conferidas em cada acréscimo (espalhadas pela aba)
+SAMPLE_ROWS = 16
+
+
+@dataclass(frozen=True)
+class SheetTail:
+    """Onde parou a leitura de uma aba: colunas, linhas de dados lidas e a última delas (crua).
+
+    `sample` = ((linha de dados, 0-based), valores crus) de até SAMPLE_ROWS linhas anteriores.
+    """
+    cols: dict
+    rows: int
+    last: tuple
+    sample: tuple = ()
+
+
+def _frame(cols: dict, arrays: list, numeric: Iterable[str]) -> pd.DataFrame:
+    n = max((len(a) for a in arrays), default=0)
+    data = {}
+    for name, arr in zip(cols, arrays):
+        s = pd.Series(arr + [""] * (n - len(arr)), dtype=object)
+        data[name] = numericise(s) if name in numeric else s
+    return pd.DataFrame(data)
+
+
+def _last_row(arrays: list, n: int) -> tuple:
+    return tuple(a[n - 1] if len(a) >= n else "" for a in arrays) if n else ()
+
+
+def _tail(cols: dict, arrays: list, n: int) -> SheetTail:
+    """SheetTail de uma leitura completa: última linha + amostra espaçada das anteriores."""
+    rows = sorted(set(np.linspace(0, n - 2, min(SAMPLE_ROWS, n - 1)).astype(int).tolist())) if n > 1 else []
+    sample = tuple((i, tuple(a[i] if len(a) > i else "" for a in arrays)) for i in rows)
+    return SheetTail(dict(cols), n, _last_row(arrays, n), sample)
+
+
+def _row_cells(block: list, idx: Iterable[int]) -> tuple:
+    """Valores das colunas `idx` numa linha lida como "A5:F5" em MAJOR_DIMENSION=COLUMNS."""
+    return tuple(block[i][0] if i < len(block) and block[i] else "" for i in idx)
+
+
+def columns_to_frame(columns: List[list]) -> pd.DataFrame:
+    """Aba lida em MAJOR_DIMENSION=COLUMNS → DataFrame (1º valor de cada coluna = cabeçalho)."""
+    columns = [c for c in columns if c]
+    n = max((len(c) - 1 for c in columns), default=0)
+    data = {}
+    for c in columns:
+        name = str(c[0]).strip()
+        if name not in data:
+            vals = list(c[1:])
+            data[name] = pd.Series(vals + [""] * (n - len(vals)), dtype=object)
+    return pd.DataFrame(data)
+
+
+def quote_title(title: str) -> str:
+    return "'" + str(title).replace("'", "''") + "'"
+
+
+class ApiSheet:
+    """Uma aba vista pela Sheets API v4 (googleapiclient), com row_values/batch_get como no gspread."""
+
+    def __init__(self, svc, spreadsheet_id: str, title: str):
+        self.svc = svc
+        self.spreadsheet_id = spreadsheet_id
+        self.title = title
+
+    def _range(self, r: str) -> str:
+        return r if "!" in r or r.startswith("'") else f"{quote_title(self.title)}!{r}"
+
+    def row_values(self, row: int) -> list:
+        resp = self.svc.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id, range=self._range(f"{row}:{row}")).execute()
+        return (resp.get("values") or [[]])[0]
+
+    def batch_get(self, ranges: Sequence[str], major_dimension: str = "ROWS") -> List[list]:
+        if not ranges:
+            return []
+        resp = self.svc.spreadsheets().values().batchGet(
+            spreadsheetId=self.spreadsheet_id, ranges=[self._range(r) for r in ranges],
+            majorDimension=major_dimension).execute()
+        return [vr.get("values", []) for vr in resp.get("valueRanges", [])]
+
+
+BOOK_FIELDS = "properties.title,sheets(properties(title,index),data(rowData(values(formattedValue))))"
+
+
+def read_book(svc, spreadsheet_id: str, pick: Callable[[str], Optional[str]], numeric: Iterable[str] = (),
+              tabs: Sequence[str] = ()) -> Tuple[str, ApiSheet, pd.DataFrame, Optional[SheetTail], Dict[str, pd.DataFrame]]:
+    """Planilha inteira em duas chamadas: (título, 1ª aba, colunas dela, SheetTail, {aba: frame}).
+
+    1) spreadsheets.get com o intervalo "1:1" (1ª aba visível) traz título,
+       nomes das abas e o cabeçalho; 2) um values:batchGet traz as colunas
+       escolhidas por `pick` e as abas de `tabs` que existem.
+    """
+    meta = svc.spreadsheets().get(spreadsheetId=spreadsheet_id, ranges=["1:1"], includeGridData=True,
+                                  fields=BOOK_FIELDS).execute()
+    title = meta.get("properties", {}).get("title", "")
+    sheets = sorted(meta.get("sheets", []), key=lambda sh: sh.get("properties", {}).get("index", 0))
+    titles = [sh["properties"]["title"] for sh in sheets]
+    first = next((sh for sh in sheets if any(d.get("rowData") for d in sh.get("data") or [])),
+                 sheets[0] if sheets else None)
+    if first is None:
+        return title, None, pd.DataFrame(), None, {}
+
+    rows = (first.get("data") or [{}])[0].get("rowData") or [{}]
+    header = [v.get("formattedValue", "") for v in rows[0].get("values", [])]
+    ws = ApiSheet(svc, spreadsheet_id, first["properties"]["title"])
+    df, tail, extra = book_columns(ws, header, titles, pick, numeric, tabs)
+    return title, ws, df, tail, extra
+
+
+def book_columns(ws, header: Sequence, titles: Sequence[str], pick: Callable[[str], Optional[str]],
+                 numeric: Iterable[str] = (), tabs: Sequence[str] = ()
+                 ) -> Tuple[pd.DataFrame, Optional[SheetTail], Dict[str, pd.DataFrame]]:
+    """2ª chamada do `read_book`, para qualquer aba com batch_get (cabeçalho e títulos já conhecidos)."""
+    cols = header_columns(header, pick)
+    present = [t for t in tabs if t in titles and t != ws.title]
+    ranges = [f"{col_letter(i + 1)}2:{col_letter(i + 1)}" for i in cols.values()] + \
+             [quote_title(t) for t in present]
+    got = ws.batch_get(ranges, major_dimension="COLUMNS")
+
+    df, tail = pd.DataFrame(), None
+    if cols:
+        arrays = [list(vr[0]) if vr else [] for vr in got[:len(cols)]]
+        n = max((len(a) for a in arrays), default=0)
+        df, tail = _frame(cols, arrays, numeric), _tail(cols, arrays, n)
+    extra = {t: columns_to_frame(v) for t, v in zip(present, got[len(cols):])}
+    return df, tail, extra
+
+
+def read_columns(ws, pick: Callable[[str], Optional[str]], numeric: Iterable[str] = ()) -> pd.DataFrame:
+    """Lê da aba `ws` (gspread.Worksheet) só as colunas reconhecidas por `pick`.
+
+    Duas chamadas: a linha de cabeçalho e um batch_get com as colunas. Linhas
+    finais vazias em todas as colunas pedidas não entram.
+    """
+    return read_columns_tracked(ws, pick, numeric)[0]
+
+
+def read_columns_tracked(ws, pick: Callable[[str], Optional[str]],
+                         numeric: Iterable[str] = ()) -> Tuple[pd.DataFrame, Optional[SheetTail]]:
+    """Como `read_columns`, devolvendo também o SheetTail para leituras incrementais."""
+    cols = header_columns(ws.row_values(1), pick)
+    if not cols:
+        return pd.DataFrame(), None
+
+    ranges = [f"{col_letter(i + 1)}2:{col_letter(i + 1)}" for i in cols.values()]
+    got = ws.batch_get(ranges, major_dimension="COLUMNS")
+    arrays = [list(vr[0]) if vr else [] for vr in got]
+    n = max((len(a) for a in arrays), default=0)
+    return _frame(cols, arrays, numeric), _tail(cols, arrays, n)
+
+
+def read_appended(ws, pick: Callable[[str], Optional[str]], tail: SheetTail, numeric: Iterable[str] = (),
+                  extra: Sequence[str] = ()) -> Optional[Tuple[pd.DataFrame, SheetTail, List[list]]]:
+    """Só as linhas acrescentadas depois de `tail` (uma chamada).
+
+    Relê o cabeçalho, a última linha já lida e a amostra de linhas anteriores
+    junto com o fim de cada coluna. Devolve None (o chamador faz a leitura
+    completa) se o cabeçalho mudou, se alguma linha conferida não bate
+    (edição/remoção acima do fim) ou se não há linha nova: o arquivo mudou
+    sem crescer, então a mudança está em linhas já lidas.
+    `extra` são intervalos completos (ex.: a aba METAS) que vêm na mesma
+    chamada; voltam crus, em MAJOR_DIMENSION=COLUMNS.
+    """
+    if tail is None or tail.rows == 0:
+        return None
+    width = max(tail.cols.values()) + 1
+    start = tail.rows + 1                     # linha da planilha da última linha de dados lida
+    cols = [f"{col_letter(i + 1)}{start}:{col_letter(i + 1)}" for i in tail.cols.values()]
+    sample = [f"A{i + 2}:{col_letter(width)}{i + 2}" for i, _ in tail.sample]
+    ranges = [f"A1:{col_letter(width)}1"] + cols + sample + list(extra)
+    got = ws.batch_get(ranges, major_dimension="COLUMNS")
+    k = 1 + len(cols)
+    got, got_sample, got_extra = got[:k], got[k:k + len(sample)], got[k + len(sample):]
+    header = [c[0] if c else "" for c in (got[0] or [])]
+    if header_columns(header, pick) != tail.cols:
+        return None
+    if any(_row_cells(block, tail.cols.values()) != vals for block, (_, vals) in zip(got_sample, tail.sample)):
+        return None
+
+    arrays = [list(vr[0]) if vr else [] for vr in got[1:]]
+    n = max((len(a) for a in arrays), default=0)
+    if n <= 1 or _last_row(arrays, 1) != tail.last:
+        return None
+    new = [a[1:] for a in arrays]
+    rows = tail.rows + n - 1
+    return _frame(tail.cols, new, numeric), SheetTail(tail.cols, rows, _last_row(arrays, n), tail.sample), got_extra
@@ -0,0 +1,669 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Origem dos dados: Google (Sheets/Drive) ou pasta local (testes de carga)
+# ============================================================
+"""O que a carga (painel.loader / app.py) pede de uma origem, em 6 operações.
+
+`GoogleSource` é o caminho de produção: gspread para abas, Drive API v3
+para metadados e download, Sheets API v4 para a planilha de Produção
+inteira.
+
+`LocalSource` serve uma pasta de `<id>.xlsx` como se fossem arquivos do
+Drive, com latência, limite de chamadas simultâneas e falhas simuladas.
+Também conta as chamadas, para medir carga fria/quente e o efeito dos caches
+sem rede. Os arquivos podem ser gerados (`write_synthetic`, a partir de
+painel.synthetic) ou gravados de planilhas reais: exporte cada planilha como
+.xlsx com o ID como nome e monte dois índices `indice-qualidade.xlsx` e
+`indice-producao.xlsx` (aba ARQUIVOS: URL, MÊS, ATIVO).
+
+Nas abas, `LocalSource` devolve texto como a planilha formataria. Datas saem
+como dd/mm/aaaa; data com hora sai em ISO, sem ambiguidade de dia/mês; números
+inteiros saem sem ".0". O modifiedTime é o mtime do arquivo: sobrescrever um
+.xlsx equivale a editar a planilha. A conversão de cada versão para texto é
+feita uma vez e guardada em `<pasta>/.abas/`. Assim o tempo medido é o da
+latência simulada e do painel, não o da origem falsa abrindo o .xlsx.
+"""
+
+import os, pickle, random, re, shutil, tempfile, threading, time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from painel import metrics
+from painel.loader import SHEETS_MIME
+from painel.sheets import ApiSheet, book_columns, read_book
+
+try:
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    from google.oauth2 import service_account as gcreds
+    from googleapiclient.discovery import build
+    from googleapiclient.http import MediaIoBaseDownload
+    ok_google = True
+except Exception:
+    ok_google = False
+
+try:
+    from openpyxl import Workbook, load_workbook
+    ok_openpyxl = True
+except Exception:
+    ok_openpyxl = False
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DRIVE_META_FIELDS = "id, name, mimeType, modifiedTime"
+DOWNLOAD_CHUNK = 1024 * 1024        # download do Drive: uma requisição por bloco
+VERSIONS_BATCH = 100                # files.get por requisição de batch da Drive API
+LOCAL_INDEX_IDS = ("indice-qualidade", "indice-producao")
+
+
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class SourceError(RuntimeError):
+    """Falha de uma chamada à origem (real ou simulada); `status` = código HTTP equivalente, se houver."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def status_of(e: BaseException) -> Optional[int]:
+    """Código HTTP de erros do googleapiclient (`resp.status`), gspread (`response.status_code`) ou SourceError."""
+    for obj, attr in ((getattr(e, "resp", None), "status"), (getattr(e, "response", None), "status_code"),
+                      (e, "status")):
+        code = getattr(obj, attr, None) if obj is not None else None
+        try:
+            if code is not None:
+                return int(code)
+        except (TypeError, ValueError):
+            pass
+    return None
+
+def is_transient(e: BaseException) -> bool:
+    """Vale tentar de novo: 408/429/5xx, rede, ou cota estourada que a Drive devolve como 403."""
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+    code = status_of(e)
+    if code in TRANSIENT_STATUS:
+        return True
+    return code == 403 and "ratelimitexceeded" in str(e).lower()
+
+
+class DataSource(ABC):
+    """Interface das origens; cada método é uma chamada remota (pode falhar).
+
+    Origem que não implementa as 6 operações falha ao ser criada, não no meio da carga.
+    """
+    index_ids = ("", "")         # índices padrão (Qualidade, Produção), se a origem tiver
+
+    @abstractmethod
+    def versions(self, file_ids: Sequence[str]) -> Dict[str, dict]:
+        """{id: metadados} de vários arquivos numa ida.
+
+        IDs inexistentes ou sem permissão ficam de fora; erro transitório (429, 5xx,
+        rede), no lote ou em um item, sobe como exceção para o agendador tentar de novo.
+        """
+
+    @abstractmethod
+    def metadata(self, file_id: str) -> dict:
+        """id, name, mimeType e modifiedTime de um arquivo."""
+
+    @abstractmethod
+    def worksheet(self, sheet_id: str, tab: str):
+        """Aba pelo nome, com row_values/batch_get como o gspread.Worksheet."""
+
+    @abstractmethod
+    def download_to(self, file_id: str, fh) -> None:
+        """Conteúdo do arquivo (XLSX) gravado em `fh`."""
+
+    @abstractmethod
+    def book(self, sheet_id: str, pick: Callable[[str], Optional[str]], numeric: Iterable[str] = (),
+             tabs: Sequence[str] = ()):
+        """Como `sheets.read_book`: (título, 1ª aba, colunas, SheetTail, {aba: frame})."""
+
+    @abstractmethod
+    def sheet(self, sheet_id: str, title: str):
+        """Aba pelo título, para `sheets.read_appended`."""
+
+    def http_requests(self, op: str, size: int = 0) -> int:
+        """Requisições HTTP feitas por uma chamada `op` bem-sucedida (`size`: IDs do lote ou bytes baixados)."""
+        return 2 if op == "book" else 1     # read_book: cabeçalho + batch_get
+
+
+# ------------------ GOOGLE ------------------
+class GoogleSource(DataSource):
+    """gspread (abas) + Drive API v3 (metadados, download) + Sheets API v4 (planilha inteira)."""
+    SCOPES = [
+        "https://spreadsheets.google.com/feeds",
+        "https://www.googleapis.com/auth/drive",
+        "https://www.googleapis.com/auth/drive.readonly",
+    ]
+    READONLY_SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
+
+    def __init__(self, info: dict):
+        if not ok_google:
+            raise SourceError("Bibliotecas do Google (gspread, google-api-python-client) não instaladas.")
+        self.client = gspread.authorize(ServiceAccountCredentials.from_json_keyfile_dict(info, self.SCOPES))
+        self.creds = gcreds.Credentials.from_service_account_info(info, scopes=self.READONLY_SCOPES)
+        self.email = info.get("client_email", "(sem client_email)")
+        self._local = threading.local()
+
+    def _service(self, name: str, version: str):
+        # O cliente da API (httplib2) não é thread-safe: um serviço por thread.
+        svc = getattr(self._local, name, None)
+        if svc is None:
+            svc = build(name, version, credentials=self.creds, cache_discovery=False)
+            setattr(self._local, name, svc)
+        return svc
+
+    def http_requests(self, op: str, size: int = 0) -> int:
+        if op == "versions":
+            return max(1, -(-size // VERSIONS_BATCH))
+        if op == "download":
+            return max(1, -(-size // DOWNLOAD_CHUNK))
+        if op in ("book", "worksheet"):      # gspread: open_by_key e .worksheet leem os metadados cada um
+            return 2
+        return 1
+
+    def versions(self, file_ids: Sequence[str]) -> Dict[str, dict]:
+        """Batch HTTP de `files.get` (até 100 IDs por lote): a Drive API não filtra `files.list` por IDs."""
+        out, transient = {}, []
+        def _cb(request_id, response, exception):
+            if exception is None and response:
+                out[request_id] = response
+            elif exception is not None and is_transient(exception):
+                transient.append(exception)
+
+        svc = self._service("drive", "v3")
+        ids = list(dict.fromkeys(file_ids))
+        for i in range(0, len(ids), VERSIONS_BATCH):
+            batch = svc.new_batch_http_request(callback=_cb)
+            for fid in ids[i:i + VERSIONS_BATCH]:
+                batch.add(svc.files().get(fileId=fid, fields=DRIVE_META_FIELDS, supportsAllDrives=True),
+                          request_id=fid)
+            batch.execute()
+        if transient:               # 429/5xx em algum item: o lote inteiro vai de novo
+            raise transient[0]
+        return out
+
+    def metadata(self, file_id: str) -> dict:
+        return self._service("drive", "v3").files().get(
+            fileId=file_id, fields=DRIVE_META_FIELDS, supportsAllDrives=True).execute()
+
+    def worksheet(self, sheet_id: str, tab: str):
+        return self.client.open_by_key(sheet_id).worksheet(tab)
+
+    def download_to(self, file_id: str, fh) -> None:
+        """Baixa em blocos de 1 MB direto para `fh` (ex.: temporário em disco)."""
+        req = self._service("drive", "v3").files().get_media(fileId=file_id)
+        downloader = MediaIoBaseDownload(fh, req, chunksize=DOWNLOAD_CHUNK)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+
+    def book(self, sheet_id, pick, numeric=(), tabs=()):
+        return read_book(self._service("sheets", "v4"), sheet_id, pick, numeric=numeric, tabs=tabs)
+
+    def sheet(self, sheet_id: str, title: str):
+        return ApiSheet(self._service("sheets", "v4"), sheet_id, title)
+
+
+# ------------------ MÉTRICAS ------------------
+class MeteredSource(DataSource):
+    """Outra origem com cada chamada medida em `painel.metrics` (operação, duração, resultado, bytes).
+
+    As abas devolvidas (`worksheet`, `sheet`) também são medidas: cada
+    row_values/batch_get é uma chamada à API. Além das chamadas, conta as
+    requisições HTTP de cada uma (`http_requests` da origem: read_book faz 2,
+    o download uma por bloco); a que falhou conta 1.
+    """
+
+    def __init__(self, inner: DataSource):
+        self.inner = inner
+        self.index_ids = inner.index_ids
+
+    def __getattr__(self, name):          # stats(), prepare(), email... da origem de dentro
+        return getattr(self.inner, name)
+
+    def http_requests(self, op: str, size: int = 0) -> int:
+        return self.inner.http_requests(op, size)
+
+    def _timed(self, op: str, fn, *args, size: Callable[[], int] = lambda: 0, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            out = fn(*args, **kwargs)
+        except Exception:
+            metrics.SOURCE_CALLS.inc(operacao=op, resultado="erro")
+            metrics.SOURCE_REQUESTS.inc(operacao=op, resultado="erro")
+            raise
+        finally:
+            metrics.SOURCE_SECONDS.observe(time.perf_counter() - t0, operacao=op)
+        metrics.SOURCE_CALLS.inc(operacao=op, resultado="ok")
+        metrics.SOURCE_REQUESTS.inc(self.inner.http_requests(op, size()), operacao=op, resultado="ok")
+        return out
+
+    def versions(self, file_ids):
+        ids = list(file_ids)
+        out = self._timed("versions", self.inner.versions, ids, size=lambda: len(set(ids)))
+        if len(out) < len(set(ids)):            # batch: quem falhou fica de fora, sem exceção
+            metrics.SOURCE_CALLS.inc(len(set(ids)) - len(out), operacao="versions_item", resultado="erro")
+        return out
+
+    def metadata(self, file_id):
+        return self._timed("metadata", self.inner.metadata, file_id)
+
+    def worksheet(self, sheet_id, tab):
+        return _MeteredSheet(self, self._timed("worksheet", self.inner.worksheet, sheet_id, tab))
+
+    def download_to(self, file_id, fh):
+        start = fh.tell()
+        self._timed("download", self.inner.download_to, file_id, fh, size=lambda: max(0, fh.tell() - start))
+        metrics.SOURCE_BYTES.inc(max(0, fh.tell() - start))
+
+    def book(self, sheet_id, pick, numeric=(), tabs=()):
+        return self._timed("book", self.inner.book, sheet_id, pick, numeric=numeric, tabs=tabs)
+
+    def sheet(self, sheet_id, title):
+        return _MeteredSheet(self, self.inner.sheet(sheet_id, title))
+
+
+class _MeteredSheet:
+    def __init__(self, source: MeteredSource, ws):
+        self._source, self._ws = source, ws
+
+    def __getattr__(self, name):          # title, id... da aba de dentro
+        return getattr(self._ws, name)
+
+    def row_values(self, row: int) -> list:
+        return self._source._timed("row_values", self._ws.row_values, row)
+
+    def batch_get(self, ranges, major_dimension: str = "ROWS"):
+        return self._source._timed("batch_get", self._ws.batch_get, ranges, major_dimension=major_dimension)
+
+
+# ------------------ PASTA LOCAL ------------------
+_RANGE_RE = re.compile(r"^(?:'((?:[^']|'')*)'(?:!|$))?([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+
+def col_number(letters: str) -> int:
+    """A → 1, AA → 27."""
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def _text(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return v.strftime("%Y-%m-%d %H:%M:%S") if (v.hour, v.minute, v.second) != (0, 0, 0) else v.strftime("%d/%m/%Y")
+    if isinstance(v, date):
+        return v.strftime("%d/%m/%Y")
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _trim(values: list) -> list:
+    n = len(values)
+    while n and values[n - 1] == "":
+        n -= 1
+    return values[:n]
+
+
+def _read_tabs(path: str) -> Dict[str, List[list]]:
+    """{aba: colunas de texto} de um .xlsx."""
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        tabs = {}
+        for ws in wb.worksheets:
+            cols: List[list] = []
+            for i, row in enumerate(ws.iter_rows(values_only=True)):
+                for j, v in enumerate(row):
+                    if j >= len(cols):
+                        cols.append([""] * i)
+                    cols[j].append(_text(v))
+                for c in cols[len(row):]:
+                    c.append("")
+            tabs[ws.title] = [_trim(c) for c in cols]
+    finally:
+        wb.close()
+    return tabs
+
+
+class LocalSheet:
+    """Aba de um .xlsx local vista como gspread/ApiSheet; cada chamada relê o arquivo corrente."""
+
+    def __init__(self, source: "LocalSource", file_id: str, title: str):
+        self.source = source
+        self.file_id = file_id
+        self.title = title
+
+    def row_values(self, row: int) -> list:
+        self.source._call("row_values", self.file_id)
+        cols = self.source._tabs(self.file_id).get(self.title, [])
+        return _trim([c[row - 1] if len(c) >= row else "" for c in cols])
+
+    def batch_get(self, ranges: Sequence[str], major_dimension: str = "ROWS") -> List[list]:
+        if not ranges:
+            return []
+        self.source._call("batch_get", self.file_id)
+        tabs = self.source._tabs(self.file_id)
+        return [self._values(tabs, r, major_dimension) for r in ranges]
+
+    def _values(self, tabs: dict, rng: str, major_dimension: str) -> list:
+        m = _RANGE_RE.match(rng)
+        if not m:
+            raise SourceError(f"Intervalo inválido: {rng}")
+        tab = m.group(1).replace("''", "'") if m.group(1) is not None else self.title
+        if tab not in tabs:
+            raise SourceError(f"Aba '{tab}' não encontrada em {self.file_id}")
+        cols = tabs[tab]
+        c0 = col_number(m.group(2)) if m.group(2) else 1
+        r0 = int(m.group(3)) if m.group(3) else 1
+        if m.group(4) is None and m.group(5) is None:
+            c1, r1 = (c0, r0) if (m.group(2) or m.group(3)) else (len(cols), None)
+        else:
+            c1 = col_number(m.group(4)) if m.group(4) else len(cols)
+            r1 = int(m.group(5)) if m.group(5) else None
+        block = [list(c[r0 - 1:r1]) for c in cols[c0 - 1:c1]]
+        if major_dimension == "COLUMNS":
+            block = [_trim(c) for c in block]
+        else:
+            n = max((len(c) for c in block), default=0)
+            block = [_trim([c[i] if i < len(c) else "" for c in block]) for i in range(n)]
+        while block and not block[-1]:
+            block.pop()
+        return block
+
+
+class LocalSource(DataSource):
+    """Pasta de `<id>.xlsx` servida como Drive/Sheets, com latência e falhas simuladas.
+
+    `latency`/`jitter` em segundos por chamada; `throughput` (bytes/s, 0 = sem
+    limite) soma o tempo de transferência nos downloads; `max_concurrent`
+    limita as chamadas atendidas ao mesmo tempo (0 = sem limite); `fail_rate`
+    é a fração das chamadas que falham (503) e `fail_ids` os arquivos que
+    sempre falham. `quota` (chamadas/s, 0 = sem limite) imita a cota do
+    projeto: acima dela a chamada falha com 429. Com `as_sheets`, os meses aparecem como Google Sheets (Qualidade
+    lida pela aba GERAL) em vez de XLSX (download).
+    """
+    index_ids = LOCAL_INDEX_IDS
+
+    def __init__(self, root: str, latency: float = 0.0, jitter: float = 0.0, throughput: float = 0.0,
+                 max_concurrent: int = 0, fail_rate: float = 0.0, fail_ids: Iterable[str] = (),
+                 as_sheets: bool = False, seed: Optional[int] = None, books: int = 8, quota: float = 0.0):
+        if not ok_openpyxl:
+            raise SourceError("openpyxl não instalado: a origem local lê os meses de arquivos .xlsx.")
+        self.root = root
+        self.latency = max(0.0, float(latency))
+        self.jitter = max(0.0, float(jitter))
+        self.throughput = max(0.0, float(throughput))
+        self.fail_rate = max(0.0, float(fail_rate))
+        self.fail_ids = set(fail_ids)
+        self.as_sheets = bool(as_sheets)
+        self.calls: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.bytes = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(int(max_concurrent)) if max_concurrent else None
+        self._books: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._max_books = max(1, int(books))
+        self.quota = max(0.0, float(quota))
+        self._quota_t = time.monotonic()
+        self._quota_left = self.quota
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "LocalSource":
+        """Bloco [local_source] do secrets.toml (tempos em ms, vazão em MB/s)."""
+        return cls(cfg["dir"],
+                   latency=float(cfg.get("latency_ms", 0)) / 1000, jitter=float(cfg.get("jitter_ms", 0)) / 1000,
+                   throughput=float(cfg.get("throughput_mbps", 0)) * 2**20,
+                   max_concurrent=int(cfg.get("max_concurrent", 0)), fail_rate=float(cfg.get("fail_rate", 0)),
+                   fail_ids=cfg.get("fail_ids", ()), as_sheets=bool(cfg.get("as_sheets", False)),
+                   seed=cfg.get("seed"), quota=float(cfg.get("quota_per_minute", 0)) / 60)
+
+    # ------------------ simulação ------------------
+    def _call(self, op: str, file_id: str = "", extra: float = 0.0) -> None:
+        """Conta a chamada, confere a cota, espera a latência (ocupando uma vaga) e sorteia a falha."""
+        with self._lock:
+            self.calls[op] += 1
+            if self.quota:
+                now = time.monotonic()
+                self._quota_left = min(self.quota, self._quota_left + (now - self._quota_t) * self.quota)
+                self._quota_t = now
+                if self._quota_left < 1:
+                    self.failures["cota"] += 1
+                    raise SourceError(f"429 cota excedida em {op} ({file_id or 'lote'})", status=429)
+                self._quota_left -= 1
+            wait = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0) + extra
+            fail = file_id in self.fail_ids or (self.fail_rate > 0 and self._rng.random() < self.fail_rate)
+            if fail:
+                self.failures[op] += 1
+        if self._slots is not None:
+            with self._slots:
+                time.sleep(wait)
+        elif wait:
+            time.sleep(wait)
+        if fail:
+            raise SourceError(f"Falha simulada em {op} ({file_id or 'lote'})", status=503)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": dict(self.calls), "failures": dict(self.failures), "bytes": self.bytes}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.failures.clear()
+            self.bytes = 0
+
+    # ------------------ arquivos ------------------
+    def _path(self, file_id: str) -> str:
+        return os.path.join(self.root, f"{file_id}.xlsx")
+
+    def _meta(self, file_id: str) -> dict:
+        st = os.stat(self._path(file_id))
+        mtime = datetime.fromtimestamp(st.st_mtime_ns / 1e9, timezone.utc)
+        return {"id": file_id, "name": file_id, "mimeType": SHEETS_MIME if self.as_sheets else XLSX_MIME,
+                "modifiedTime": mtime.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"}
+
+    def _tabs(self, file_id: str) -> Dict[str, List[list]]:
+        """{aba: colunas de texto} do arquivo corrente; os últimos `books` arquivos ficam em memória."""
+        path = self._path(file_id)
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError as e:
+            raise SourceError(f"Arquivo não encontrado: {file_id}") from e
+        with self._lock:
+            tabs = self._books.get(key)
+            if tabs is not None:
+                self._books.move_to_end(key)
+                return tabs
+        side = os.path.join(self.root, ".abas", f"{file_id}-{key[1]}.pickle")
+        try:
+            with open(side, "rb") as f:
+                tabs = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            tabs = _read_tabs(path)
+            try:
+                os.makedirs(os.path.dirname(side), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(side))
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(tabs, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, side)
+                old = re.compile(re.escape(file_id) + r"-\d+\.pickle")
+                for name in os.listdir(os.path.dirname(side)):
+                    if old.fullmatch(name) and name != os.path.basename(side):
+                        os.unlink(os.path.join(os.path.dirname(side), name))
+            except OSError:
+                pass
+        with self._lock:
+            self._books[key] = tabs
+            while len(self._books) > self._max_books:
+                self._books.popitem(last=False)
+        return tabs
+
+    def prepare(self) -> int:
+        """Converte de antemão todos os .xlsx da pasta (sem latência nem contagem); devolve quantos."""
+        ids = [f[:-5] for f in sorted(os.listdir(self.root)) if f.endswith(".xlsx") and not f.startswith(".")]
+        for fid in ids:
+            self._tabs(fid)
+        return len(ids)
+
+    # ------------------ operações ------------------
+    def versions(self, file_ids):
+        self._call("versions")       # falha simulada (503/429) sobe, como no batch da Drive API
+        out = {}
+        for fid in dict.fromkeys(file_ids):
+            if fid in self.fail_ids:
+                continue
+            try:
+                out[fid] = self._meta(fid)
+            except OSError:
+                pass
+        return out
+
+    def metadata(self, file_id):
+        self._call("metadata", file_id)
+        try:
+            return self._meta(file_id)
+        except OSError as e:
+            raise SourceError(f"Arquivo não encontrado: {file_id}") from e
+
+    def worksheet(self, sheet_id, tab):
+        self._call("open", sheet_id)
+        if tab not in self._tabs(sheet_id):
+            raise SourceError(f"Aba '{tab}' não encontrada em {sheet_id}")
+        return LocalSheet(self, sheet_id, tab)
+
+    def download_to(self, file_id, fh):
+        path = self._path(file_id)
+        size = os.path.getsize(path) if os.path.isfile(path) else 0
+        self._call("download", file_id, extra=size / self.throughput if self.throughput else 0.0)
+        with open(path, "rb") as src:
+            shutil.copyfileobj(src, fh, 1024 * 1024)
+        with self._lock:
+            self.bytes += size
+
+    def book(self, sheet_id, pick, numeric=(), tabs=()):
+        self._call("book", sheet_id)
+        all_tabs = self._tabs(sheet_id)
+        titles = list(all_tabs)
+        first = next((t for t in titles if any(all_tabs[t])), titles[0] if titles else None)
+        if first is None:
+            return sheet_id, None, pd.DataFrame(), None, {}
+        header = _trim([c[0] if c else "" for c in all_tabs[first]])
+        ws = LocalSheet(self, sheet_id, first)
+        df, tail, extra = book_columns(ws, header, titles, pick, numeric, tabs)
+        return sheet_id, ws, df, tail, extra
+
+    def sheet(self, sheet_id, title):
+        return LocalSheet(self, sheet_id, title)
+
+
+# ------------------ GRAVAÇÃO (bases sintéticas → .xlsx) ------------------
+QUALITY_HEADERS = ["DATA", "PLACA", "VISTORIADOR", "CIDADE", "ERRO", "GRAVIDADE", "OBSERVAÇÃO",
+                   "ANALISTA", "EMPRESA"]
+PROD_HEADERS = ["UNIDADE", "DATA", "CHASSI", "PERITO", "DIGITADOR"]
+METAS_HEADERS = ["VISTORIADOR", "UNIDADE", "META MENSAL", "DIAS ÚTEIS"]
+
+
+def _save(path: str, sheets: Sequence[tuple]) -> None:
+    """[(título, cabeçalho, colunas)] → .xlsx gravado de forma atômica (leitores veem o antigo ou o novo)."""
+    wb = Workbook(write_only=True)
+    for title, header, cols in sheets:
+        ws = wb.create_sheet(title)
+        ws.append(header)
+        for row in zip(*cols):
+            ws.append(row)
+    fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        wb.save(tmp)
+        os.replace(tmp, path)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+def _py_times(s: pd.Series) -> list:
+    return list(pd.DatetimeIndex(s).to_pydatetime())
+
+
+def _index_rows(ids: Sequence[tuple]) -> tuple:
+    return ("ARQUIVOS", ["URL", "MÊS", "ATIVO"],
+            [[f"https://docs.google.com/spreadsheets/d/{fid}/edit" for fid, _ in ids],
+             [f"{ym[5:]}/{ym[:4]}" for _, ym in ids], ["S"] * len(ids)])
+
+
+def write_synthetic(root: str, data, months: Optional[Sequence[str]] = None) -> tuple:
+    """Grava a base de `data` (painel.synthetic.SyntheticData) como pasta da `LocalSource`.
+
+    Um `qualidade-AAAA-MM.xlsx` (aba GERAL) e um `producao-AAAA-MM.xlsx` (aba 1 +
+    METAS) por mês, mais os dois índices. Devolve os IDs dos índices.
+    """
+    if not ok_openpyxl:
+        raise SourceError("openpyxl não instalado.")
+    os.makedirs(root, exist_ok=True)
+    dq_all, dp_all, metas_all = data.months()
+    yms = data.spec.month_list
+    rng = np.random.default_rng(data.spec.seed + 2)
+    q_ids, p_ids = [], []
+    for ym, dq, (_, dp), dm in zip(yms, dq_all, dp_all, metas_all):
+        if months is not None and ym not in months:
+            continue
+        qid, pid = f"qualidade-{ym}", f"producao-{ym}"
+        _save(os.path.join(root, f"{qid}.xlsx"), [("GERAL", QUALITY_HEADERS, [
+            _py_times(dq["DATA_TS"]), dq["PLACA"].tolist(), dq["VISTORIADOR"].tolist(), dq["UNIDADE"].tolist(),
+            dq["ERRO"].tolist(), dq["GRAVIDADE"].tolist(), dq["OBS"].tolist(), dq["ANALISTA"].tolist(),
+            dq["EMPRESA"].tolist()])])
+        # ~5% sem PERITO: o vistoriador vem do DIGITADOR
+        no_perito = rng.random(len(dp)) < 0.05
+        vist = dp["VISTORIADOR"].to_numpy(dtype=object)
+        _save(os.path.join(root, f"{pid}.xlsx"), [
+            ("Página1", PROD_HEADERS, [dp["UNIDADE"].tolist(), _py_times(dp["__DATA__"]), dp["CHASSI"].tolist(),
+                                      np.where(no_perito, None, vist).tolist(),
+                                      np.where(no_perito, vist, None).tolist()]),
+            ("METAS", METAS_HEADERS, [dm["VISTORIADOR"].tolist(), dm["UNIDADE"].tolist(),
+                                      dm["META_MENSAL"].tolist(),
+                                      [None if pd.isna(v) else int(v) for v in dm["DIAS_UTEIS"]]]),
+        ])
+        q_ids.append((qid, ym))
+        p_ids.append((pid, ym))
+    qidx, pidx = LOCAL_INDEX_IDS
+    _save(os.path.join(root, f"{qidx}.xlsx"), [_index_rows(q_ids)])
+    _save(os.path.join(root, f"{pidx}.xlsx"), [_index_rows(p_ids)])
+    return qidx, pidx
+
+
+def append_rows(root: str, file_id: str, rows: Sequence[Sequence], tab: Optional[str] = None) -> None:
+    """Acrescenta linhas ao fim de uma aba (1ª se `tab` for None), como quem digita na planilha.
+
+    Regrava o arquivo inteiro (novo modifiedTime); serve para exercitar a leitura
+    incremental da Produção.
+    """
+    path = os.path.join(root, f"{file_id}.xlsx")
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheets = []
+        for ws in wb.worksheets:
+            data = [list(r) for r in ws.iter_rows(values_only=True)]
+            header, body = (data[0], data[1:]) if data else ([], [])
+            if ws.title == (tab or wb.worksheets[0].title):
+                body += [list(r) for r in rows]
+            width = max([len(header)] + [len(r) for r in body])
+            cols = [[r[j] if j < len(r) else None for r in body] for j in range(width)]
+            sheets.append((ws.title, list(header), cols))
+    finally:
+        wb.close()
+    _save(path, sheets)
+
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Cache em disco (colunar) dos meses já normalizados
+# ============================================================
+"""Guarda cada mês normalizado em Parquet, chaveado por ID do arquivo + modifiedTime.
+
+Layout:  <raiz>/<tipo>/<file_id>/<versão>/{<frame>.parquet, meta.json}
+
+Um mês fechado não muda de `modifiedTime`, então só volta a ser baixado quando
+o formato muda: `meta.json` guarda o `schema` (padrão: schema.DATA_SCHEMA) e
+`get()` ignora cópias de outro formato. Ao gravar uma versão nova, as
+anteriores do mesmo arquivo são apagadas.
+Sem `pyarrow` instalado o cache fica desligado (get() sempre devolve None).
+"""
+
+import os, re, json, shutil, tempfile, datetime as _dt
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from painel.schema import DATA_SCHEMA
+
+try:
+    import pyarrow  # noqa: F401
+    ok_pyarrow = True
+except Exception:
+    ok_pyarrow = False
+
+
+_SAFE_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+def _safe(s: str) -> str:
+    return _SAFE_RE.sub("_", str(s or "")) or "_"
+
+
+def _to_storable(df: pd.DataFrame) -> pd.DataFrame:
+    """Parquet exige colunas homogêneas: colunas objeto mistas viram texto.
+
+    Colunas só com `date` (DATA, __DATA__) ficam como estão e voltam como `date`.
+    """
+    out = df.copy()
+    for c in out.columns:
+        if out[c].dtype != object:
+            continue
+        vals = out[c].dropna()
+        if len(vals) and vals.map(lambda v: isinstance(v, _dt.date)).all():
+            continue
+        out[c] = out[c].map(lambda v: v if v is None or isinstance(v, str) or pd.isna(v) else str(v))
+    out.columns = [str(c) for c in out.columns]
+    return out
+
+
+class MonthStore:
+    """Armazém em disco de frames mensais normalizados."""
+
+    def __init__(self, root: str, enabled: bool = True, schema=DATA_SCHEMA):
+        self.root = root
+        self.enabled = bool(enabled) and ok_pyarrow
+        self.schema = str(schema)
+
+    def _file_dir(self, kind: str, file_id: str) -> str:
+        return os.path.join(self.root, _safe(kind), _safe(file_id))
+
+    def get(self, kind: str, file_id: str, version: str) -> Optional[Tuple[Dict[str, pd.DataFrame], dict]]:
+        """Devolve (frames, meta) se a versão pedida estiver em disco, no formato corrente."""
+        if not self.enabled or not version:
+            return None
+        vdir = os.path.join(self._file_dir(kind, file_id), _safe(version))
+        meta_path = os.path.join(vdir, "meta.json")
+        if not os.path.isfile(meta_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if str(meta.get("schema")) != self.schema:
+                return None
+            frames = {
+                name: pd.read_parquet(os.path.join(vdir, f"{name}.parquet"))
+                for name in meta.get("frames", [])
+            }
+        except Exception:
+            return None
+        return frames, meta
+
+    def latest(self, kind: str, file_id: str) -> Optional[Tuple[Dict[str, pd.DataFrame], dict]]:
+        """Última versão gravada do arquivo, qualquer que seja (cópia boa para quando a origem falha)."""
+        if not self.enabled:
+            return None
+        fdir = self._file_dir(kind, file_id)
+        try:
+            names = [n for n in os.listdir(fdir) if not n.startswith(".tmp-")]
+        except OSError:
+            return None
+        paths = [os.path.join(fdir, n, "meta.json") for n in names]
+        paths = sorted((p for p in paths if os.path.isfile(p)), key=os.path.getmtime, reverse=True)
+        for p in paths:
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    version = json.load(f).get("version", "")
+            except Exception:
+                continue
+            hit = self.get(kind, file_id, version)
+            if hit is not None:
+                return hit
+        return None
+
+    def put(self, kind: str, file_id: str, version: str, frames: Dict[str, pd.DataFrame], meta: Optional[dict] = None) -> bool:
+        """Grava uma versão de forma atômica e remove as versões antigas do arquivo."""
+        if not self.enabled or not version:
+            return False
+        fdir = self._file_dir(kind, file_id)
+        vdir = os.path.join(fdir, _safe(version))
+        tmp = None
+        try:
+            os.makedirs(fdir, exist_ok=True)
+            tmp = tempfile.mkdtemp(prefix=".tmp-", dir=fdir)
+            for name, df in frames.items():
+                _to_storable(df).to_parquet(os.path.join(tmp, f"{name}.parquet"), index=False)
+            meta = dict(meta or {}, frames=list(frames.keys()), version=version, schema=self.schema)
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            if os.path.isdir(vdir):
+                shutil.rmtree(vdir, ignore_errors=True)
+            os.replace(tmp, vdir)
+        except Exception:
+            if tmp:
+                shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        for old in os.listdir(fdir):
+            if old != _safe(version) and not old.startswith(".tmp-"):
+                shutil.rmtree(os.path.join(fdir, old), ignore_errors=True)
+        return True
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Bases sintéticas (Qualidade, Produção, Metas) para benchmark/carga
+# ============================================================
+"""Meses gerados no mesmo formato que a carga entrega ao `assemble`.
+
+Qualidade: DATA/DATA_TS (datetime64), VISTORIADOR, UNIDADE, ERRO, GRAVIDADE,
+ANALISTA, EMPRESA, PLACA, OBS — erros com frequência de Zipf, ~2% de outra
+empresa e alguns TENTATIVA DE FRAUDE. Produção: UNIDADE, CHASSI, VISTORIADOR,
+__DATA__ — uma fração `revisit_rate` das vistorias repete chassis já vistos
+(no mesmo mês ou em meses anteriores). Cada vistoriador pertence a uma unidade.
+Tudo vetorizado e determinístico pela `seed`.
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from painel.schema import PROD_DATE
+
+SEVERITIES = np.array(["LEVE", "MEDIO", "GRAVE", "GRAVISSIMO"], dtype=object)
+FRAUD = "TENTATIVA DE FRAUDE"
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    quality_rows: int = 1_000_000      # total, repartido entre os meses
+    prod_rows: int = 5_000_000
+    inspectors: int = 2_000
+    units: int = 40
+    months: int = 6
+    last_month: str = "2025-06"
+    error_kinds: int = 80
+    analysts: int = 20
+    revisit_rate: float = 0.08
+    seed: int = 42
+
+    def scaled(self, factor: float) -> "SyntheticSpec":
+        """Mesma forma com menos (ou mais) linhas."""
+        return SyntheticSpec(**{**self.__dict__,
+                                "quality_rows": max(1, int(self.quality_rows * factor)),
+                                "prod_rows": max(1, int(self.prod_rows * factor))})
+
+    @property
+    def month_list(self) -> List[str]:
+        last = pd.Period(self.last_month, freq="M")
+        return [(last - i).strftime("%Y-%m") for i in range(self.months - 1, -1, -1)]
+
+
+def _pool(prefix: str, n: int, width: int = 4) -> np.ndarray:
+    return np.array([f"{prefix} {i:0{width}d}" for i in range(n)], dtype=object)
+
+
+def _split(total: int, parts: int) -> List[int]:
+    base, extra = divmod(total, parts)
+    return [base + (i < extra) for i in range(parts)]
+
+
+def _days(rng, ym: str, rows: int) -> np.ndarray:
+    start = np.datetime64(f"{ym}-01", "D")
+    ndays = pd.Period(ym, freq="M").days_in_month
+    return start + rng.integers(0, ndays, rows).astype("timedelta64[D]")
+
+
+class SyntheticData:
+    """Pools (vistoriadores, unidades, erros, analistas) + geradores mês a mês."""
+
+    def __init__(self, spec: SyntheticSpec = SyntheticSpec()):
+        self.spec = spec
+        rng = np.random.default_rng(spec.seed)
+        self.inspectors = _pool("VISTORIADOR", spec.inspectors)
+        self.units = _pool("UNIDADE", spec.units, 2)
+        self.unit_of = rng.integers(0, spec.units, spec.inspectors)
+        self.analysts = _pool("ANALISTA", spec.analysts, 2)
+
+        self.errors = _pool("ERRO", spec.error_kinds - 1, 3)
+        self.errors = np.append(self.errors, np.array([FRAUD], dtype=object))
+        w = 1.0 / np.arange(1, spec.error_kinds + 1) ** 1.1
+        w[-1] = w[-1] * 0.2                              # fraude é rara
+        self.error_p = w / w.sum()
+        self.error_sev = rng.choice(len(SEVERITIES), spec.error_kinds, p=[0.45, 0.3, 0.18, 0.07])
+        self.error_sev[-1] = 3                           # fraude é gravíssima
+        # volume por vistoriador não é uniforme
+        act = rng.gamma(2.0, 1.0, spec.inspectors)
+        self.inspector_p = act / act.sum()
+
+    # ------------------ Qualidade ------------------
+    def quality_month(self, ym: str, rows: int, rng) -> pd.DataFrame:
+        day = _days(rng, ym, rows)
+        secs = rng.integers(8 * 3600, 18 * 3600, rows).astype("timedelta64[s]")
+        vist = rng.choice(self.spec.inspectors, rows, p=self.inspector_p)
+        err = rng.choice(self.spec.error_kinds, rows, p=self.error_p)
+        return pd.DataFrame({
+            "DATA": day.astype("datetime64[ns]"),
+            "DATA_TS": (day + secs).astype("datetime64[ns]"),
+            "VISTORIADOR": self.inspectors[vist],
+            "UNIDADE": self.units[self.unit_of[vist]],
+            "ERRO": self.errors[err],
+            "GRAVIDADE": SEVERITIES[self.error_sev[err]],
+            "ANALISTA": self.analysts[rng.integers(0, self.spec.analysts, rows)],
+            "EMPRESA": np.where(rng.random(rows) < 0.98, "STARCHECK", "OUTRA").astype(object),
+            "PLACA": np.char.mod("ABC%04d", rng.integers(0, 10_000, rows)).astype(object),
+            "OBS": "",
+        })
+
+    # ------------------ Produção ------------------
+    def prod_month(self, ym: str, rows: int, rng, seen: int) -> Tuple[pd.DataFrame, int]:
+        """Mês de Produção + total de chassis distintos gerados até ele."""
+        n_rev = int(rows * self.spec.revisit_rate)
+        new = np.arange(seen, seen + rows - n_rev)
+        old = rng.integers(0, seen + len(new), n_rev) if n_rev else np.array([], dtype=np.int64)
+        ids = np.concatenate([new, old])
+        rng.shuffle(ids)
+        vist = rng.choice(self.spec.inspectors, rows, p=self.inspector_p)
+        day = _days(rng, ym, rows)
+        df = pd.DataFrame({
+            "UNIDADE": self.units[self.unit_of[vist]],
+            "CHASSI": np.char.mod("9BW%014d", ids).astype(object),
+            "VISTORIADOR": self.inspectors[vist],
+            PROD_DATE: day.astype("datetime64[ns]"),
+        })
+        return df, seen + len(new)
+
+    # ------------------ Metas ------------------
+    def metas_month(self, ym: str) -> pd.DataFrame:
+        start = pd.Timestamp(f"{ym}-01")
+        du = len(pd.bdate_range(start, start + pd.offsets.MonthEnd(0)))
+        n = self.spec.inspectors
+        dias = pd.array(np.full(n, du), dtype="Int64")
+        dias[::10] = pd.NA                               # parte sem DIAS_UTEIS (usa o calendário)
+        return pd.DataFrame({
+            "VISTORIADOR": self.inspectors,
+            "UNIDADE": self.units[self.unit_of],
+            "META_MENSAL": np.full(n, 250),
+            "DIAS_UTEIS": dias,
+            "YM": ym,
+        })
+
+    def months(self) -> Tuple[List[pd.DataFrame], List[Tuple[str, pd.DataFrame]], List[pd.DataFrame]]:
+        """(meses de Qualidade, [(chave, mês de Produção)], metas por mês), do mais antigo ao mais novo."""
+        spec = self.spec
+        rng = np.random.default_rng(spec.seed + 1)
+        yms = spec.month_list
+        dq_all = [self.quality_month(ym, n, rng) for ym, n in zip(yms, _split(spec.quality_rows, len(yms)))]
+        dp_all, seen = [], 0
+        for ym, n in zip(yms, _split(spec.prod_rows, len(yms))):
+            dp, seen = self.prod_month(ym, n, rng, seen)
+            dp_all.append((f"sintetico-{ym}@{spec.seed}", dp))
+        return dq_all, dp_all, [self.metas_month(ym) for ym in yms]
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Tabelas derivadas (farol, tendência, comparativo) — vetorizadas
+# ============================================================
+"""Montagem das tabelas por vistoriador sem laços por linha.
+
+Substitui iterrows/apply(axis=1) do app por operações de coluna: o custo
+passa a ser proporcional a poucas passagens vetorizadas, mesmo com milhares
+de vistoriadores.
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+FAROL_VERDE, FAROL_AMARELO, FAROL_VERMELHO, FAROL_NA = "🟢", "🟡", "🔴", "—"
+
+TREND_COLUMNS = ["VISTORIADOR", "Erros (MTD)", "Erros/dia", "Dias úteis passados",
+                 "Dias úteis (mês)", "Projeção (mês)"]
+
+
+def farol(pct: pd.Series, meta: float, tol: float) -> pd.Series:
+    """🟢 até a meta, 🟡 até meta+tol, 🔴 acima; — quando não há %."""
+    v = pd.to_numeric(pct, errors="coerce").to_numpy(dtype=float)
+    diff = v - meta
+    out = np.select([np.isnan(v), diff <= 0, diff <= tol],
+                    [FAROL_NA, FAROL_VERDE, FAROL_AMARELO], FAROL_VERMELHO)
+    return pd.Series(out, index=pct.index)
+
+
+def fmt_num(values: pd.Series, prefix=None, suffix: str = "") -> pd.Series:
+    """'{prefix} {x:.1f}{suffix}' com vírgula decimal; — para vazios.
+
+    `prefix` pode ser uma Series (ex.: o emoji do farol) alinhada a `values`.
+    """
+    v = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    if not len(v):
+        return pd.Series([], index=values.index, dtype=object)
+    na = np.isnan(v)
+    txt = np.char.replace(np.char.mod("%.1f", np.where(na, 0.0, v)), ".", ",")
+    txt = np.char.add(txt, suffix)
+    if prefix is not None:
+        pre = prefix.to_numpy(dtype=object).astype(str) if isinstance(prefix, pd.Series) else str(prefix)
+        txt = np.char.add(np.char.add(pre, " "), txt)
+    out = np.where(na, FAROL_NA, txt.astype(object))
+    return pd.Series(out, index=values.index)
+
+
+def first_nonblank(df: pd.DataFrame, cols: Sequence[str]) -> pd.Series:
+    """Primeiro texto não vazio entre `cols`, linha a linha ("" se nenhum)."""
+    out = pd.Series("", index=df.index, dtype=object)
+    pending = np.ones(len(df), dtype=bool)
+    for c in cols:
+        if c not in df.columns:
+            continue
+        s = df[c].astype(object)
+        ok = s.map(type).eq(str).to_numpy() & pending
+        ok[ok] = s[ok].str.strip().ne("").to_numpy()
+        out[ok] = s[ok]
+        pending &= ~ok
+        if not pending.any():
+            break
+    return out
+
+
+def status3(p1: pd.Series, p2: pd.Series, p3: pd.Series) -> pd.Series:
+    """Tendência de três semanas a partir das %ERRO de S(k-2), S(k-1) e S(k)."""
+    a, b, c = (pd.to_numeric(p, errors="coerce").to_numpy(dtype=float) for p in (p1, p2, p3))
+    d12, d23 = b - a, c - b
+    out = np.select(
+        [np.isnan(a) | np.isnan(b) | np.isnan(c),
+         (d12 < 0) & (d23 < 0), (d12 > 0) & (d23 > 0),
+         (d12 < 0) & (d23 > 0), (d12 > 0) & (d23 < 0)],
+        [FAROL_NA, "Continua melhorando (↓↓)", "Continua piorando (↑↑)",
+         "Melhorou e depois piorou (↓↑)", "Piorou e depois melhorou (↑↓)"],
+        "Sem alteração (↔↔)")
+    return pd.Series(out, index=p1.index)
+
+
+def trend_projection(erros_mtd: pd.DataFrame, metas: pd.DataFrame,
+                     dias_passados: int, dias_fallback: int) -> pd.DataFrame:
+    """Projeção de erros até o fim do mês por vistoriador.
+
+    `erros_mtd`: VISTORIADOR, ERROS_MTD. `metas`: VISTORIADOR (já em caixa alta),
+    DIAS_UTEIS. Dias úteis ausentes/zero caem no `dias_fallback`; em duplicatas
+    vale a última linha das metas.
+    """
+    if erros_mtd.empty:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+
+    vist = erros_mtd["VISTORIADOR"].astype(str).reset_index(drop=True)
+    e_mtd = pd.to_numeric(erros_mtd["ERROS_MTD"], errors="coerce").fillna(0).astype(int).to_numpy()
+
+    du = pd.Series(np.nan, index=vist.index)
+    if not metas.empty and "DIAS_UTEIS" in metas.columns:
+        m = metas.drop_duplicates("VISTORIADOR", keep="last").set_index("VISTORIADOR")["DIAS_UTEIS"]
+        du = vist.map(pd.to_numeric(m, errors="coerce"))
+    du_total = du.fillna(0).astype(int).to_numpy()
+    du_total = np.where(du_total != 0, du_total, int(dias_fallback))
+
+    du_pass = np.where(du_total != 0, np.minimum(int(dias_passados), du_total), int(dias_passados))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        erros_dia = np.where(du_pass != 0, e_mtd / np.where(du_pass != 0, du_pass, 1), np.nan)
+    has = ~np.isnan(erros_dia)
+    proj = np.where(has, np.round(np.where(has, erros_dia, 0) * du_total), e_mtd).astype(int)
+
+    out = pd.DataFrame({
+        "VISTORIADOR": vist,
+        "Erros (MTD)": e_mtd,
+        "Erros/dia": np.where(has, np.round(erros_dia, 2), 0.0),
+        "Dias úteis passados": du_pass.astype(int),
+        "Dias úteis (mês)": du_total.astype(int),
+        "Projeção (mês)": proj,
+    })
+    return out.sort_values("Projeção (mês)", ascending=False)
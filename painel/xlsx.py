@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# ============================================================
+# Leitura em streaming de XLSX (openpyxl read_only)
+# ============================================================
+"""Lê uma aba de XLSX linha a linha, só com as colunas pedidas, em blocos.
+
+`pd.read_excel` monta o modelo de objetos inteiro do openpyxl e um DataFrame
+com todas as colunas, enquanto os bytes do arquivo ainda estão em memória.
+Aqui o arquivo fica num temporário em disco, o XML da aba é percorrido em modo
+read_only/values_only e cada bloco de `chunk_rows` linhas vira um DataFrame
+pequeno, já com os nomes canônicos — o chamador normaliza bloco a bloco.
+"""
+
+from typing import BinaryIO, Callable, Iterator, Optional
+
+import pandas as pd
+
+try:
+    from openpyxl import load_workbook
+    ok_openpyxl = True
+except Exception:
+    ok_openpyxl = False
+
+CHUNK_ROWS = 10_000
+
+
+def read_sheet_chunks(fh: BinaryIO, sheet: str, pick: Callable[[str], Optional[str]],
+                      chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Blocos da aba `sheet` com as colunas cujo cabeçalho `pick` reconhece.
+
+    `pick(cabeçalho) -> nome canônico | None`; vale a primeira coluna de cada
+    nome. Linhas totalmente vazias nas colunas projetadas são descartadas.
+    Aba inexistente levanta ValueError já na chamada (como `pd.read_excel`).
+    """
+    wb = load_workbook(fh, read_only=True, data_only=True)
+    if sheet not in wb.sheetnames:
+        wb.close()
+        raise ValueError(f"Worksheet named '{sheet}' not found")
+    return _iter_chunks(wb, wb[sheet], pick, chunk_rows)
+
+
+def _iter_chunks(wb, ws, pick, chunk_rows) -> Iterator[pd.DataFrame]:
+    try:
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        cols = {}
+        for i, h in enumerate(header):
+            name = pick(str(h).strip()) if h is not None else None
+            if name and name not in cols:
+                cols[name] = i
+        if not cols:
+            return
+        names, idx = list(cols), list(cols.values())
+        last = max(idx)
+
+        buf = [[] for _ in idx]
+        for row in rows:
+            if len(row) <= last:
+                row = tuple(row) + (None,) * (last + 1 - len(row))
+            vals = [row[i] for i in idx]
+            if all(v is None or v == "" for v in vals):
+                continue
+            for b, v in zip(buf, vals):
+                b.append(v)
+            if len(buf[0]) >= chunk_rows:
+                yield _frame(names, buf)
+                buf = [[] for _ in idx]
+        if buf[0]:
+            yield _frame(names, buf)
+    finally:
+        wb.close()
+
+
+def _frame(names, buf) -> pd.DataFrame:
+    # Series infere o tipo por coluna (datetime64 quando só há datas, número, texto)
+    return pd.DataFrame({n: pd.Series(b) for n, b in zip(names, buf)})
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+
+from painel.analytics import assemble
+from painel.revisits import RevisitIndex
+
+
+def test_assemble_categories_only_from_panel_company():
+    dq = pd.DataFrame({
+        "DATA": pd.to_datetime(["2025-03-03", "2025-03-04"]),
+        "VISTORIADOR": ["ANA", "BETO"], "UNIDADE": ["U1", "U2"], "ERRO": ["E1", "E2"],
+        "GRAVIDADE": ["LEVE", "GRAVE"], "ANALISTA": ["X", "Y"], "EMPRESA": ["STARCHECK", "OUTRA"],
+        "PLACA": ["A", "B"],
+    })
+    dp = pd.DataFrame({"UNIDADE": ["U1"], "CHASSI": ["C1"], "VISTORIADOR": ["ANA"],
+                       "__DATA__": pd.to_datetime(["2025-03-03"])})
+    dfQ, dfP, _, cubeQ, _ = assemble([dq], [("p@1", dp)], [], RevisitIndex())
+    assert list(dfQ["VISTORIADOR"].cat.categories) == ["ANA"]
+    assert list(dfQ["UNIDADE"].cat.categories) == ["U1"]
+    assert list(dfQ["ERRO"].cat.categories) == ["E1"]
+    assert dfP["VISTORIADOR"].dtype == dfQ["VISTORIADOR"].dtype
+    assert int(cubeQ["n"].sum()) == 1
+
+
+# ------------------ seções do cubo × cálculo antigo sobre as linhas ------------------
+from datetime import date  # noqa: E402
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from painel.analytics import PanelView  # noqa: E402
+from painel.cube import GRAV_GG  # noqa: E402
+from painel.filters import FilterSpec  # noqa: E402
+from painel.schema import PROD_DATE, QUALITY_DATE  # noqa: E402
+from painel.synthetic import SyntheticData, SyntheticSpec  # noqa: E402
+
+YM = "2025-06"
+
+
+@pytest.fixture(scope="module")
+def panel():
+    spec = SyntheticSpec(quality_rows=6000, prod_rows=15000, inspectors=40, units=5, months=3, last_month=YM)
+    data = SyntheticData(spec)
+    dfQ, dfP, dfMetas, cubeQ, cubeP = assemble(*data.months(), RevisitIndex())
+    return data, dfQ, dfP, dfMetas, cubeQ, cubeP
+
+
+def _specs(data):
+    return [FilterSpec.build(date(2025, 6, 1), date(2025, 6, 30)),
+            FilterSpec.build(date(2025, 6, 3), date(2025, 6, 24), [data.units[1], data.units[3]]),
+            FilterSpec.build(date(2025, 6, 10), date(2025, 6, 17), None, list(data.inspectors[:15]))]
+
+
+def _counts(df, by, name):
+    out = df.groupby(by, observed=True).size()
+    return {k if not isinstance(k, tuple) else tuple(map(str, k)): int(v) for k, v in out.items() if v}
+
+
+def _as_dict(df, by, col):
+    keys = df[by].astype(str) if isinstance(by, str) else df[by].astype(str).apply(tuple, axis=1)
+    return {k: int(v) for k, v in zip(keys, df[col]) if v}
+
+
+@pytest.mark.parametrize("case", [0, 1, 2])
+def test_panel_sections_match_row_level(panel, case):
+    data, dfQ, dfP, dfMetas, cubeQ, cubeP = panel
+    flt = _specs(data)[case]
+    pv = PanelView(dfQ, dfMetas, cubeQ, cubeP, flt, YM)
+
+    rowsQ = flt.view(dfQ, QUALITY_DATE)
+    rowsP = flt.view(dfP, PROD_DATE, period=pv.prod_period)
+    gg = rowsQ["GRAVIDADE"].isin(GRAV_GG)
+
+    k = pv.kpis()
+    assert k["total_erros"] == len(rowsQ)
+    assert k["total_gg"] == int(gg.sum())
+    assert k["vist_avaliados"] == rowsQ["VISTORIADOR"].astype(str).nunique()
+    assert k["total_vist_brutas"] == len(rowsP)
+    assert k["prev_total"] == len(flt.view(dfQ, QUALITY_DATE, period=pv.prev_period))
+    assert k["vist_5gg"] == int((rowsQ[gg].groupby("VISTORIADOR", observed=True).size() >= 5).sum())
+
+    assert _as_dict(pv.by_gravidade(), "GRAVIDADE", "QTD") == _counts(rowsQ, "GRAVIDADE", "QTD")
+    hm = pv.heatmap()
+    assert _as_dict(hm, ["UNIDADE", "GRAVIDADE"], "QTD") == _counts(rowsQ, ["UNIDADE", "GRAVIDADE"], "QTD")
+    assert _as_dict(hm.drop_duplicates("UNIDADE"), "UNIDADE", "DEN") == _counts(rowsP, "UNIDADE", "DEN")
+    pareto = pv.pareto()
+    assert list(pareto["QTD"]) == sorted(rowsQ["ERRO"].astype(str).value_counts().head(10), reverse=True)
+    dow = rowsQ[QUALITY_DATE].dt.weekday.value_counts()
+    assert list(pv.weekday_counts()["QTD"]) == [int(dow.get(i, 0)) for i in range(7)]
+
+    base = pv.vist_tables(False)[0]
+    byv = rowsP.groupby("VISTORIADOR", observed=True)["IS_REV"].agg(["size", "sum"])
+    assert _as_dict(base, "VISTORIADOR", "vist") == {str(k): int(v) for k, v in byv["size"].items() if v}
+    assert _as_dict(base, "VISTORIADOR", "rev") == {str(k): int(v) for k, v in byv["sum"].items() if v}
+    assert _as_dict(base, "VISTORIADOR", "erros") == _counts(rowsQ, "VISTORIADOR", "erros")
+    assert _as_dict(base, "VISTORIADOR", "erros_gg") == _counts(rowsQ[gg], "VISTORIADOR", "erros_gg")
+
+    for di, dfim in pv.week_windows():
+        week = pv._pct_week(di, dfim, False)
+        wq = FilterSpec.build(di, dfim).view(rowsQ, QUALITY_DATE)
+        wp = FilterSpec.build(di, dfim).view(rowsP, PROD_DATE)
+        assert _as_dict(week, "VISTORIADOR", "ERROS") == _counts(wq, "VISTORIADOR", "ERROS")
+        assert _as_dict(week, "VISTORIADOR", "DEN") == _counts(wp, "VISTORIADOR", "DEN")
+        np.testing.assert_allclose(
+            week.set_index(week["VISTORIADOR"].astype(str))["%ERRO"].dropna().sort_index(),
+            (wq.groupby("VISTORIADOR", observed=True).size()
+             .reindex(wp.groupby("VISTORIADOR", observed=True).size().index, fill_value=0)
+             / wp.groupby("VISTORIADOR", observed=True).size() * 100).round(1)
+            .rename(index=str).dropna().sort_index(),
+        )
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Fatias do cubo diário somadas têm de bater com a agregação das linhas."""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from painel.cube import GRAV_GG, build_prod_cube, build_quality_cube, rollup, weekday
+from painel.filters import FilterSpec
+from painel.schema import DAY_COL, compact_frames
+
+
+def _frames(seed=3, n=2000):
+    rng = np.random.default_rng(seed)
+    days = (np.datetime64("2025-03-01") + rng.integers(0, 31, n).astype("timedelta64[D]")).astype("datetime64[ns]")
+    dq = pd.DataFrame({"DATA": days,
+                       "UNIDADE": rng.choice(["U1", "U2", "U3"], n),
+                       "VISTORIADOR": rng.choice([f"V{i}" for i in range(12)], n),
+                       "GRAVIDADE": rng.choice(["LEVE", "MEDIO", "GRAVE", "GRAVISSIMO"], n),
+                       "ERRO": rng.choice([f"E{i}" for i in range(9)], n)})
+    dp = pd.DataFrame({"__DATA__": days,
+                       "UNIDADE": dq["UNIDADE"], "VISTORIADOR": dq["VISTORIADOR"],
+                       "IS_REV": rng.integers(0, 2, n)})
+    return compact_frames(dq, dp)
+
+
+def _sorted(df, by):
+    out = df.copy()
+    for c in by:
+        out[c] = out[c].astype(str)
+    return out.sort_values(by).reset_index(drop=True)
+
+
+def test_quality_cube_rollups_match_rows():
+    dq, _ = _frames()
+    cube = build_quality_cube(dq)
+    assert int(cube["n"].sum()) == len(dq)
+    for by in (["VISTORIADOR"], ["UNIDADE", "ERRO"], [DAY_COL]):
+        got = rollup(cube, by, ["n", "gg"])
+        rows = dq.assign(gg=dq["GRAVIDADE"].isin(GRAV_GG).astype(int))
+        want = rows.groupby(by, observed=True).agg(n=("ERRO", "size"), gg=("gg", "sum")).reset_index()
+        pd.testing.assert_frame_equal(_sorted(got, by), _sorted(want, by), check_dtype=False)
+
+
+def test_prod_cube_rollup_under_filter_matches_rows():
+    dq, dp = _frames()
+    cube = build_prod_cube(dp)
+    flt = FilterSpec.build(date(2025, 3, 10), date(2025, 3, 20), ["U2"])
+    got = rollup(cube[flt.mask(cube, "__DATA__")], "VISTORIADOR", ["vist", "rev"])
+    rows = flt.view(dp, "__DATA__")
+    want = rows.groupby("VISTORIADOR", observed=True).agg(vist=("IS_REV", "size"), rev=("IS_REV", "sum")).reset_index()
+    pd.testing.assert_frame_equal(_sorted(got, ["VISTORIADOR"]), _sorted(want, ["VISTORIADOR"]), check_dtype=False)
+
+
+def test_weekday_and_empty_inputs():
+    dq, _ = _frames()
+    cube = build_quality_cube(dq)
+    days = pd.to_datetime(cube[DAY_COL].astype("int64"), unit="D")
+    np.testing.assert_array_equal(weekday(cube).to_numpy(), days.dt.weekday.to_numpy())
+    assert build_quality_cube(dq.iloc[:0]).empty
+    assert list(rollup(pd.DataFrame(), "VISTORIADOR", ["n"]).columns) == ["VISTORIADOR", "n"]
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import gc
+
+import pandas as pd
+
+from painel.dataset import DatasetManager, Snapshot
+from painel.revisits import RevisitIndexes
+
+
+def _builder():
+    calls = []
+
+    def build(prev):
+        calls.append(prev)
+        empty = pd.DataFrame()
+        return Snapshot(f"v{len(calls)}", empty, empty, empty, empty, empty)
+    return build, calls
+
+
+def test_idle_window_refreshes_before_serving_old_snapshot():
+    build, calls = _builder()
+    m = DatasetManager(build, interval=1, idle_seconds=0)
+    assert m.current().version == "v1"
+    m.stop()
+    m._thread.join(2)
+    m.last_refresh -= 10                 # parado há mais de um ciclo
+    assert m.current().version == "v2"
+    assert len(calls) == 2 and m.running
+    m.stop()
+
+
+def test_discarded_manager_stops_its_thread():
+    build, _ = _builder()
+    m = DatasetManager(build, interval=1).start()
+    thread = m._thread
+    del m
+    gc.collect()
+    thread.join(3)
+    assert not thread.is_alive()
+
+
+def test_revisit_indexes_per_window():
+    reg = RevisitIndexes()
+    a, b = reg.get(("2024-01", "2024-02")), reg.get(("2024-02", "2024-03"))
+    assert a is not b and reg.get(("2024-01", "2024-02")) is a
+    df = pd.DataFrame({"CHASSI": ["X", "Y"], "__DATA__": pd.to_datetime(["2024-02-01", "2024-02-02"])})
+    a.flag([("m@1", df)])
+    b.flag([("m@1", df)])
+    reg.rekey("m@1", "m@2", df.iloc[:0])
+    assert set(a._summaries) == set(b._summaries) == {"m@2"}
+    del a
+    gc.collect()
+    assert len(reg._live()) == 1
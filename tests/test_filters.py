@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.filters import FilterSpec
+from painel.schema import compact_frames
+
+
+def _frames(seed=0, n=400):
+    rng = np.random.default_rng(seed)
+    days = np.datetime64("2025-02-20") + rng.integers(0, 30, n).astype("timedelta64[D]")
+    dates = pd.Series(days.astype("datetime64[ns]"))
+    dates[rng.random(n) < 0.05] = pd.NaT
+    dq = pd.DataFrame({"DATA": dates,
+                       "UNIDADE": rng.choice(["U1", "U2", "U3"], n),
+                       "VISTORIADOR": rng.choice(["ANA", "BETO", "CAIO", "DUDA"], n)})
+    dp = pd.DataFrame({"__DATA__": dates, "UNIDADE": dq["UNIDADE"], "VISTORIADOR": dq["VISTORIADOR"]})
+    return dq, dp
+
+
+def _naive(df, col, spec):
+    d = df[col]
+    m = (d >= pd.Timestamp(spec.start)) & (d <= pd.Timestamp(spec.end))
+    if spec.unidades:
+        m &= df["UNIDADE"].astype(str).isin(spec.unidades)
+    if spec.vistoriadores:
+        m &= df["VISTORIADOR"].astype(str).isin(spec.vistoriadores)
+    return m.to_numpy()
+
+
+SPECS = [
+    FilterSpec.build(date(2025, 3, 1), date(2025, 3, 31)),
+    FilterSpec.build(date(2025, 3, 1), date(2025, 3, 10), ["u1", " U3 "]),
+    FilterSpec.build(date(2025, 2, 20), date(2025, 3, 1), None, ["beto", "duda"]),
+    FilterSpec.build(date(2025, 3, 5), date(2025, 3, 5), ["U2"], ["ANA"]),
+]
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_mask_matches_row_filter_raw_and_compact(spec):
+    dq, dp = _frames()
+    cq, cp = compact_frames(dq, dp)
+    expected = _naive(dq, "DATA", spec)
+    np.testing.assert_array_equal(spec.mask(dq, "DATA"), expected)
+    np.testing.assert_array_equal(spec.mask(cq, "DATA"), expected)       # via DIA + categorias
+    np.testing.assert_array_equal(spec.mask(cp, "__DATA__"), expected)
+
+
+def test_view_selects_rows_and_other_period():
+    dq, _ = _frames()
+    spec = SPECS[1]
+    view = spec.view(dq, "DATA")
+    pd.testing.assert_frame_equal(view, dq[_naive(dq, "DATA", spec)])
+    other = spec.view(dq, "DATA", period=(date(2025, 2, 20), date(2025, 2, 28)))
+    assert other["DATA"].max() <= pd.Timestamp("2025-02-28")
+    assert set(other["UNIDADE"]) <= {"U1", "U3"}
+    assert spec.view(dq.iloc[:0], "DATA").empty
+
+
+def test_build_normalizes_selection():
+    spec = FilterSpec.build(date(2025, 3, 1), date(2025, 3, 2), ["b", "A ", None, "a"])
+    assert spec.unidades == ("A", "B")
+    assert spec == FilterSpec.build(date(2025, 3, 1), date(2025, 3, 2), ["A", "B"])
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+from painel.loader import read_prod_cached
+from painel.store import MonthStore, ok_pyarrow
+
+pytestmark = pytest.mark.skipif(not ok_pyarrow, reason="cache em disco precisa de pyarrow")
+
+
+class BookSource:
+    """Só `book`, contando as leituras completas."""
+
+    def __init__(self):
+        self.books = 0
+
+    def book(self, sheet_id, pick, numeric=(), tabs=()):
+        self.books += 1
+        raw = pd.DataFrame({"UNIDADE": ["a"], "DATA": ["01/03/2024"], "CHASSI": ["x1"], "PERITO": ["p"]})
+        return "Março", None, raw, None, {}
+
+
+def test_prod_month_comes_from_disk_when_version_matches(tmp_path):
+    store, src = MonthStore(str(tmp_path)), BookSource()
+    df, _, title, cache = read_prod_cached(store, src, "s1", "2024-03", "v1")
+    assert (cache, title, src.books) == ("miss", "Março", 1)
+    df2, _, _, cache = read_prod_cached(store, src, "s1", "2024-03", "v1")
+    assert (cache, src.books) == ("disco", 1)
+    assert list(df2["CHASSI"]) == list(df["CHASSI"])
+    _, _, _, cache = read_prod_cached(store, src, "s1", "2024-03", "v2")
+    assert (cache, src.books) == ("miss", 2)
+
+
+def test_prod_month_without_version_skips_disk(tmp_path):
+    store, src = MonthStore(str(tmp_path)), BookSource()
+    read_prod_cached(store, src, "s1", "2024-03")
+    _, _, _, cache = read_prod_cached(store, src, "s1", "2024-03")
+    assert (cache, src.books) == ("miss", 2)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from painel.memo import TableMemo
+
+
+def test_lookup_reports_hits_and_misses():
+    memo = TableMemo(4)
+    calls = []
+    build = lambda: calls.append(1) or len(calls)
+    assert memo.lookup("t", 1, build) == (1, False)
+    assert memo.lookup("t", 1, build) == (1, True)
+    assert memo.get("t", 1, build) == 1
+    assert (memo.hits, memo.misses, len(calls)) == (2, 1, 1)
+
+
+def test_lru_evicts_least_recently_used():
+    memo = TableMemo(2)
+    memo.get("t", "a", lambda: "A")
+    memo.get("t", "b", lambda: "B")
+    memo.get("t", "a", lambda: "novo")                # "a" passa a ser o mais recente
+    memo.get("t", "c", lambda: "C")                   # sai "b"
+    assert len(memo) == 2
+    assert memo.lookup("t", "a", lambda: "novo") == ("A", True)
+    assert memo.lookup("t", "b", lambda: "B2") == ("B2", False)
+
+
+def test_name_is_part_of_the_key():
+    memo = TableMemo(4)
+    memo.get("x", 1, lambda: "x")
+    assert memo.get("y", 1, lambda: "y") == "y"
+    memo.clear()
+    assert len(memo) == 0
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import io
+import urllib.request
+
+from painel import metrics
+from painel.metrics import Registry
+from painel.sources import DataSource, MeteredSource
+
+
+def test_counter_and_histogram_render():
+    reg = Registry()
+    c = reg.counter("t_total", "Contador.", ("op",))
+    h = reg.histogram("t_segundos", "Histograma.", ("op",), buckets=(0.1, 1))
+    c.inc(op="a")
+    c.inc(2, op='q"x')
+    for v in (0.05, 0.5, 5):
+        h.observe(v, op="a")
+    text = reg.render()
+    assert "# TYPE t_total counter" in text
+    assert 't_total{op="a"} 1.0' in text
+    assert 't_total{op="q\\"x"} 2.0' in text
+    assert 't_segundos_bucket{op="a",le="0.1"} 1' in text
+    assert 't_segundos_bucket{op="a",le="1.0"} 2' in text     # cumulativo
+    assert 't_segundos_bucket{op="a",le="+Inf"} 3' in text
+    assert 't_segundos_count{op="a"} 3' in text
+    assert 't_segundos_sum{op="a"} 5.55' in text
+    assert h.count(op="a") == 3
+
+
+def test_registry_reuses_metric_by_name():
+    reg = Registry()
+    assert reg.counter("x_total", "X.") is reg.counter("x_total", "X.")
+
+
+def test_observe_maps_perf_events():
+    before = metrics.LOAD_TOTAL.value(tipo="teste", cache="erro")
+    metrics.observe({"evento": "carga", "tipo": "teste", "ms": 10, "erro": "boom"})
+    assert metrics.LOAD_TOTAL.value(tipo="teste", cache="erro") == before + 1
+    n = metrics.LOAD_STAGE_SECONDS.count(tipo="teste", etapa="io")
+    metrics.observe({"evento": "carga", "tipo": "teste", "ms": 10, "cache": "miss", "io_ms": 4})
+    assert metrics.LOAD_STAGE_SECONDS.count(tipo="teste", etapa="io") == n + 1
+
+
+def test_fragment_metric_only_on_fragment_reruns():
+    n = metrics.FRAGMENT_SECONDS.count(secao="teste")
+    metrics.observe({"evento": "fragmento", "secao": "teste", "ms": 30, "parcial": False})
+    assert metrics.FRAGMENT_SECONDS.count(secao="teste") == n
+    metrics.observe({"evento": "fragmento", "secao": "teste", "ms": 30, "parcial": True})
+    assert metrics.FRAGMENT_SECONDS.count(secao="teste") == n + 1
+
+
+def test_write_textfile_is_complete(tmp_path):
+    reg = Registry()
+    reg.counter("y_total", "Y.").inc()
+    path = tmp_path / "m.prom"
+    metrics.write_textfile(str(path), reg)
+    assert path.read_text(encoding="utf-8") == reg.render()
+    assert [p.name for p in tmp_path.iterdir()] == ["m.prom"]
+
+
+class TinySource(DataSource):
+    def versions(self, file_ids): return {f: {} for f in file_ids}
+    def metadata(self, file_id): return {}
+    def worksheet(self, sheet_id, tab): return None
+    def download_to(self, file_id, fh): fh.write(b"x" * 10)
+    def book(self, sheet_id, pick, numeric=(), tabs=()): return "t", None, None, None, {}
+    def sheet(self, sheet_id, title): return None
+
+
+def test_metered_source_counts_http_requests():
+    src = MeteredSource(TinySource())
+    before = {op: metrics.SOURCE_REQUESTS.value(operacao=op, resultado="ok") for op in ("book", "download")}
+    src.book("s", str)
+    src.download_to("f", io.BytesIO())
+    assert metrics.SOURCE_REQUESTS.value(operacao="book", resultado="ok") - before["book"] == 2
+    assert metrics.SOURCE_REQUESTS.value(operacao="download", resultado="ok") - before["download"] == 1
+
+
+def test_serve_binds_localhost_by_default():
+    server = metrics.serve(0, registry=Registry())
+    try:
+        host, port = server.server_address[:2]
+        assert host == "127.0.0.1"
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as r:
+            assert r.status == 200
+    finally:
+        server.shutdown()
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from painel import resilience
+from painel.resilience import CircuitBreaker, CircuitOpen, Scheduler, TokenBucket, retry_after
+from painel.sources import SourceError, is_transient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+        self.frozen = False            # True: sleep não avança o relógio (threads "simultâneas")
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, s):
+        self.slept.append(s)
+        if not self.frozen:
+            self.now += s
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", c.monotonic)
+    monkeypatch.setattr(resilience.time, "sleep", c.sleep)
+    return c
+
+
+# ------------------ TokenBucket ------------------
+def test_bucket_burst_then_queue(clock):
+    b = TokenBucket(rate=2, burst=3)
+    assert [b.acquire() for _ in range(3)] == [0, 0, 0]
+    assert b.acquire() == pytest.approx(0.5)          # 4ª ficha: espera 1/rate
+    assert b.acquire() == pytest.approx(0.5)
+
+
+def test_bucket_refills_up_to_burst(clock):
+    b = TokenBucket(rate=1, burst=2)
+    b.acquire(2)
+    clock.now += 10                                  # muito tempo parado: recarrega só até o burst
+    assert b.try_acquire(2)
+    assert not b.try_acquire(1)
+    clock.now += 1
+    assert b.try_acquire(1)
+
+
+def test_bucket_queue_is_fifo_reservation(clock):
+    b = TokenBucket(rate=10, burst=1)
+    b.acquire()
+    clock.frozen = True                               # três chamadas chegando juntas
+    assert [b.acquire() for _ in range(3)] == pytest.approx([0.1, 0.2, 0.3])
+
+
+def test_bucket_hold(clock):
+    b = TokenBucket(rate=1, burst=5)
+    b.hold(3)
+    assert b.acquire() == pytest.approx(4)            # 3 s de pausa + a própria ficha
+
+
+# ------------------ CircuitBreaker ------------------
+def test_breaker_transitions(clock):
+    br = CircuitBreaker(threshold=2, cooldown=30)
+    assert br.allow("f")
+    assert not br.failure("f")
+    assert br.failure("f")                            # 2ª falha seguida: abre
+    assert not br.allow("f")
+    assert "f" in br.open_keys()
+    clock.now += 30
+    assert br.allow("f")                              # meio-aberto: uma chamada de teste
+    assert not br.allow("f")
+    assert br.failure("f")                            # teste falhou: reabre
+    assert not br.allow("f")
+    clock.now += 30
+    assert br.allow("f")
+    br.success("f")                                   # teste passou: fecha
+    assert br.allow("f") and br.allow("f")
+    assert br.open_keys() == {}
+
+
+def test_breaker_success_resets_count(clock):
+    br = CircuitBreaker(threshold=2, cooldown=30)
+    br.failure("f")
+    br.success("f")
+    assert not br.failure("f")
+
+
+def test_breaker_release_frees_trial(clock):
+    br = CircuitBreaker(threshold=1, cooldown=5)
+    br.failure("f")
+    clock.now += 5
+    assert br.allow("f")
+    br.release("f")
+    assert br.allow("f")
+
+
+# ------------------ erros e Retry-After ------------------
+class HttpLike(Exception):
+    def __init__(self, status, headers=None, msg=""):
+        super().__init__(msg)
+        self.resp = type("Resp", (dict,), {"status": status})(headers or {})
+
+
+def test_transient_classification():
+    assert is_transient(SourceError("x", status=429))
+    assert is_transient(HttpLike(503))
+    assert is_transient(HttpLike(403, msg="userRateLimitExceeded"))
+    assert is_transient(ConnectionError())
+    assert not is_transient(HttpLike(403, msg="forbidden"))
+    assert not is_transient(HttpLike(404))
+    assert not is_transient(CircuitOpen("aberto"))
+
+
+def test_retry_after_from_headers():
+    assert retry_after(HttpLike(429, {"retry-after": "7"})) == 7
+    assert retry_after(HttpLike(429)) == 0
+
+
+# ------------------ Scheduler.call ------------------
+def _flaky(errors):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+    return fn, calls
+
+
+def test_call_retries_transient_then_succeeds(clock):
+    s = Scheduler(retries=3, backoff_base=1, backoff_max=8, seed=1)
+    fn, calls = _flaky([SourceError("a", 503), SourceError("b", 429)])
+    assert s.call("metadata", "f", fn) == "ok"
+    assert len(calls) == 3
+    assert s.stats()["novas_tentativas"] == 2
+    assert all(0 <= w <= 2 for w in clock.slept)      # jitter completo: [0, base·2^n]
+
+
+def test_call_does_not_retry_permanent_errors(clock):
+    s = Scheduler(retries=3, breaker_failures=1)
+    fn, calls = _flaky([SourceError("404", 404)])
+    with pytest.raises(SourceError):
+        s.call("metadata", "f", fn)
+    assert len(calls) == 1
+    assert s.breaker.allow("f")                       # erro permanente não abre o disjuntor
+
+
+def test_call_honours_retry_after(clock):
+    s = Scheduler(per_minute={"drive": 60}, burst_seconds=1, retries=1, backoff_base=0.01, seed=1)
+    fn, _ = _flaky([HttpLike(429, {"Retry-After": "5"})])
+    t0 = clock.now
+    assert s.call("metadata", "f", fn) == "ok"
+    assert clock.now - t0 >= 5
+
+
+def test_call_opens_breaker_after_exhausted_retries(clock):
+    s = Scheduler(retries=1, backoff_base=0.01, breaker_failures=2, breaker_cooldown=60)
+    for _ in range(2):
+        fn, _ = _flaky([SourceError("x", 503), SourceError("x", 503)])
+        with pytest.raises(SourceError):
+            s.call("download", "f", fn)
+    fn, calls = _flaky([])
+    with pytest.raises(CircuitOpen):
+        s.call("download", "f", fn)
+    assert calls == []
+    assert s.call("download", "g", fn) == "ok"        # o disjuntor é por arquivo
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""IS_REV incremental (resumos, rekey, _refresh) tem de bater com o cálculo do zero."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.revisits import RevisitIndex
+from painel.schema import PROD_DATE
+
+
+def _month(rng, n, start, days=20, pool=60, nat=0.03):
+    d = np.datetime64(start) + rng.integers(0, days, n).astype("timedelta64[D]")
+    dates = pd.Series(d.astype("datetime64[ns]"))
+    dates[rng.random(n) < nat] = pd.NaT
+    return pd.DataFrame({"CHASSI": [f"C{i:03d}" for i in rng.integers(0, pool, n)], PROD_DATE: dates})
+
+
+def _reference(months):
+    """Regra original: todas as vistorias por data (empate: ordem dos meses e das linhas); a 1ª de cada chassi é a original."""
+    parts = []
+    for rank, (_, df) in enumerate(months):
+        d = pd.to_datetime(df[PROD_DATE]).to_numpy().astype("datetime64[D]").astype(np.int64)
+        d = np.where(pd.isna(df[PROD_DATE]).to_numpy(), np.iinfo(np.int64).max, d)
+        parts.append(pd.DataFrame({"c": df["CHASSI"].to_numpy(), "d": d, "m": rank, "r": np.arange(len(df))}))
+    allm = pd.concat(parts, ignore_index=True).sort_values(["d", "m", "r"], kind="mergesort")
+    allm["rev"] = allm.duplicated("c").astype(int)
+    allm = allm.sort_index()
+    return [allm.loc[allm["m"] == i, "rev"].to_numpy() for i in range(len(months))]
+
+
+def _check(idx, months):
+    got = [df["IS_REV"].to_numpy() for df in idx.flag(months)]
+    fresh = [df["IS_REV"].to_numpy() for df in RevisitIndex().flag(months)]
+    for g, f, r in zip(got, fresh, _reference(months)):
+        np.testing.assert_array_equal(g, f)
+        np.testing.assert_array_equal(g, r)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_incremental_matches_from_scratch(seed):
+    rng = np.random.default_rng(seed)
+    a, b, c = _month(rng, 300, "2025-01-01"), _month(rng, 300, "2025-02-01"), _month(rng, 300, "2025-03-01")
+    idx = RevisitIndex()
+    _check(idx, [("A@1", a), ("B@1", b), ("C@1", c)])
+
+    # C trocou de versão por inteiro
+    c2 = _month(rng, 250, "2025-01-15", days=60)
+    _check(idx, [("A@1", a), ("B@1", b), ("C@2", c2)])
+
+    # A saiu da janela; D entra na frente com datas antigas
+    _check(idx, [("B@1", b), ("C@2", c2)])
+    d = _month(rng, 200, "2024-12-01", days=40)
+    _check(idx, [("D@1", d), ("B@1", b), ("C@2", c2)])
+
+
+def test_same_day_tie_follows_month_order():
+    day = pd.Timestamp("2025-01-10")
+    m1 = pd.DataFrame({"CHASSI": ["X"], PROD_DATE: [day]})
+    m2 = pd.DataFrame({"CHASSI": ["X"], PROD_DATE: [day]})
+    out = RevisitIndex().flag([("m1", m1), ("m2", m2)])
+    assert [int(o["IS_REV"].iloc[0]) for o in out] == [0, 1]
+    out = RevisitIndex().flag([("m2", m2), ("m1", m1)])
+    assert [int(o["IS_REV"].iloc[0]) for o in out] == [0, 1]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_rekey_after_append_matches_from_scratch(seed):
+    rng = np.random.default_rng(seed)
+    a, b, c = _month(rng, 300, "2025-01-01"), _month(rng, 300, "2025-02-01"), _month(rng, 300, "2025-03-01")
+    idx = RevisitIndex()
+    _check(idx, [("A@1", a), ("B@1", b), ("C@1", c)])
+
+    # B só ganhou linhas no fim (acréscimo), inclusive com datas antes das de A
+    tail = _month(rng, 80, "2024-12-25", days=50)
+    b2 = pd.concat([b, tail], ignore_index=True)
+    idx.rekey("B@1", "B@2", tail)
+    _check(idx, [("A@1", a), ("B@2", b2), ("C@1", c)])
+
+
+def test_forget_resummarizes_key():
+    rng = np.random.default_rng(5)
+    a, stale, real = _month(rng, 100, "2025-01-01"), _month(rng, 100, "2025-02-01"), _month(rng, 120, "2025-02-01")
+    idx = RevisitIndex()
+    idx.flag([("A", a), ("B@v2", stale)])      # cópia anterior servida sob a chave nova
+    idx.forget("B@v2")
+    _check(idx, [("A", a), ("B@v2", real)])
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""Leituras por coluna, acréscimo e planilha inteira sobre abas em memória (LocalSheet)."""
+
+import pytest
+
+from painel.sheets import col_letter, read_appended, read_book, read_columns, read_columns_tracked
+from painel.sources import LocalSheet
+
+HEADER = ["UNIDADE", "DATA", "OBS", "CHASSI", "PERITO"]
+
+
+class Book:
+    """O mínimo da LocalSource que a LocalSheet usa: abas em colunas e contagem de chamadas."""
+
+    def __init__(self, rows, **tabs):
+        self.tabs = {"Página1": _columns([HEADER] + rows)}
+        self.tabs.update({t: _columns(r) for t, r in tabs.items()})
+        self.calls = []
+
+    def _call(self, op, file_id="", extra=0.0):
+        self.calls.append(op)
+
+    def _tabs(self, file_id):
+        return self.tabs
+
+    def sheet(self, title="Página1"):
+        return LocalSheet(self, "id", title)
+
+
+def _columns(rows):
+    width = max(len(r) for r in rows)
+    return [[r[i] if i < len(r) else "" for r in rows] for i in range(width)]
+
+
+def _rows(n, start=0):
+    return [[f"U{i % 3}", f"{i % 28 + 1:02d}/03/2025", "x", f"C{i:04d}", f"P{i % 5}"] for i in range(start, start + n)]
+
+
+def pick(h):
+    return h.upper() if h.upper() in {"UNIDADE", "DATA", "CHASSI", "PERITO"} else None
+
+
+def _tail(n=40):
+    book = Book(_rows(n))
+    _, tail = read_columns_tracked(book.sheet(), pick)
+    return book, tail
+
+
+def test_append_reads_only_new_rows_in_one_call():
+    book, tail = _tail()
+    book.tabs = Book(_rows(45)).tabs
+    book.calls.clear()
+    df, new_tail, _ = read_appended(book.sheet(), pick, tail)
+    assert book.calls == ["batch_get"]
+    assert list(df["CHASSI"]) == [f"C{i:04d}" for i in range(40, 45)]
+    assert new_tail.rows == 45 and new_tail.sample == tail.sample
+
+
+@pytest.mark.parametrize("change", ["edit", "delete", "same_size"])
+def test_append_falls_back_to_full_read(change):
+    book, tail = _tail()
+    rows = _rows(45)
+    if change == "edit":
+        rows[10][3] = "OUTRO"              # linha acima do fim editada (está na amostra)
+    elif change == "delete":
+        del rows[5]                        # linhas sobem: a última lida muda de lugar
+    else:
+        rows = _rows(40)
+        rows[20][0] = "U9"                 # versão nova sem linhas novas
+    book.tabs = Book(rows).tabs
+    assert read_appended(book.sheet(), pick, tail) is None
+
+
+def test_sample_covers_earlier_rows():
+    _, tail = _tail(200)
+    idx = [i for i, _ in tail.sample]
+    assert 0 in idx and max(idx) <= 198 and len(idx) == 16
+    assert tail.last == ("U1", "04/03/2025", "C0199", "P4")
+
+
+def _records(book):
+    """Como get_all_records + filtro de colunas: todas as linhas e colunas, depois a projeção."""
+    cols = book.tabs["Página1"]
+    header = [c[0] for c in cols]
+    rows = [[c[i] for c in cols] for i in range(1, len(cols[0]))]
+    keep = {}
+    for j, h in enumerate(header):
+        if pick(h) and pick(h) not in keep:
+            keep[pick(h)] = j
+    while rows and all(r[j] == "" for r in rows[-1:] for j in keep.values()):
+        rows.pop()
+    return {name: [r[j] for r in rows] for name, j in keep.items()}
+
+
+def test_read_columns_matches_all_records_projection():
+    rows = _rows(30)
+    rows[7][1] = ""                        # célula vazia no meio
+    rows += [["", "", "só obs", "", ""]]   # linha final vazia nas colunas pedidas
+    book = Book(rows)
+    df = read_columns(book.sheet(), pick)
+    assert book.calls == ["row_values", "batch_get"]
+    assert list(df.columns) == ["UNIDADE", "DATA", "CHASSI", "PERITO"]
+    assert {c: list(df[c]) for c in df.columns} == _records(book)
+
+
+def test_read_columns_numeric_and_unknown_header():
+    book = Book([["U1", "45717", "", "C1", "P1"], ["U2", "03/03/2025", "", "C2", "P2"]])
+    df = read_columns(book.sheet(), pick, numeric=["DATA"])
+    assert list(df["DATA"]) == [45717, "03/03/2025"]
+    assert read_columns(Book([["a"]], Outra=[["X", "Y"], ["1", "2"]]).sheet("Outra"), pick).empty
+
+
+def test_col_letter():
+    assert [col_letter(n) for n in (1, 26, 27, 52, 703)] == ["A", "Z", "AA", "AZ", "AAA"]
+
+
+class FakeSheetsApi:
+    """spreadsheets().get / values().batchGet da Sheets API v4 sobre as abas de um Book."""
+
+    def __init__(self, book, order):
+        self.book, self.order = book, order
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId, ranges, includeGridData, fields):
+        self.book.calls.append("get")
+        sheets = []
+        for i, t in enumerate(self.order):
+            header = [c[0] for c in self.book.tabs.get(t, []) if c and c[0] != ""]
+            rows = [{"values": [{"formattedValue": h} for h in header]}] if header else []
+            sheets.append({"properties": {"title": t, "index": i}, "data": [{"rowData": rows}]})
+        return _Exec({"properties": {"title": "Produção 03/2025"}, "sheets": sheets})
+
+    def batchGet(self, spreadsheetId, ranges, majorDimension):
+        self.book.calls.append("batchGet")
+        ws = LocalSheet(self.book, "id", "Página1")
+        return _Exec({"valueRanges": [{"values": ws._values(self.book.tabs, r, majorDimension)} for r in ranges]})
+
+
+class _Exec:
+    def __init__(self, value):
+        self.value = value
+
+    def execute(self):
+        return self.value
+
+
+def test_read_book_two_calls_with_metas():
+    book = Book(_rows(12), METAS=[["VISTORIADOR", "META"], ["P1", "250"]], Vazia=[[""]])
+    api = FakeSheetsApi(book, ["Vazia", "Página1", "METAS"])
+    title, ws, df, tail, tabs = read_book(api, "id", pick, tabs=["METAS", "NAO EXISTE"])
+    assert book.calls == ["get", "batchGet"]
+    assert (title, ws.title, tail.rows) == ("Produção 03/2025", "Página1", 12)
+    assert {c: list(df[c]) for c in df.columns} == _records(book)
+    assert list(tabs) == ["METAS"] and tabs["METAS"].to_dict("list") == {"VISTORIADOR": ["P1"], "META": ["250"]}
+
+
+def test_read_book_without_data():
+    book = Book(_rows(1))
+    book.tabs = {"Vazia": [[""]]}
+    title, ws, df, tail, tabs = read_book(FakeSheetsApi(book, ["Vazia"]), "id", pick)
+    assert ws.title == "Vazia" and df.empty and tail is None and tabs == {}
+    assert book.calls == ["get"]            # sem coluna reconhecida: nada a buscar
+    _, ws, df, tail, tabs = read_book(FakeSheetsApi(book, []), "id", pick)
+    assert ws is None and df.empty and tail is None and tabs == {}
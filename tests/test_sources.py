@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from painel.resilience import ResilientSource, Scheduler
+from painel.sources import DataSource, MeteredSource
+
+
+class Partial(DataSource):
+    def versions(self, file_ids):
+        return {}
+
+
+def test_incomplete_backend_fails_on_construction():
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_wrappers_are_complete_backends():
+    class Full(Partial):
+        def metadata(self, file_id): return {"id": file_id}
+        def worksheet(self, sheet_id, tab): return None
+        def download_to(self, file_id, fh): pass
+        def book(self, sheet_id, pick, numeric=(), tabs=()): return None
+        def sheet(self, sheet_id, title): return None
+
+    src = ResilientSource(MeteredSource(Full()), Scheduler())
+    assert src.metadata("x") == {"id": "x"}
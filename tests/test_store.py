@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import os
+
+import pandas as pd
+import pytest
+
+from painel.store import MonthStore, ok_pyarrow
+
+pytestmark = pytest.mark.skipif(not ok_pyarrow, reason="cache em disco precisa de pyarrow")
+
+
+def _frame(n=3):
+    return pd.DataFrame({"A": range(n), "B": [f"x{i}" for i in range(n)]})
+
+
+def _versions(store, file_id):
+    return sorted(os.listdir(store._file_dir("qualidade", file_id)))
+
+
+def test_put_get_roundtrip(tmp_path):
+    store = MonthStore(str(tmp_path))
+    assert store.put("qualidade", "f1", "2025-01-01T00:00:00Z", {"dados": _frame()}, {"title": "Jan"})
+    frames, meta = store.get("qualidade", "f1", "2025-01-01T00:00:00Z")
+    pd.testing.assert_frame_equal(frames["dados"], _frame())
+    assert meta["title"] == "Jan" and meta["version"] == "2025-01-01T00:00:00Z"
+    assert store.get("qualidade", "f1", "outra") is None
+    assert store.get("qualidade", "f1", "") is None
+
+
+def test_put_prunes_older_versions(tmp_path):
+    store = MonthStore(str(tmp_path))
+    store.put("qualidade", "f1", "v1", {"dados": _frame(1)})
+    store.put("qualidade", "f1", "v2", {"dados": _frame(2)})
+    assert _versions(store, "f1") == ["v2"]
+    assert store.get("qualidade", "f1", "v1") is None
+    assert len(store.get("qualidade", "f1", "v2")[0]["dados"]) == 2
+
+
+def test_failed_put_keeps_previous_version(tmp_path):
+    store = MonthStore(str(tmp_path))
+    store.put("qualidade", "f1", "v1", {"dados": _frame()})
+    assert not store.put("qualidade", "f1", "v2", {"dados": "não é um frame"})
+    assert _versions(store, "f1") == ["v1"]           # sem temporário nem versão pela metade
+    assert store.get("qualidade", "f1", "v1") is not None
+
+
+def test_other_schema_is_ignored(tmp_path):
+    MonthStore(str(tmp_path), schema="antigo").put("qualidade", "f1", "v1", {"dados": _frame()})
+    store = MonthStore(str(tmp_path), schema="novo")
+    assert store.get("qualidade", "f1", "v1") is None
+    assert store.latest("qualidade", "f1") is None
+    store.put("qualidade", "f1", "v1", {"dados": _frame(2)})    # mesma versão, formato novo
+    assert len(store.get("qualidade", "f1", "v1")[0]["dados"]) == 2
+
+
+def test_latest(tmp_path):
+    store = MonthStore(str(tmp_path))
+    assert store.latest("qualidade", "f1") is None
+    store.put("qualidade", "f1", "v1", {"dados": _frame(1)})
+    store.put("qualidade", "f1", "v2", {"dados": _frame(2)})
+    frames, meta = store.latest("qualidade", "f1")
+    assert meta["version"] == "v2" and len(frames["dados"]) == 2
+
+
+def test_disabled_store(tmp_path):
+    store = MonthStore(str(tmp_path), enabled=False)
+    assert not store.put("qualidade", "f1", "v1", {"dados": _frame()})
+    assert store.get("qualidade", "f1", "v1") is None
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Tabelas vetorizadas contra os laços por linha que substituíram (cópia da regra antiga)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from painel.tables import farol, fmt_num, trend_projection
+
+
+def _farol_row(pct, meta, tol):
+    if pd.isna(pct): return "—"
+    diff = pct - meta
+    if diff <= 0:      return "🟢"
+    if diff <= tol:    return "🟡"
+    return "🔴"
+
+
+def _trend_rows(erros_mtd, metas, dias_passados, dias_fallback):
+    du_map = {}
+    for _, r in metas.iterrows():
+        du_map[r["VISTORIADOR"]] = int(r["DIAS_UTEIS"]) if pd.notna(r["DIAS_UTEIS"]) else None
+    rows = []
+    for _, r in erros_mtd.iterrows():
+        v, e_mtd = r["VISTORIADOR"], int(r["ERROS_MTD"])
+        du_total = du_map.get(v, dias_fallback) or dias_fallback
+        du_pass = min(dias_passados, du_total) if du_total else dias_passados
+        erros_dia = (e_mtd / du_pass) if du_pass else np.nan
+        proj = int(round(erros_dia * du_total)) if not np.isnan(erros_dia) else e_mtd
+        rows.append({"VISTORIADOR": v, "Erros (MTD)": e_mtd,
+                     "Erros/dia": round(erros_dia, 2) if not np.isnan(erros_dia) else 0.0,
+                     "Dias úteis passados": int(du_pass), "Dias úteis (mês)": int(du_total),
+                     "Projeção (mês)": proj})
+    return pd.DataFrame(rows).sort_values("Projeção (mês)", ascending=False)
+
+
+def test_farol_matches_row_rule():
+    pct = pd.Series([np.nan, 0.0, 3.5, 3.6, 4.0, 4.01, 12.0], index=list("abcdefg"))
+    got = farol(pct, 3.5, 0.5)
+    assert list(got) == [_farol_row(p, 3.5, 0.5) for p in pct]
+    assert list(got.index) == list(pct.index)
+
+
+def test_fmt_num_prefix_and_blanks():
+    v = pd.Series([1.25, np.nan, 10.0])
+    assert list(fmt_num(v, prefix=pd.Series(["🟢", "🔴", "🟡"]), suffix="%")) == ["🟢 1,2%", "—", "🟡 10,0%"]
+
+
+@pytest.mark.parametrize("dias_passados,fallback", [(7, 21), (0, 21), (30, 22), (5, 0)])
+def test_trend_projection_matches_row_loop(dias_passados, fallback):
+    rng = np.random.default_rng(dias_passados + fallback)
+    names = [f"V{i:02d}" for i in range(40)]
+    erros = pd.DataFrame({"VISTORIADOR": names, "ERROS_MTD": rng.integers(0, 60, len(names))})
+    du = pd.array(rng.integers(0, 24, 30), dtype="Int64")
+    du[::7] = pd.NA
+    metas = pd.DataFrame({"VISTORIADOR": names[:25] + names[:5], "DIAS_UTEIS": du})   # duplicatas: vale a última
+    got = trend_projection(erros, metas, dias_passados, fallback).reset_index(drop=True)
+    want = _trend_rows(erros, metas, dias_passados, fallback).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_trend_projection_empty():
+    assert trend_projection(pd.DataFrame(columns=["VISTORIADOR", "ERROS_MTD"]), pd.DataFrame(), 5, 21).empty
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from painel.schema import quality_column
+from painel.xlsx import ok_openpyxl, read_sheet_chunks
+
+pytestmark = pytest.mark.skipif(not ok_openpyxl, reason="leitura em streaming precisa de openpyxl")
+
+
+def _book(rows) -> io.BytesIO:
+    from openpyxl import Workbook
+    wb = Workbook()
+    wb.active.title = "OUTRA"
+    ws = wb.create_sheet("GERAL")
+    ws.append(["Data", "Vistoriadores", "Obs", "Cidade", "Erros", "Vistoriador"])
+    for r in rows:
+        ws.append(r)
+    fh = io.BytesIO()
+    wb.save(fh)
+    fh.seek(0)
+    return fh
+
+
+ROWS = [[datetime(2025, 3, d % 28 + 1), f"v{d}", "x", f"u{d % 3}", f"e{d % 4}", "ignorado"] for d in range(25)]
+
+
+def test_chunks_match_read_excel_on_projected_columns():
+    fh = _book(ROWS[:10] + [[None, None, "", None, None, "só na coluna ignorada"]] + ROWS[10:])
+    chunks = list(read_sheet_chunks(fh, "GERAL", quality_column, chunk_rows=7))
+    assert [len(c) for c in chunks] == [7, 7, 7, 4]          # linha vazia nas colunas pedidas fica de fora
+    got = pd.concat(chunks, ignore_index=True)
+    assert list(got.columns) == ["DATA", "VISTORIADOR", "OBS", "UNIDADE", "ERRO"]
+
+    fh.seek(0)
+    ref = pd.read_excel(fh, sheet_name="GERAL", engine="openpyxl")
+    ref = ref.iloc[:, :5].set_axis(list(got.columns), axis=1).dropna(how="all")
+    ref = ref.reset_index(drop=True)
+    assert list(got["VISTORIADOR"]) == list(ref["VISTORIADOR"])
+    assert (got["DATA"].to_numpy() == pd.to_datetime(ref["DATA"]).to_numpy()).all()
+
+
+def test_missing_sheet_raises_on_call():
+    with pytest.raises(ValueError):
+        read_sheet_chunks(_book(ROWS), "NAO EXISTE", quality_column)
+
+
+def test_header_without_known_columns_yields_nothing():
+    assert list(read_sheet_chunks(_book(ROWS), "OUTRA", quality_column)) == []
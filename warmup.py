@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Aquecimento do painel: carrega tudo e renderiza a visão padrão antes dos usuários.
+
+Executa o app.py sem navegador (streamlit.testing.v1.AppTest), com os mesmos
+secrets do servidor. Uma rodada:
+  - lê os dois índices e baixa/normaliza todos os meses ativos, gravando-os no
+    cache em disco (.cache/meses ou `cache_dir`);
+  - monta e grava o snapshot (bases compactas + cubos) que o servidor carrega
+    na 1ª sessão após deploy/restart;
+  - renderiza a visão padrão (mês mais recente, período inteiro, todas as unidades).
+
+Uso:
+  python warmup.py                   # uma rodada (ex.: no deploy ou via cron)
+  python warmup.py --every 10        # repete a cada 10 minutos
+Cron:  */10 6-19 * * 1-6  cd /srv/painel && python warmup.py
+"""
+
+import argparse, os, sys, time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_secrets(path: str) -> dict:
+    if not os.path.isfile(path):
+        return {}
+    try:
+        import tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except ImportError:
+        import toml   # dependência do próprio streamlit
+        return toml.load(path)
+
+
+def warm_once(app_path: str, secrets: dict, timeout: float) -> float:
+    """Roda o app uma vez; devolve a duração em segundos (erro → RuntimeError)."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    for k, v in secrets.items():
+        at.secrets[k] = v
+    t0 = time.perf_counter()
+    at.run()
+    dt = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError("; ".join(str(e.value) for e in at.exception))
+    erros = [str(e.value) for e in at.error]
+    if erros:
+        raise RuntimeError("; ".join(erros))
+    return dt
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--every", type=float, default=0, help="repetir a cada N minutos (0 = uma vez)")
+    ap.add_argument("--timeout", type=float, default=900, help="tempo máximo de uma rodada (s)")
+    ap.add_argument("--secrets", default=os.path.join(APP_DIR, ".streamlit", "secrets.toml"))
+    args = ap.parse_args(argv)
+
+    os.chdir(APP_DIR)
+    app_path = os.path.join(APP_DIR, "app.py")
+    secrets = _load_secrets(args.secrets)
+
+    while True:
+        try:
+            dt = warm_once(app_path, secrets, args.timeout)
+            print(f"[{time.strftime('%H:%M:%S')}] painel aquecido em {dt:.1f}s", flush=True)
+            status = 0
+        except Exception as e:
+            print(f"[{time.strftime('%H:%M:%S')}] falha no aquecimento: {e}", file=sys.stderr, flush=True)
+            status = 1
+        if args.every <= 0:
+            return status
+        time.sleep(args.every * 60)
+
+
+if __name__ == "__main__":
+    sys.exit(main())